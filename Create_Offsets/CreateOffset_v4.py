@@ -1,10 +1,22 @@
 '''
 Author: William J. Reid
 Description: This Fusion 360 script creates a double offset sketch of a selected extruded-cut body profile. 
-Offset support exists for: Lines, Arcs, and Circles. The script does not yet support offsetting a spline.
+Offset support exists for: Lines, Arcs, Circles and Splines (splines are first fitted with tangent-continuous arcs).
+The offsets are computed analytically by flexure_tools.offset, so any number of rings costs a single sketch update.
 '''
 
-import adsk.core, adsk.fusion, adsk.cam, traceback, math
+import adsk.core, adsk.fusion, adsk.cam, traceback, math, os, sys
+
+# Make the shared flexure_tools package (one folder up) importable from this script folder
+_repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _repo_root not in sys.path:
+    sys.path.insert(0, _repo_root)
+from flexure_tools import biarc, extraction, instrumentation, loops, offset
+
+# Set to a file path to log how long every adsk call of a run takes (count, total and p50/p90/p99 per call)
+API_TIMINGS_LOG = None
+if API_TIMINGS_LOG:
+    instrumentation.enable(API_TIMINGS_LOG)
 
 # Function to calculate the centroid of given curves within a sketch
 def calculate_centroid(sketch, curves):
@@ -57,30 +69,90 @@ def get_arc_parameters(arc_entity):
     center = arc_entity.geometry.center
     start_point = arc_entity.startSketchPoint.geometry
     end_point = arc_entity.endSketchPoint.geometry
-    
-    # Create vectors from the center to the start and end points
-    vector_start = center.vectorTo(start_point)
-    vector_end = center.vectorTo(end_point)
-    
-    # Normalize vectors
-    vector_start.normalize()
-    vector_end.normalize()
-    
-    # Calculate the dot product for the angle
-    dot_product = vector_start.dotProduct(vector_end)
-    angle = math.acos(dot_product)
-
-    # Calculate the cross product for determining the sweep direction
-    cross_product = vector_start.crossProduct(vector_end)
-    sketch_normal = adsk.core.Vector3D.create(0, 0, 1)  # Assuming sketch is on XY plane, adjust if necessary
-    if cross_product.dotProduct(sketch_normal) < 0:
-        angle = 2 * math.pi - angle  # Adjusting for clockwise direction
+
+    # Sweep about the sketch plane's normal, via atan2 so it stays exact for arcs close to 0 and 360 degrees
+    normal = extraction.sketch_normal(arc_entity.parentSketch)
+    first, last = (start_point, end_point) if normal[2] >= 0 else (end_point, start_point)
+    angle = extraction.arc_sweeps(center.asArray(), first.asArray(), last.asArray(), normal)[0]
     
     return center, start_point, end_point, angle
 
+def curves_to_entities(curves):
+    """
+    Convert sketch curves into the (type, params) entity tuples used by the flexure library and the offset engine.
+
+    Parameters:
+    - curves (iterable): Sketch entities (adsk.fusion.SketchLine, SketchArc, SketchCircle, SketchFittedSpline,
+      SketchFixedSpline), or collections of them.
+
+    Returns:
+    - list: Entities such as ('line', [((x1, y1, z1), (x2, y2, z2))]) in sketch coordinates.
+    """
+    entities = []
+    arcs, arc_slots = [], []
+    _collect_entities(curves, entities, arcs, arc_slots)
+    if arcs:
+        # Every arc's sweep in one pass, about the real normal of the sketch plane
+        normal = extraction.sketch_normal(arcs[0].parentSketch)
+        for slot, arc in zip(arc_slots, extraction.sketch_arc_entities(arcs, normal)):
+            entities[slot] = arc
+    return entities
+
+def _collect_entities(curves, entities, arcs, arc_slots):
+    """ curves_to_entities without the arcs: each arc leaves a None slot in entities to be filled in afterwards. """
+    for entity in curves:
+        if isinstance(entity, adsk.core.ObjectCollection):
+            _collect_entities(entity, entities, arcs, arc_slots)
+        elif isinstance(entity, adsk.fusion.SketchLine):
+            start = entity.startSketchPoint.geometry
+            end = entity.endSketchPoint.geometry
+            entities.append(('line', [((start.x, start.y, start.z), (end.x, end.y, end.z))]))
+        elif isinstance(entity, adsk.fusion.SketchArc):
+            arcs.append(entity)
+            arc_slots.append(len(entities))
+            entities.append(None)
+        elif isinstance(entity, adsk.fusion.SketchCircle):
+            geom = entity.geometry
+            entities.append(('circle', [(geom.center.asArray(), geom.radius)]))
+        elif isinstance(entity, adsk.fusion.SketchFittedSpline):
+            entities.append(('spline', [[point.geometry.asArray() for point in entity.fitPoints]]))
+        elif isinstance(entity, adsk.fusion.SketchFixedSpline):
+            # Projected BRep splines have no fit points; stroke the curve instead
+            evaluator = entity.geometry.evaluator
+            _, start_param, end_param = evaluator.getParameterExtents()
+            _, points = evaluator.getStrokes(start_param, end_param, biarc.BIARC_TOLERANCE)
+            entities.append(('spline', [[point.asArray() for point in points]]))
+
+def find_connected_curves(sketch, curve):
+    """
+    Find the curves of a sketch that are chained end to end with the given curve, without sketch.findConnectedCurves.
+
+    Every curve of the sketch is read once and the chains are built in Python (flexure_tools.loops), so the entity
+    tuples read along the way are returned too and the chain is not read from the API a second time.
+
+    Parameters:
+    - sketch (adsk.fusion.Sketch): The sketch containing the curve.
+    - curve: The selected sketch curve (SketchLine, SketchArc, SketchCircle or SketchFittedSpline).
+
+    Returns:
+    - Tuple: (curves, entities), the curves of the loop or open chain containing curve in chain order, and their
+      entity tuples as returned by curves_to_entities.
+    """
+    sketch_curves = sketch.sketchCurves
+    all_curves = [c for collection in (sketch_curves.sketchLines, sketch_curves.sketchArcs, sketch_curves.sketchCircles,
+                                       sketch_curves.sketchFittedSplines, sketch_curves.sketchFixedSplines)
+                  for c in collection]
+    all_entities = curves_to_entities(all_curves)
+    for loop in loops.find_loops(all_entities):
+        indices = [index for index, _ in loop.items]
+        if any(all_curves[index] == curve for index in indices):
+            return [all_curves[index] for index in indices], [all_entities[index] for index in indices]
+    return [curve], curves_to_entities([curve])
+
 
 # Main function to run the script
-def run(context):
+@instrumentation.command('Create Offset')
+def run(context=None):
     """
     Main function to execute the script. Prompts user for selection and calculates offsets.
 
@@ -129,7 +201,7 @@ def run(context):
             return
         selectedEntity = selectedEdgeInput.entity  # Get the selected entity
 
-        sketch, curves = None, adsk.core.ObjectCollection.create()
+        sketch, curves, entities = None, adsk.core.ObjectCollection.create(), None
         # Handle selection of a BRepEdge (body edge)
         if isinstance(selectedEntity, adsk.fusion.BRepEdge):
             face = selectedEntity.faces.item(0)  # Assume the first face is relevant
@@ -137,9 +209,9 @@ def run(context):
             proj = sketch.project(selectedEntity)  # Project the edge onto the sketch
             curves.add(proj)  # Add the projected curve to the collection
         # Handle selection of a sketch entity (line, arc, or circle)
-        elif isinstance(selectedEntity, (adsk.fusion.SketchLine, adsk.fusion.SketchArc, adsk.fusion.SketchCircle)):
+        elif isinstance(selectedEntity, (adsk.fusion.SketchLine, adsk.fusion.SketchArc, adsk.fusion.SketchCircle, adsk.fusion.SketchFittedSpline)):
             sketch = selectedEntity.parentSketch  # Use the parent sketch of the selected entity
-            connectedCurves = sketch.findConnectedCurves(selectedEntity)  # Find connected curves
+            connectedCurves, entities = find_connected_curves(sketch, selectedEntity)  # Find connected curves
             for curve in connectedCurves:
                 curves.add(curve)  # Add each connected curve to the collection
 
@@ -160,12 +232,23 @@ def run(context):
             ui.messageBox('Failed to calculate centroid.')
             return
 
-        # Perform the offset operation 
-        offsetCurve1 = sketch.offset(curves, dirPoint, offsetDistance)
-        offsetCurve2 = sketch.offset(curves, dirPoint, offsetDistance*2)  # Creates a second offset
-        # To add more offsets, see below:
-        # offsetCurve3 = sketch.offset(curves, dirPoint, offsetDistance*3)
-        # offsetCurve4 = sketch.offset(curves, dirPoint, offsetDistance*3.5)
+        # Prompt user for the number of offsets; ring k is placed at k * offsetDistance
+        offsetCountInput = ui.inputBox('Enter the number of offsets to create:', 'Number of Offsets', '2')
+        if not offsetCountInput:
+            ui.messageBox('Invalid input or operation cancelled.')
+            return
+        offsetCount = int(offsetCountInput[0])
+
+        # Compute every ring analytically in one pass, then add them to the sketch in a single deferred batch
+        if entities is None:
+            entities = curves_to_entities(curves)
+        dirPointSketch = sketch.modelToSketchSpace(dirPoint)  # calculate_centroid works in world coordinates
+        rings = offset.offset_chain(entities, [offsetDistance * k for k in range(1, offsetCount + 1)], (dirPointSketch.x, dirPointSketch.y))
+        try:
+            offset.emit_rings(sketch, rings)  # Checks the rings for crossings before adding anything
+        except ValueError as e:
+            ui.messageBox(str(e))
+            return
         
         ui.messageBox('Offset created successfully.')  # Notify user of success
     except Exception as e:
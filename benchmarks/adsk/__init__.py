@@ -0,0 +1,30 @@
+'''
+Description: In-process stand-in for the Fusion 360 adsk package, used to exercise the scripts headless.
+Only the parts of adsk.core/adsk.fusion used by this repository are modelled. Every API entry point bumps a counter
+in `calls`, and sketches count their solver recomputes, so benchmarks can report API traffic alongside wall time.
+'''
+
+from collections import Counter
+
+# Number of calls per API entry point, e.g. calls['SketchLines.addByTwoPoints']
+calls = Counter()
+
+
+def reset_counters():
+    """ Clear the API call counters. """
+    calls.clear()
+
+
+def autoTerminate(value):
+    calls['adsk.autoTerminate'] += 1
+
+
+def doEvents():
+    """
+    Stand-in event loop turn: deliver the custom events fired so far (from any thread) to their handlers, on the
+    calling thread, as Fusion does on its UI thread.
+    """
+    calls['adsk.doEvents'] += 1
+    from .core import Application
+    if Application._instance is not None:
+        Application._instance._dispatch_custom_events()
@@ -0,0 +1 @@
+''' Description: Empty stand-in for adsk.cam; the scripts import it but never use it. '''
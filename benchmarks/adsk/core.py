@@ -0,0 +1,394 @@
+'''
+Description: Stand-in for the adsk.core objects used by the scripts in this repository: points and vectors, the
+transient curve geometry returned by BRep and sketch entities, object collections, and just enough of Application,
+UserInterface and the command/event classes for the scripts to import and register their commands headless.
+'''
+
+import math, queue
+
+from . import calls
+
+
+class Base:
+    """ Mirrors adsk.core.Base.cast: returns the object if it has the requested type, otherwise None. """
+    __slots__ = ()
+
+    @classmethod
+    def cast(cls, obj):
+        return obj if isinstance(obj, cls) else None
+
+
+class Point3D(Base):
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        calls['Point3D.create'] += 1
+        return Point3D(x, y, z)
+
+    def copy(self):
+        return Point3D(self.x, self.y, self.z)
+
+    def asArray(self):
+        return (self.x, self.y, self.z)
+
+    def distanceTo(self, other):
+        return math.dist((self.x, self.y, self.z), (other.x, other.y, other.z))
+
+    def vectorTo(self, other):
+        return Vector3D(other.x - self.x, other.y - self.y, other.z - self.z)
+
+    def isEqualTo(self, other):
+        return self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __repr__(self):
+        return 'Point3D({}, {}, {})'.format(self.x, self.y, self.z)
+
+
+class Vector3D(Base):
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = x, y, z
+
+    @staticmethod
+    def create(x=0.0, y=0.0, z=0.0):
+        calls['Vector3D.create'] += 1
+        return Vector3D(x, y, z)
+
+    @property
+    def length(self):
+        return math.sqrt(self.x * self.x + self.y * self.y + self.z * self.z)
+
+    def normalize(self):
+        length = self.length
+        if length == 0:
+            return False
+        self.x, self.y, self.z = self.x / length, self.y / length, self.z / length
+        return True
+
+    def dotProduct(self, other):
+        return self.x * other.x + self.y * other.y + self.z * other.z
+
+    def crossProduct(self, other):
+        return Vector3D(self.y * other.z - self.z * other.y,
+                        self.z * other.x - self.x * other.z,
+                        self.x * other.y - self.y * other.x)
+
+    def asArray(self):
+        return (self.x, self.y, self.z)
+
+
+class ObjectCollection(Base):
+    def __init__(self, items=None):
+        self._items = list(items or [])
+
+    @staticmethod
+    def create():
+        calls['ObjectCollection.create'] += 1
+        return ObjectCollection()
+
+    def add(self, item):
+        self._items.append(item)
+        return True
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, item):
+        return item in self._items
+
+
+# Curve geometry. The API hands out a new transient object on every .geometry access; the stand-ins are shared.
+
+class Curve3D(Base):
+    pass
+
+
+class Line3D(Curve3D):
+    def __init__(self, startPoint, endPoint):
+        self.startPoint, self.endPoint = startPoint, endPoint
+
+
+class Arc3D(Curve3D):
+    """ Arc counter-clockwise about normal from startAngle to endAngle, angles measured from referenceVector. """
+
+    def __init__(self, center, normal, referenceVector, radius, startAngle, endAngle):
+        self.center, self.normal, self.referenceVector = center, normal, referenceVector
+        self.radius, self.startAngle, self.endAngle = radius, startAngle, endAngle
+
+    def _point(self, angle):
+        ref, binormal = self.referenceVector, self.normal.crossProduct(self.referenceVector)
+        c, s = math.cos(angle) * self.radius, math.sin(angle) * self.radius
+        return Point3D(self.center.x + c * ref.x + s * binormal.x,
+                       self.center.y + c * ref.y + s * binormal.y,
+                       self.center.z + c * ref.z + s * binormal.z)
+
+    @property
+    def startPoint(self):
+        return self._point(self.startAngle)
+
+    @property
+    def endPoint(self):
+        return self._point(self.endAngle)
+
+
+class Circle3D(Curve3D):
+    def __init__(self, center, normal, radius):
+        self.center, self.normal, self.radius = center, normal, radius
+
+
+class NurbsCurve3D(Curve3D):
+    def __init__(self, points):
+        self.points = points
+
+    @property
+    def evaluator(self):
+        return CurveEvaluator3D(self.points)
+
+
+class CurveEvaluator3D(Base):
+    """ Evaluator over a polyline, enough for getParameterExtents/getStrokes. """
+
+    def __init__(self, points):
+        self._points = points
+
+    def getParameterExtents(self):
+        return True, 0.0, float(len(self._points) - 1)
+
+    def getStrokes(self, fromParameter, toParameter, tolerance):
+        calls['CurveEvaluator3D.getStrokes'] += 1
+        return True, [p.copy() for p in self._points[int(fromParameter):int(toParameter) + 1]]
+
+
+class SurfaceTypes:
+    PlaneSurfaceType = 0
+    CylinderSurfaceType = 1
+
+
+class Plane(Base):
+    surfaceType = SurfaceTypes.PlaneSurfaceType
+
+    def __init__(self, origin=None, normal=None, uDirection=None, vDirection=None):
+        self.origin = origin or Point3D(0, 0, 0)
+        self.normal = normal or Vector3D(0, 0, 1)
+        self.uDirection = uDirection or Vector3D(1, 0, 0)
+        self.vDirection = vDirection or Vector3D(0, 1, 0)
+
+
+# Application, user interface and commands
+
+class DialogResults:
+    DialogOK = 0
+    DialogCancel = 1
+
+
+class DropDownStyles:
+    TextListDropDownStyle = 0
+
+
+class ValueInput(Base):
+    def __init__(self, value):
+        self.value = value
+
+    @staticmethod
+    def createByString(text):
+        return ValueInput(text)
+
+    @staticmethod
+    def createByReal(value):
+        return ValueInput(value)
+
+
+class Event:
+    def __init__(self):
+        self.handlers = []
+
+    def add(self, handler):
+        self.handlers.append(handler)
+        return True
+
+    def remove(self, handler):
+        self.handlers.remove(handler)
+        return True
+
+
+class CustomEvent(Event):
+    def __init__(self, eventId):
+        super().__init__()
+        self.eventId = eventId
+
+
+class EventHandler:
+    def __init__(self):
+        pass
+
+
+class CommandCreatedEventHandler(EventHandler):
+    pass
+
+
+class CommandEventHandler(EventHandler):
+    pass
+
+
+class InputChangedEventHandler(EventHandler):
+    pass
+
+
+class CustomEventHandler(EventHandler):
+    pass
+
+
+class EventArgs(Base):
+    pass
+
+
+class CommandEventArgs(EventArgs):
+    pass
+
+
+class CommandCreatedEventArgs(CommandEventArgs):
+    pass
+
+
+class InputChangedEventArgs(EventArgs):
+    pass
+
+
+class CustomEventArgs(EventArgs):
+    def __init__(self, firingEvent, additionalInfo):
+        self.firingEvent, self.additionalInfo = firingEvent, additionalInfo
+
+
+class Command(Base):
+    pass
+
+
+class CommandDefinition(Base):
+    def __init__(self, id, name, tooltip):
+        self.id, self.name, self.tooltip = id, name, tooltip
+        self.commandCreated = Event()
+
+    def execute(self):
+        calls['CommandDefinition.execute'] += 1
+        return True
+
+
+class CommandDefinitions(Base):
+    def __init__(self):
+        self._items = {}
+
+    def itemById(self, id):
+        return self._items.get(id)
+
+    def addButtonDefinition(self, id, name, tooltip, resourceFolder=''):
+        definition = CommandDefinition(id, name, tooltip)
+        self._items[id] = definition
+        return definition
+
+
+class ProgressDialog(Base):
+    """ Records the last shown progress; set wasCancelled to simulate the user pressing Cancel. """
+
+    def __init__(self):
+        self.isShowing = False
+        self.wasCancelled = False
+        self.progressValue = 0
+        self.message = ''
+        self.maximumValue = 0
+
+    def show(self, title, message, minimumValue, maximumValue, delay=0):
+        self.isShowing, self.message = True, message
+        self.progressValue, self.maximumValue = minimumValue, maximumValue
+        return True
+
+    def hide(self):
+        self.isShowing = False
+        return True
+
+
+class UserInterface(Base):
+    """ Records message boxes; selection and input prompts return nothing, as if the user cancelled. """
+
+    def __init__(self):
+        self.commandDefinitions = CommandDefinitions()
+        self.messages = []
+
+    def messageBox(self, text, title='', buttons=0, icon=0):
+        calls['UserInterface.messageBox'] += 1
+        self.messages.append(text)
+        return DialogResults.DialogOK
+
+    def selectEntity(self, prompt, filter):
+        calls['UserInterface.selectEntity'] += 1
+        return None
+
+    def inputBox(self, prompt, title='', defaultValue=''):
+        calls['UserInterface.inputBox'] += 1
+        return None
+
+    def createProgressDialog(self):
+        calls['UserInterface.createProgressDialog'] += 1
+        return ProgressDialog()
+
+
+class Application(Base):
+    _instance = None
+
+    def __init__(self):
+        self.userInterface = UserInterface()
+        self._activeProduct = None
+        self._custom_events = {}
+        self._fired = queue.Queue()  # Thread-safe, like Fusion's own custom event queue
+
+    @staticmethod
+    def get():
+        if Application._instance is None:
+            Application._instance = Application()
+        return Application._instance
+
+    def registerCustomEvent(self, eventId):
+        calls['Application.registerCustomEvent'] += 1
+        return self._custom_events.setdefault(eventId, CustomEvent(eventId))
+
+    def unregisterCustomEvent(self, eventId):
+        calls['Application.unregisterCustomEvent'] += 1
+        return self._custom_events.pop(eventId, None) is not None
+
+    def fireCustomEvent(self, eventId, additionalInfo=''):
+        """ Queue the event for delivery on the next adsk.doEvents(); safe to call from worker threads. """
+        calls['Application.fireCustomEvent'] += 1
+        self._fired.put((eventId, additionalInfo))
+        return True
+
+    def _dispatch_custom_events(self):
+        while True:
+            try:
+                eventId, additionalInfo = self._fired.get_nowait()
+            except queue.Empty:
+                return
+            event = self._custom_events.get(eventId)
+            if event is not None:
+                for handler in list(event.handlers):
+                    handler.notify(CustomEventArgs(event, additionalInfo))
+
+    @property
+    def activeProduct(self):
+        if self._activeProduct is None:
+            from .fusion import Design
+            self._activeProduct = Design()
+        return self._activeProduct
@@ -0,0 +1,320 @@
+'''
+Description: Stand-in for the adsk.fusion objects used by the scripts in this repository: sketches and their curve
+collections, and BRep bodies, faces, loops, co-edges, edges and vertices. A Sketch recomputes after every change unless
+isComputeDeferred is set; clearing the flag after a deferred batch costs one recompute. `Sketch.recomputes` exposes
+the count, and every API entry point bumps a counter in adsk.calls.
+'''
+
+import itertools, math
+
+from . import calls
+from .core import (Base, Point3D, Vector3D, ObjectCollection, Line3D, Arc3D, Circle3D, NurbsCurve3D,
+                   CurveEvaluator3D, Plane)
+
+_temp_ids = itertools.count(1)
+_revisions = itertools.count(1)
+
+
+# Sketch entities
+
+class SketchPoint(Base):
+    __slots__ = ('geometry', 'parentSketch')
+
+    def __init__(self, sketch, geometry):
+        self.parentSketch = sketch
+        self.geometry = geometry
+
+    @property
+    def worldGeometry(self):
+        return self.geometry
+
+    def merge(self, point):
+        calls['SketchPoint.merge'] += 1
+        # The merged point is deleted; it is nearly always the one just created, so look from the end
+        points = self.parentSketch.sketchPoints
+        for i in range(len(points) - 1, -1, -1):
+            if points[i] is point:
+                del points[i]
+                break
+        self.parentSketch._changed()
+        return True
+
+
+class SketchCurve(Base):
+    def __init__(self, sketch):
+        self.parentSketch = sketch
+
+    @property
+    def worldGeometry(self):
+        return self.geometry
+
+
+class SketchLine(SketchCurve):
+    def __init__(self, sketch, start, end):
+        super().__init__(sketch)
+        self.startSketchPoint = sketch._point(start)
+        self.endSketchPoint = sketch._point(end)
+
+    @property
+    def geometry(self):
+        return Line3D(self.startSketchPoint.geometry, self.endSketchPoint.geometry)
+
+
+class SketchArc(SketchCurve):
+    def __init__(self, sketch, center, start, sweep):
+        super().__init__(sketch)
+        self.centerSketchPoint = sketch._point(center)
+        self.startSketchPoint = sketch._point(start)
+        center, start = self.centerSketchPoint.geometry, self.startSketchPoint.geometry
+        radius = math.hypot(start.x - center.x, start.y - center.y)
+        angle = math.atan2(start.y - center.y, start.x - center.x) + sweep
+        self.endSketchPoint = SketchPoint(sketch, Point3D(center.x + radius * math.cos(angle),
+                                                          center.y + radius * math.sin(angle), start.z))
+        sketch.sketchPoints.append(self.endSketchPoint)
+        self.radius = radius
+        self.sweep = sweep
+
+    @property
+    def geometry(self):
+        center, start = self.centerSketchPoint.geometry, self.startSketchPoint.geometry
+        angle = math.atan2(start.y - center.y, start.x - center.x)
+        return Arc3D(center, Vector3D(0, 0, 1), Vector3D(1, 0, 0), self.radius, angle, angle + self.sweep)
+
+
+class SketchCircle(SketchCurve):
+    def __init__(self, sketch, center, radius):
+        super().__init__(sketch)
+        self.centerSketchPoint = sketch._point(center)
+        self.radius = radius
+
+    @property
+    def geometry(self):
+        return Circle3D(self.centerSketchPoint.geometry, Vector3D(0, 0, 1), self.radius)
+
+
+class SketchFittedSpline(SketchCurve):
+    def __init__(self, sketch, points):
+        super().__init__(sketch)
+        self.fitPoints = [sketch._point(point) for point in points]
+
+
+class SketchFixedSpline(SketchCurve):
+    """ A projected spline: read-only NURBS geometry without fit points. """
+
+    def __init__(self, sketch, geometry):
+        super().__init__(sketch)
+        self.geometry = geometry
+
+
+class _SketchCurveList(Base):
+    def __init__(self, sketch):
+        self._sketch = sketch
+        self._items = []
+
+    def _added(self, entity):
+        self._items.append(entity)
+        self._sketch._changed()
+        return entity
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+
+class SketchLines(_SketchCurveList):
+    def addByTwoPoints(self, startPoint, endPoint):
+        calls['SketchLines.addByTwoPoints'] += 1
+        return self._added(SketchLine(self._sketch, startPoint, endPoint))
+
+
+class SketchArcs(_SketchCurveList):
+    def addByCenterStartSweep(self, centerPoint, startPoint, sweepAngle):
+        calls['SketchArcs.addByCenterStartSweep'] += 1
+        return self._added(SketchArc(self._sketch, centerPoint, startPoint, sweepAngle))
+
+
+class SketchCircles(_SketchCurveList):
+    def addByCenterRadius(self, centerPoint, radius):
+        calls['SketchCircles.addByCenterRadius'] += 1
+        return self._added(SketchCircle(self._sketch, centerPoint, radius))
+
+
+class SketchFittedSplines(_SketchCurveList):
+    def add(self, fitPoints):
+        calls['SketchFittedSplines.add'] += 1
+        return self._added(SketchFittedSpline(self._sketch, list(fitPoints)))
+
+
+class SketchFixedSplines(_SketchCurveList):
+    pass
+
+
+class SketchCurves(Base):
+    def __init__(self, sketch):
+        self.sketchLines = SketchLines(sketch)
+        self.sketchArcs = SketchArcs(sketch)
+        self.sketchCircles = SketchCircles(sketch)
+        self.sketchFittedSplines = SketchFittedSplines(sketch)
+        self.sketchFixedSplines = SketchFixedSplines(sketch)
+
+
+class Sketch(Base):
+    """ A sketch on the XY plane: sketch space and model space coincide. """
+
+    def __init__(self, planarEntity=None):
+        self.sketchCurves = SketchCurves(self)
+        self.sketchPoints = []
+        self.recomputes = 0
+        self._deferred = False
+        self.referencePlane = planarEntity
+
+    @property
+    def isComputeDeferred(self):
+        return self._deferred
+
+    @isComputeDeferred.setter
+    def isComputeDeferred(self, value):
+        calls['Sketch.isComputeDeferred'] += 1
+        if self._deferred and not value:
+            self.recomputes += 1
+        self._deferred = bool(value)
+
+    def _changed(self):
+        if not self._deferred:
+            self.recomputes += 1
+
+    def _point(self, point):
+        # Mirrors Fusion: a Point3D argument creates a new SketchPoint, a SketchPoint argument is reused
+        if isinstance(point, SketchPoint):
+            return point
+        sketch_point = SketchPoint(self, point.copy())
+        self.sketchPoints.append(sketch_point)
+        return sketch_point
+
+    def modelToSketchSpace(self, point):
+        calls['Sketch.modelToSketchSpace'] += 1
+        return point.copy()
+
+    def sketchToModelSpace(self, point):
+        calls['Sketch.sketchToModelSpace'] += 1
+        return point.copy()
+
+    def project(self, entity):
+        """ Project a BRepEdge: adds the matching sketch curve and returns it in a collection. """
+        calls['Sketch.project'] += 1
+        geom = entity.geometry
+        curves = self.sketchCurves
+        if isinstance(geom, Line3D):
+            created = curves.sketchLines._added(SketchLine(self, geom.startPoint, geom.endPoint))
+        elif isinstance(geom, Arc3D):
+            start = geom.startPoint
+            sweep = (geom.endAngle - geom.startAngle) * (1 if geom.normal.z >= 0 else -1)
+            if sweep < 0:
+                start, sweep = geom.endPoint, -sweep
+            created = curves.sketchArcs._added(SketchArc(self, geom.center, start, sweep))
+        elif isinstance(geom, Circle3D):
+            created = curves.sketchCircles._added(SketchCircle(self, geom.center, geom.radius))
+        else:
+            created = curves.sketchFixedSplines._added(SketchFixedSpline(self, geom))
+        return ObjectCollection([created])
+
+    def findConnectedCurves(self, curve):
+        calls['Sketch.findConnectedCurves'] += 1
+        curves = self.sketchCurves
+        return ObjectCollection([c for lst in (curves.sketchLines, curves.sketchArcs, curves.sketchCircles,
+                                               curves.sketchFittedSplines, curves.sketchFixedSplines) for c in lst])
+
+
+class Sketches(Base):
+    def __init__(self):
+        self._items = []
+
+    def add(self, planarEntity):
+        calls['Sketches.add'] += 1
+        sketch = Sketch(planarEntity)
+        self._items.append(sketch)
+        return sketch
+
+    def item(self, index):
+        return self._items[index]
+
+    @property
+    def count(self):
+        return len(self._items)
+
+
+# BRep topology
+
+class BRepVertex(Base):
+    def __init__(self, geometry):
+        self.geometry = geometry
+
+
+class BRepEdge(Base):
+    def __init__(self, geometry, startVertex=None, endVertex=None, isParamReversed=False):
+        self.geometry = geometry
+        self.startVertex, self.endVertex = startVertex, endVertex
+        self.isParamReversed = isParamReversed
+        self.tempId = next(_temp_ids)
+        self.faces = ObjectCollection()
+        points = geometry.points if isinstance(geometry, NurbsCurve3D) else []
+        self.evaluator = CurveEvaluator3D(points)
+
+
+class BRepCoEdge(Base):
+    def __init__(self, edge, isOpposedToEdge=False):
+        self.edge, self.isOpposedToEdge = edge, isOpposedToEdge
+
+
+class BRepLoop(Base):
+    def __init__(self, coEdges, isOuter=False):
+        self.coEdges = ObjectCollection(coEdges)
+        self.edges = ObjectCollection([coEdge.edge for coEdge in coEdges])
+        self.isOuter = isOuter
+
+
+class BRepFace(Base):
+    def __init__(self, loops, geometry=None):
+        self.loops = ObjectCollection(loops)
+        self.edges = ObjectCollection([edge for loop in loops for edge in loop.edges])
+        self.geometry = geometry or Plane()
+        self.tempId = next(_temp_ids)
+        self.body = None
+        for edge in self.edges:
+            edge.faces.add(self)
+
+
+class BRepBody(Base):
+    def __init__(self, faces, name='Body', component=None):
+        self.faces = ObjectCollection(faces)
+        self.name = name
+        self.parentComponent = component if component is not None else Component()
+        self.revisionId = str(next(_revisions))
+        for face in faces:
+            face.body = self
+
+
+class BRepBodies(ObjectCollection):
+    pass
+
+
+class Component(Base):
+    def __init__(self, name='Component'):
+        self.name = name
+        self.sketches = Sketches()
+        self.bRepBodies = BRepBodies()
+
+
+class Design(Base):
+    def __init__(self):
+        self.rootComponent = Component()
+
+    @property
+    def allComponents(self):
+        return ObjectCollection([self.rootComponent])
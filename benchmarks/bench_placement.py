@@ -0,0 +1,79 @@
+'''
+Description: Compares the original per-entity addScaledSketchEntities loop against the batched, compute-deferred
+placement engine in flexure_tools.placement, using the stand-in adsk package in this folder.
+Run from the repository root: python benchmarks/bench_placement.py
+'''
+
+import math, os, sys, time
+
+_here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, _here)
+sys.path.insert(1, os.path.dirname(_here))
+
+import adsk, adsk.core, adsk.fusion
+from flexure_tools import placement, profile_store
+
+LIBRARY_DIR = os.path.join(os.path.dirname(_here), 'CreateFlexure_LibraryApproach_v1', 'profile_library')
+
+
+def load_library_profiles():
+    """ Return {'Category/Name': entities} for every profile in the on-disk library. """
+    store = profile_store.ProfileStore(LIBRARY_DIR)
+    return {'{}/{}'.format(category, name): store.load(category, name)
+            for category in store.categories() for name in store.names(category)}
+
+
+def legacy_add_scaled_entities(sketch, entities, offsetX, offsetY, scaleFactor):
+    """ The original addScaledSketchEntities loop, kept here as the baseline. """
+    lines = sketch.sketchCurves.sketchLines
+    arcs = sketch.sketchCurves.sketchArcs
+    circles = sketch.sketchCurves.sketchCircles
+    for entity_type, params in entities:
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            lines.addByTwoPoints(
+                adsk.core.Point3D.create((p1[0] * scaleFactor) + offsetX, (p1[1] * scaleFactor) + offsetY, p1[2]),
+                adsk.core.Point3D.create((p2[0] * scaleFactor) + offsetX, (p2[1] * scaleFactor) + offsetY, p2[2]))
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            radius = math.dist(center, start) * scaleFactor
+            angle = math.atan2(start[1] - center[1], start[0] - center[0])
+            scaled_center = adsk.core.Point3D.create(center[0] * scaleFactor + offsetX, center[1] * scaleFactor + offsetY, center[2])
+            scaled_start = adsk.core.Point3D.create(scaled_center.x + math.cos(angle) * radius,
+                                                    scaled_center.y + math.sin(angle) * radius, start[2])
+            arcs.addByCenterStartSweep(scaled_center, scaled_start, sweep)
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            circles.addByCenterRadius(
+                adsk.core.Point3D.create((center[0] * scaleFactor) + offsetX, (center[1] * scaleFactor) + offsetY, center[2]),
+                radius * scaleFactor)
+
+
+def batched_add_scaled_entities(sketch, entities, offsetX, offsetY, scaleFactor):
+    placement.emit_entities(sketch, placement.scale_entities(entities, offsetX, offsetY, scaleFactor))
+
+
+def measure(add, entities, repeat=20):
+    """ Return (best seconds per placement, API calls per placement, recomputes per placement). """
+    best = float('inf')
+    for _ in range(repeat):
+        adsk.reset_counters()
+        sketch = adsk.fusion.Sketch()
+        start = time.perf_counter()
+        add(sketch, entities, 2.5, -1.25, 0.8)
+        best = min(best, time.perf_counter() - start)
+    return best, sum(adsk.calls.values()), sketch.recomputes
+
+
+def main():
+    print('{:<24}{:>9}{:>14}{:>14}{:>12}{:>12}'.format('profile', 'entities', 'legacy ms', 'batched ms', 'recomputes', 'api calls'))
+    for name, entities in load_library_profiles().items():
+        legacy = measure(legacy_add_scaled_entities, entities)
+        batched = measure(batched_add_scaled_entities, entities)
+        print('{:<24}{:>9}{:>14.3f}{:>14.3f}{:>12}{:>12}'.format(
+            name, len(entities), legacy[0] * 1e3, batched[0] * 1e3,
+            '{}->{}'.format(legacy[2], batched[2]), '{}->{}'.format(legacy[1], batched[1])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+'''
+Description: Workloads for the headless benchmarks: the library profiles, synthetic profiles of any size, and builders
+that turn library entities into stand-in sketches and BRep faces. Also loads the Fusion scripts themselves against
+the stand-in adsk package so their own functions can be timed.
+'''
+
+import importlib.machinery, importlib.util, math, os, sys
+
+_here = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(_here)
+if _here not in sys.path:
+    sys.path.insert(0, _here)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(1, REPO_ROOT)
+
+import adsk, adsk.core, adsk.fusion
+from flexure_tools import profile_store
+
+LIBRARY_DIR = os.path.join(REPO_ROOT, 'CreateFlexure_LibraryApproach_v1', 'profile_library')
+SCRIPTS = {
+    'recreate': os.path.join(REPO_ROOT, 'CreateFlexure_LibraryApproach_v1', 'RecreateSketchFromGeometry_v6.py'),
+    'extract': os.path.join(REPO_ROOT, 'CreateFlexure_LibraryApproach_v1', 'ExtractSketchProfilev3'),
+    'offset': os.path.join(REPO_ROOT, 'Create_Offsets', 'CreateOffset_v4.py'),
+}
+
+
+def load_script(key):
+    """ Import one of the Fusion scripts against the stand-in adsk package. Its module-level run() call is harmless here. """
+    path = SCRIPTS[key]
+    loader = importlib.machinery.SourceFileLoader('fusion_script_' + key, path)
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+
+def library_profiles():
+    """ Return {'Category/Name': entities} for every profile in the on-disk library. """
+    store = profile_store.ProfileStore(LIBRARY_DIR)
+    return {'{}/{}'.format(category, name): store.load(category, name)
+            for category in store.categories() for name in store.names(category)}
+
+
+def synthetic_profile(count, radius=1.0, teeth_depth=0.1):
+    """
+    A closed, non-self-intersecting chain of count entities alternating lines and arcs around a wavy circle.
+
+    Parameters:
+    - count (int): Number of entities (rounded up to an even number).
+    - radius (float): Mean radius of the profile in cm.
+    - teeth_depth (float): Radial amplitude of the alternating vertices.
+    """
+    count += count % 2
+    step = 2 * math.pi / count
+    points = []
+    for i in range(count):
+        r = radius + (teeth_depth if i % 4 in (1, 2) else 0.0)
+        points.append((r * math.cos(i * step), r * math.sin(i * step), 0.0))
+
+    entities = []
+    for i in range(count):
+        p, q = points[i], points[(i + 1) % count]
+        if i % 2 == 0:
+            entities.append(('line', [(p, q)]))
+        else:
+            # Arc through p and q bulging outward by a small sagitta, counter-clockwise about its center
+            mx, my = (p[0] + q[0]) / 2, (p[1] + q[1]) / 2
+            half = math.hypot(q[0] - p[0], q[1] - p[1]) / 2
+            sweep = 0.5
+            arc_radius = half / math.sin(sweep / 2)
+            back = arc_radius * math.cos(sweep / 2)
+            nx, ny = -(q[1] - p[1]) / (2 * half), (q[0] - p[0]) / (2 * half)
+            center = (mx + nx * back, my + ny * back, 0.0)
+            entities.append(('arc', [(center, p, sweep)]))
+    return entities
+
+
+def brep_edge(entity):
+    """ Build a stand-in BRepEdge for one library entity. """
+    P, V = adsk.core.Point3D, adsk.core.Vector3D
+    entity_type, params = entity
+    if entity_type == 'line':
+        [(p1, p2)] = params
+        start, end = P(*p1), P(*p2)
+        return adsk.fusion.BRepEdge(adsk.core.Line3D(start, end), adsk.fusion.BRepVertex(start), adsk.fusion.BRepVertex(end))
+    if entity_type == 'arc':
+        [(center, start, sweep)] = params
+        angle = math.atan2(start[1] - center[1], start[0] - center[0])
+        geom = adsk.core.Arc3D(P(*center), V(0, 0, 1), V(1, 0, 0), math.dist(center, start), angle, angle + sweep)
+        return adsk.fusion.BRepEdge(geom, adsk.fusion.BRepVertex(geom.startPoint), adsk.fusion.BRepVertex(geom.endPoint))
+    if entity_type == 'circle':
+        [(center, radius)] = params
+        return adsk.fusion.BRepEdge(adsk.core.Circle3D(P(*center), V(0, 0, 1), radius))
+    [points] = params
+    points = [P(*p) for p in points]
+    return adsk.fusion.BRepEdge(adsk.core.NurbsCurve3D(points), adsk.fusion.BRepVertex(points[0]), adsk.fusion.BRepVertex(points[-1]))
+
+
+def brep_loop(entities, isOuter=False):
+    """ Build a stand-in BRepLoop whose co-edges follow the entities in order. """
+    return adsk.fusion.BRepLoop([adsk.fusion.BRepCoEdge(brep_edge(entity)) for entity in entities], isOuter)
+
+
+def brep_face(entities):
+    """ Build a stand-in planar BRepFace (on a body) holding the entities as a single loop. """
+    face = adsk.fusion.BRepFace([brep_loop(entities, True)])
+    adsk.fusion.BRepBody([face])
+    return face
+
+
+def sketch_with_entities(entities):
+    """ Build a stand-in sketch containing the entities; returns (sketch, ObjectCollection of its curves). """
+    sketch = adsk.fusion.Sketch()
+    sketch.isComputeDeferred = True
+    curves = adsk.core.ObjectCollection()
+    create = adsk.core.Point3D
+    for entity_type, params in entities:
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            curves.add(sketch.sketchCurves.sketchLines.addByTwoPoints(create(*p1), create(*p2)))
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            curves.add(sketch.sketchCurves.sketchArcs.addByCenterStartSweep(create(*center), create(*start), sweep))
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            curves.add(sketch.sketchCurves.sketchCircles.addByCenterRadius(create(*center), radius))
+    sketch.isComputeDeferred = False
+    return sketch, curves
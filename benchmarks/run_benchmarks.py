@@ -0,0 +1,152 @@
+'''
+Description: Headless benchmark suite for the Fusion scripts in this repository, run against the stand-in adsk package
+in this folder. Each benchmark is timed on every library profile and on synthetic profiles of 10k+ entities, and the
+report lists best wall time, adsk API calls and peak Python allocations per run.
+
+Run from the repository root:
+    python benchmarks/run_benchmarks.py                      # print the report
+    python benchmarks/run_benchmarks.py --save base.json     # also save the numbers
+    python benchmarks/run_benchmarks.py --compare base.json  # flag runs slower than the saved numbers
+'''
+
+import argparse, json, os, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+import adsk, adsk.core, adsk.fusion
+from flexure_tools import extraction, intersect, simplify
+
+MIN_REPEAT = 3
+MIN_SECONDS = 0.2
+REGRESSION_RATIO = 1.25
+REGRESSION_FLOOR = 0.0005  # seconds; smaller slow-downs are timer noise
+
+
+def benchmarks():
+    """
+    Return the benchmark table: name -> (setup, run). setup(entities) builds the inputs outside the timed region and
+    returns the argument tuple passed to run.
+    """
+    recreate = fixtures.load_script('recreate')
+    offset_script = fixtures.load_script('offset')
+    extract_script = fixtures.load_script('extract')
+    design = adsk.core.Application.get().activeProduct
+
+    return {
+        'addScaledSketchEntities': (
+            lambda entities: (adsk.fusion.Sketch(), entities),
+            lambda sketch, entities: recreate.addScaledSketchEntities(sketch, entities, 0.5, -0.25, 1.3)),
+        'preview (fit type change)': (
+            lambda entities: preview_setup(recreate, entities),
+            lambda sketch, profile_id, entities, targets: recreate.placeProfileOnTargets(
+                sketch, profile_id, lambda: entities, targets, 'Loose')),
+        'calculateProfileCentroid': (
+            lambda entities: (fixtures.brep_loop(entities),),
+            recreate.calculateProfileCentroid),
+        'calculate_centroid': (
+            lambda entities: fixtures.sketch_with_entities(entities),
+            offset_script.calculate_centroid),
+        'extract (BRep geometry)': (
+            lambda entities: (fixtures.brep_face(entities),),
+            extraction.extract_face_entities),
+        'simplify_entities': (
+            lambda entities: (entities,),
+            simplify.simplify_entities),
+        'find_profile_intersection': (
+            lambda entities: (entities,),
+            intersect.find_profile_intersection),
+        'extract (sketch projection)': (
+            lambda entities: (design.rootComponent, fixtures.brep_face(entities)),
+            extract_script.extract_face_entities_by_projection),
+    }
+
+
+def preview_setup(recreate, entities):
+    """
+    One circular target whose loop properties and 'Tight' placement are already cached, as they are after the first
+    preview; the timed run is the preview that follows a switch to 'Loose'.
+    """
+    face = fixtures.brep_face([('circle', [((0.0, 0.0, 0.0), 0.5)])])
+    targets = [(recreate.topology_index.face(face), 0, 0.5)]
+    profile_id = ('benchmark', id(entities))
+    recreate.placement_cache.clear()
+    recreate.placeProfileOnTargets(adsk.fusion.Sketch(), profile_id, lambda: entities, targets, 'Tight')
+    return adsk.fusion.Sketch(), profile_id, entities, targets
+
+
+def measure(setup, run, entities):
+    """ Return a dict with best 'seconds', adsk 'api_calls' and 'peak_kib' of allocations for one benchmark run. """
+    best, total, repeat = float('inf'), 0.0, 0
+    while repeat < MIN_REPEAT or total < MIN_SECONDS:
+        args = setup(entities)
+        adsk.reset_counters()
+        start = time.perf_counter()
+        run(*args)
+        elapsed = time.perf_counter() - start
+        best, total, repeat = min(best, elapsed), total + elapsed, repeat + 1
+    api_calls = sum(adsk.calls.values())
+
+    args = setup(entities)
+    tracemalloc.start()
+    run(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'api_calls': api_calls, 'peak_kib': peak / 1024.0}
+
+
+def workloads(sizes):
+    loads = dict(fixtures.library_profiles())
+    for size in sizes:
+        loads['synthetic/{}'.format(size)] = fixtures.synthetic_profile(size)
+    return loads
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='*', default=[10000], help='entity counts of the synthetic profiles')
+    parser.add_argument('--only', help='run only benchmarks whose name contains this text')
+    parser.add_argument('--save', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='compare against results saved earlier with --save')
+    args = parser.parse_args(argv)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    loads = workloads(args.sizes)
+    header = '{:<30}{:<24}{:>9}{:>12}{:>11}{:>12}'.format('benchmark', 'profile', 'entities', 'ms', 'api calls', 'peak KiB')
+    print(header + ('{:>9}'.format('vs base') if baseline else ''))
+    print('-' * (len(header) + (9 if baseline else 0)))
+
+    for name, (setup, run) in benchmarks().items():
+        if args.only and args.only not in name:
+            continue
+        for profile, entities in loads.items():
+            key = '{} | {}'.format(name, profile)
+            result = measure(setup, run, entities)
+            results[key] = result
+            line = '{:<30}{:<24}{:>9}{:>12.3f}{:>11}{:>12.1f}'.format(
+                name, profile, len(entities), result['seconds'] * 1e3, result['api_calls'], result['peak_kib'])
+            if key in baseline:
+                ratio = result['seconds'] / baseline[key]['seconds']
+                line += '{:>8.2f}x'.format(ratio)
+                slower = result['seconds'] - baseline[key]['seconds'] > REGRESSION_FLOOR and ratio > REGRESSION_RATIO
+                if slower or result['api_calls'] > baseline[key]['api_calls']:
+                    regressions.append(key)
+                    line += '  REGRESSION'
+            print(line)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1)
+    if regressions:
+        print('\n{} regression(s) against {}'.format(len(regressions), args.compare))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
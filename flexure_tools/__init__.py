@@ -0,0 +1,5 @@
+'''
+Description: Shared geometry helpers for the Fusion 360 flexure scripts in this repository.
+The modules here do their math on plain Python data (tuples and array('d') buffers) so they run inside
+Fusion's embedded interpreter without extra packages, and only touch the adsk API when emitting geometry.
+'''
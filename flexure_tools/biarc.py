@@ -0,0 +1,250 @@
+'''
+Description: Converts spline fit points into tangent-continuous arcs (biarcs), so spline edges can use the batched
+line/arc placement and the analytic offset instead of being dropped or left to Fusion's NURBS offset.
+Tangents are estimated for all fit points in one pass (from the circle through each point and its neighbours); the
+points are then covered greedily by the longest biarcs whose deviation from the skipped fit points stays within the
+tolerance. Consecutive biarcs share their end points and end tangents, so the whole chain is G1 continuous (a biarc
+whose junction falls within the tolerance of an end is one arc that keeps only its far tangent).
+'''
+
+import math
+from array import array
+
+BIARC_TOLERANCE = 0.001  # cm; maximum distance of any fit point from the arcs that replace it
+_EPSILON = 1e-12
+
+
+def _unit(x, y):
+    length = math.hypot(x, y)
+    return (x / length, y / length) if length > _EPSILON else (0.0, 0.0)
+
+
+def _circle_tangent(x0, y0, x1, y1, x2, y2):
+    """ Unit tangent at (x1, y1) of the circle through the three points, oriented from p0 towards p2. """
+    ax, ay, bx, by = x0 - x1, y0 - y1, x2 - x1, y2 - y1
+    d = 2 * (ax * by - ay * bx)
+    if abs(d) <= _EPSILON * (ax * ax + ay * ay + bx * bx + by * by):
+        return _unit(x2 - x0, y2 - y0)  # Collinear: the chord direction
+    a2, b2 = ax * ax + ay * ay, bx * bx + by * by
+    cx, cy = (by * a2 - ay * b2) / d, (ax * b2 - bx * a2) / d  # Circumcenter relative to p1
+    tx, ty = cy, -cx  # Perpendicular to the radius
+    if tx * (x2 - x0) + ty * (y2 - y0) < 0:
+        tx, ty = -tx, -ty
+    return _unit(tx, ty)
+
+
+def _end_tangent(xa, ya, xb, yb, xc, yc):
+    """ Unit tangent at the end point a of the circle through a, b, c, pointing from a towards b. """
+    ax, ay, bx, by = xb - xa, yb - ya, xc - xa, yc - ya
+    d = 2 * (ax * by - ay * bx)
+    if abs(d) <= _EPSILON * (ax * ax + ay * ay + bx * bx + by * by):
+        return _unit(ax, ay)
+    a2, b2 = ax * ax + ay * ay, bx * bx + by * by
+    cx, cy = (by * a2 - ay * b2) / d, (ax * b2 - bx * a2) / d  # Circumcenter relative to a
+    tx, ty = cy, -cx
+    if tx * ax + ty * ay < 0:
+        tx, ty = -tx, -ty
+    return _unit(tx, ty)
+
+
+def estimate_tangents(xs, ys, closed):
+    """
+    Estimate the unit tangent at every fit point.
+
+    Parameters:
+    - xs, ys (array('d')): Fit point coordinates.
+    - closed (bool): The spline is periodic (first and last point coincide); its ends use the wrapped neighbours.
+
+    Returns:
+    - Tuple: (tx, ty) arrays of unit tangent components.
+    """
+    n = len(xs)
+    tx, ty = array('d', bytes(8 * n)), array('d', bytes(8 * n))
+    for i in range(1, n - 1):
+        tx[i], ty[i] = _circle_tangent(xs[i - 1], ys[i - 1], xs[i], ys[i], xs[i + 1], ys[i + 1])
+    if closed and n > 3:
+        tx[0], ty[0] = _circle_tangent(xs[n - 2], ys[n - 2], xs[0], ys[0], xs[1], ys[1])
+        tx[n - 1], ty[n - 1] = tx[0], ty[0]
+    elif n > 2:
+        tx[0], ty[0] = _end_tangent(xs[0], ys[0], xs[1], ys[1], xs[2], ys[2])
+        ex, ey = _end_tangent(xs[n - 1], ys[n - 1], xs[n - 2], ys[n - 2], xs[n - 3], ys[n - 3])
+        tx[n - 1], ty[n - 1] = -ex, -ey
+    else:
+        tx[0], ty[0] = tx[n - 1], ty[n - 1] = _unit(xs[n - 1] - xs[0], ys[n - 1] - ys[0])
+    return tx, ty
+
+
+def _arc(px, py, tx, ty, qx, qy, tolerance):
+    """
+    The arc leaving (px, py) along (tx, ty) and ending at (qx, qy).
+
+    Returns:
+    - Tuple: ('line', px, py, qx, qy) when the arc is flatter than a fraction of the tolerance, otherwise
+      ('arc', cx, cy, radius, start_angle, signed_sweep) with a positive sweep for counter-clockwise arcs.
+    """
+    vx, vy = qx - px, qy - py
+    chord2 = vx * vx + vy * vy
+    normal_dot = -ty * vx + tx * vy  # Component of the chord along the left normal
+    if chord2 < _EPSILON or abs(normal_dot) <= _EPSILON * math.sqrt(chord2):
+        return ('line', px, py, qx, qy)
+    s = chord2 / (2 * normal_dot)  # Signed distance from p to the center along the left normal
+    cx, cy = px - ty * s, py + tx * s
+    radius = abs(s)
+    start = math.atan2(py - cy, px - cx)
+    sweep = math.atan2(qy - cy, qx - cx) - start
+    if s > 0 and sweep < 0:
+        sweep += 2 * math.pi
+    elif s < 0 and sweep > 0:
+        sweep -= 2 * math.pi
+    if radius * (1 - math.cos(sweep / 2)) <= 1e-3 * tolerance:
+        return ('line', px, py, qx, qy)
+    return ('arc', cx, cy, radius, start, sweep)
+
+
+def _arc_into(qx, qy, px, py, tx, ty, tolerance):
+    """ The arc from (qx, qy) ending at (px, py) along (tx, ty), in the _arc form; built backwards from p, then reversed. """
+    piece = _arc(px, py, -tx, -ty, qx, qy, tolerance)
+    if piece[0] == 'line':
+        return ('line', qx, qy, px, py)
+    return ('arc', piece[1], piece[2], piece[3], piece[4] + piece[5], -piece[5])
+
+
+def biarc(p1, t1, p2, t2, tolerance=BIARC_TOLERANCE):
+    """
+    The two arcs joining p1 (tangent t1) to p2 (tangent t2) with equal tangent lengths on both sides.
+
+    Returns:
+    - list: One or two pieces in the _arc form, always running from p1 to p2. When the junction lies within the
+      tolerance of p1 or p2, the short half is left out and the other is rebuilt as one arc from p1 to p2, keeping
+      the tangent at the far end, so consecutive biarcs still meet.
+    """
+    vx, vy = p2[0] - p1[0], p2[1] - p1[1]
+    sx, sy = t1[0] + t2[0], t1[1] + t2[1]
+    v_dot_t = vx * sx + vy * sy
+    denominator = 2 * (1 - (t1[0] * t2[0] + t1[1] * t2[1]))
+    if abs(denominator) < _EPSILON:
+        v_dot_t2 = vx * t2[0] + vy * t2[1]
+        if abs(v_dot_t2) < _EPSILON:
+            return [_arc(p1[0], p1[1], t1[0], t1[1], p2[0], p2[1], tolerance)]
+        d = (vx * vx + vy * vy) / (4 * v_dot_t2)
+    else:
+        d = (-v_dot_t + math.sqrt(max(v_dot_t * v_dot_t + denominator * (vx * vx + vy * vy), 0.0))) / denominator
+    mx = (p1[0] + p2[0] + d * (t1[0] - t2[0])) / 2
+    my = (p1[1] + p2[1] + d * (t1[1] - t2[1])) / 2
+
+    first_short = math.hypot(mx - p1[0], my - p1[1]) <= tolerance
+    second_short = math.hypot(p2[0] - mx, p2[1] - my) <= tolerance
+    if first_short and second_short:
+        return [('line', p1[0], p1[1], p2[0], p2[1])]
+    if first_short:
+        return [_arc_into(p1[0], p1[1], p2[0], p2[1], t2[0], t2[1], tolerance)]
+    if second_short:
+        return [_arc(p1[0], p1[1], t1[0], t1[1], p2[0], p2[1], tolerance)]
+    # The second half is built backwards from p2 so it ends exactly on the given tangent
+    pieces = [_arc(p1[0], p1[1], t1[0], t1[1], mx, my, tolerance),
+              _arc_into(mx, my, p2[0], p2[1], t2[0], t2[1], tolerance)]
+    if all(piece[0] == 'line' for piece in pieces) and \
+            _distance(('line', p1[0], p1[1], p2[0], p2[1]), mx, my) <= 1e-3 * tolerance:
+        return [('line', p1[0], p1[1], p2[0], p2[1])]  # Straight run: one line instead of two
+    return pieces
+
+
+def _distance(piece, x, y):
+    """ Distance from (x, y) to a piece in the _arc form. """
+    if piece[0] == 'line':
+        _, ax, ay, bx, by = piece
+        dx, dy = bx - ax, by - ay
+        length2 = dx * dx + dy * dy
+        t = 0.0 if length2 == 0 else min(max(((x - ax) * dx + (y - ay) * dy) / length2, 0.0), 1.0)
+        return math.hypot(x - ax - t * dx, y - ay - t * dy)
+    _, cx, cy, radius, start, sweep = piece
+    offset = (math.atan2(y - cy, x - cx) - start) * (1 if sweep > 0 else -1) % (2 * math.pi)
+    if offset <= abs(sweep):
+        return abs(math.hypot(x - cx, y - cy) - radius)
+    end = start + sweep
+    return min(math.hypot(x - cx - radius * math.cos(start), y - cy - radius * math.sin(start)),
+               math.hypot(x - cx - radius * math.cos(end), y - cy - radius * math.sin(end)))
+
+
+def _fits(pieces, xs, ys, first, last, tolerance):
+    for k in range(first + 1, last):
+        if min(_distance(piece, xs[k], ys[k]) for piece in pieces) > tolerance:
+            return False
+    return True
+
+
+def fit_points(points, tolerance=BIARC_TOLERANCE):
+    """
+    Replace a fitted spline by tangent-continuous lines and arcs.
+
+    Parameters:
+    - points (list): Spline fit points as (x, y, z) tuples, in order.
+    - tolerance (float): Maximum distance of any fit point from the result.
+
+    Returns:
+    - list: Library entities ('line' and 'arc', arcs with positive sweeps) covering the spline from first to last point.
+    """
+    n = len(points)
+    if n < 2:
+        return []
+    z = points[0][2]
+    xs = array('d', (p[0] for p in points))
+    ys = array('d', (p[1] for p in points))
+    closed = n > 3 and math.hypot(xs[0] - xs[-1], ys[0] - ys[-1]) <= tolerance
+    tx, ty = estimate_tangents(xs, ys, closed)
+
+    pieces = []
+    i = 0
+    while i < n - 1:
+        def span(j):
+            return biarc((xs[i], ys[i]), (tx[i], ty[i]), (xs[j], ys[j]), (tx[j], ty[j]), tolerance)
+
+        # Gallop to an end point that no longer fits, then binary search back to the last one that does
+        good, step = i + 1, 1
+        best = span(good)
+        while good + step < n:
+            candidate = span(good + step)
+            if not _fits(candidate, xs, ys, i, good + step, tolerance):
+                break
+            good, best, step = good + step, candidate, step * 2
+        low, high = good, min(good + step, n)
+        while high - low > 1:
+            middle = (low + high) // 2
+            candidate = span(middle)
+            if _fits(candidate, xs, ys, i, middle, tolerance):
+                low, best = middle, candidate
+            else:
+                high = middle
+        pieces.extend(best)
+        i = low
+
+    entities = []
+    for piece in pieces:
+        if piece[0] == 'line':
+            _, ax, ay, bx, by = piece
+            entities.append(('line', [((ax, ay, z), (bx, by, z))]))
+        else:
+            _, cx, cy, radius, start, sweep = piece
+            if sweep < 0:
+                start, sweep = start + sweep, -sweep
+            entities.append(('arc', [((cx, cy, z), (cx + radius * math.cos(start), cy + radius * math.sin(start), z), sweep)]))
+    return entities
+
+
+def splines_to_arcs(entities, tolerance=BIARC_TOLERANCE):
+    """
+    Return the entities with every 'spline' entry replaced by its biarc fit; other entries are passed through.
+
+    Parameters:
+    - entities (list): Profile entities in the library format.
+    - tolerance (float): Maximum distance of any spline fit point from its arcs.
+    """
+    if not any(entity_type == 'spline' for entity_type, _ in entities):
+        return entities
+    converted = []
+    for entity_type, params in entities:
+        if entity_type == 'spline':
+            converted.extend(fit_points(params[0], tolerance))
+        else:
+            converted.append((entity_type, params))
+    return converted
@@ -0,0 +1,407 @@
+'''
+Description: Streaming DXF importer for the profile library, so new flexures can be added from vendor drawings without
+Fusion. The file is read one group code pair at a time and only the ENTITIES section is parsed, one entity at a time,
+straight into the flat buffers of a Profile; nothing else of the drawing is kept, so memory follows the size of the
+imported geometry rather than of the file.
+LINE, ARC, CIRCLE, LWPOLYLINE and 2D POLYLINE (with bulges) and SPLINE are read; splines keep their fit points, or
+are sampled along their control polygon when the file has none. Every shape is then normalized to the library
+convention: centered on its bore (the hole the mating piece sits in) and scaled so the bore has a radius of 1 cm, as
+the placement script's standardDiameter expects. Drawing units therefore do not matter.
+'''
+
+import argparse, bisect, math, os, sys
+from collections import Counter, OrderedDict
+
+from . import loops, simplify
+from .profile import Profile, LINE, ARC, CIRCLE, SPLINE, LINE_STRIDE, ARC_STRIDE, CIRCLE_STRIDE, POINT_STRIDE
+from .profile_store import ProfileStore
+
+INNER_RADIUS = 1.0       # cm; bore radius of every library profile
+SPLINE_SAMPLES = 4       # Points sampled per control point of a spline that has no fit points
+BULGE_TOLERANCE = 1e-12  # Polyline bulges smaller than this are straight segments
+DXF_ENCODING = 'utf-8'   # R2007+ files are UTF-8; undecodable bytes of older files are replaced (only text is affected)
+
+
+def group_codes(stream):
+    """
+    Yield the (code, value) pairs of a DXF text stream, one at a time.
+
+    Parameters:
+    - stream (file): DXF file opened in text mode.
+    """
+    lines = iter(stream)
+    for code in lines:
+        value = next(lines, '')
+        yield int(code), value.strip()
+
+
+def _entity_groups(pairs):
+    """ Yield (entity type, [(code, value), ...]) for every entity of the ENTITIES section. """
+    section, kind, groups = None, None, []
+    expect_name = False
+    for code, value in pairs:
+        if code != 0:
+            if expect_name and code == 2:
+                section, expect_name = value, False
+            elif kind is not None:
+                groups.append((code, value))
+            continue
+        if kind is not None:
+            yield kind, groups
+            kind, groups = None, []
+        if value == 'SECTION':
+            expect_name = True
+        elif value == 'ENDSEC':
+            section = None
+        elif value == 'EOF':
+            return
+        elif section == 'ENTITIES':
+            kind = value
+
+
+def _add_line(profile, x1, y1, x2, y2):
+    profile.lines.extend((x1, y1, 0.0, x2, y2, 0.0))
+    profile.order.append(LINE)
+
+
+def _add_arc(profile, cx, cy, radius, start, sweep):
+    """ Add an arc counter-clockwise from the start angle (radians); a negative sweep is stored from its other end. """
+    if sweep < 0:
+        start, sweep = start + sweep, -sweep
+    profile.arcs.extend((cx, cy, 0.0, cx + radius * math.cos(start), cy + radius * math.sin(start), 0.0, sweep))
+    profile.order.append(ARC)
+
+
+def _add_bulge(profile, x1, y1, x2, y2, bulge):
+    """ Add a polyline segment: a line, or an arc whose sweep is 4 * atan(bulge) (counter-clockwise if positive). """
+    if abs(bulge) < BULGE_TOLERANCE:
+        _add_line(profile, x1, y1, x2, y2)
+        return
+    chord = math.hypot(x2 - x1, y2 - y1)
+    if chord == 0:
+        return
+    sweep = 4 * math.atan(bulge)
+    radius = abs(chord / (2 * math.sin(sweep / 2)))
+    # The center lies off the chord midpoint, to the left of the chord for a counter-clockwise arc under pi
+    offset = chord / 2 / math.tan(sweep / 2)
+    cx = (x1 + x2) / 2 - offset * (y2 - y1) / chord
+    cy = (y1 + y2) / 2 + offset * (x2 - x1) / chord
+    _add_arc(profile, cx, cy, radius, math.atan2(y1 - cy, x1 - cx), sweep)
+
+
+def _add_spline(profile, points):
+    if len(points) < 2:
+        return
+    for x, y in points:
+        profile.spline_points.extend((x, y, 0.0))
+    profile.spline_counts.append(len(points))
+    profile.order.append(SPLINE)
+
+
+def _nurbs_points(degree, knots, controls, weights):
+    """ Sample a NURBS curve at evenly spaced parameters with de Boor's algorithm. """
+    n = len(controls)
+    if degree < 1 or n <= degree or len(knots) != n + degree + 1:
+        return [(x, y) for x, y in controls]
+    homogeneous = [(x * w, y * w, w) for (x, y), w in zip(controls, weights)]
+    low, high = knots[degree], knots[n]
+    points = []
+    count = SPLINE_SAMPLES * n
+    for step in range(count + 1):
+        u = low + (high - low) * step / count
+        k = min(max(bisect.bisect_right(knots, u) - 1, degree), n - 1)
+        d = [list(homogeneous[j + k - degree]) for j in range(degree + 1)]
+        for r in range(1, degree + 1):
+            for j in range(degree, r - 1, -1):
+                span = knots[j + 1 + k - r] - knots[j + k - degree]
+                alpha = (u - knots[j + k - degree]) / span if span else 0.0
+                d[j] = [(1.0 - alpha) * a + alpha * b for a, b in zip(d[j - 1], d[j])]
+        x, y, w = d[degree]
+        points.append((x / w, y / w))
+    return points
+
+
+class _Reader:
+    """ Converts entity groups into Profile entities, one Profile per shape (the whole file, or each layer). """
+
+    def __init__(self, by_layer):
+        self.by_layer = by_layer
+        self.shapes = OrderedDict()
+        self.skipped = Counter()
+        self._polyline = None  # (profile, flags, mirrored, vertices) of an open POLYLINE ... SEQEND sequence
+
+    def _shape(self, groups):
+        key = None
+        if self.by_layer:
+            key = next((value for code, value in groups if code == 8), '0')
+        profile = self.shapes.get(key)
+        if profile is None:
+            profile = self.shapes[key] = Profile()
+        return profile
+
+    @staticmethod
+    def _mirrored(values, kind):
+        """ True if the entity's object coordinate system is mirrored (extrusion 0, 0, -1); errors if it is tilted. """
+        nx, ny, nz = values.get(210, 0.0), values.get(220, 0.0), values.get(230, 1.0)
+        if abs(nx) > 1e-9 or abs(ny) > 1e-9:
+            raise ValueError('{} entity is not parallel to the XY plane; flatten the drawing first'.format(kind))
+        return nz < 0
+
+    def add(self, kind, groups):
+        values = {}
+        for code, value in groups:
+            if code in (10, 20, 30, 11, 21, 31, 40, 41, 42, 50, 51, 210, 220, 230):
+                values.setdefault(code, float(value))
+            elif code in (70, 71):
+                values.setdefault(code, int(value))
+
+        if self._polyline is not None and kind != 'VERTEX':
+            self._end_polyline()
+        if kind == 'LINE':
+            _add_line(self._shape(groups), values[10], values[20], values[11], values[21])
+        elif kind in ('ARC', 'CIRCLE'):
+            sign = -1.0 if self._mirrored(values, kind) else 1.0
+            profile, cx, cy, radius = self._shape(groups), sign * values[10], values[20], values[40]
+            if kind == 'CIRCLE':
+                profile.circles.extend((cx, cy, 0.0, radius))
+                profile.order.append(CIRCLE)
+            else:
+                start, end = math.radians(values[50]), math.radians(values[51])
+                if sign < 0:
+                    # Counter-clockwise about -Z is clockwise in the XY plane, and x is mirrored
+                    start, end = math.pi - end, math.pi - start
+                sweep = (end - start) % (2 * math.pi) or 2 * math.pi
+                _add_arc(profile, cx, cy, radius, start, sweep)
+        elif kind == 'LWPOLYLINE':
+            vertices = []
+            for code, value in groups:
+                if code == 10:
+                    vertices.append([float(value), 0.0, 0.0])
+                elif code == 20 and vertices:
+                    vertices[-1][1] = float(value)
+                elif code == 42 and vertices:
+                    vertices[-1][2] = float(value)
+            self._add_polyline(self._shape(groups), vertices, values.get(70, 0), self._mirrored(values, kind))
+        elif kind == 'POLYLINE':
+            flags = values.get(70, 0)
+            if flags & (8 | 16 | 64):  # 3D polylines and meshes are not profiles
+                self.skipped[kind] += 1
+            self._polyline = (self._shape(groups), flags, self._mirrored(values, kind), [])
+        elif kind == 'VERTEX':
+            if self._polyline is not None:
+                self._polyline[3].append([values.get(10, 0.0), values.get(20, 0.0), values.get(42, 0.0)])
+        elif kind == 'SEQEND':
+            pass
+        elif kind == 'SPLINE':
+            fit, controls, knots, weights = [], [], [], []
+            for code, value in groups:
+                if code in (11, 10):
+                    (fit if code == 11 else controls).append([float(value), 0.0])
+                elif code in (21, 20):
+                    target = fit if code == 21 else controls
+                    if target:
+                        target[-1][1] = float(value)
+                elif code == 40:
+                    knots.append(float(value))
+                elif code == 41:
+                    weights.append(float(value))
+            if not fit:
+                if len(weights) != len(controls):
+                    weights = [1.0] * len(controls)
+                fit = _nurbs_points(values.get(71, 3), knots, controls, weights)
+            _add_spline(self._shape(groups), fit)
+        else:
+            self.skipped[kind] += 1
+
+    def _end_polyline(self):
+        profile, flags, mirrored, vertices = self._polyline
+        self._polyline = None
+        if not flags & (8 | 16 | 64):
+            self._add_polyline(profile, vertices, flags, mirrored)
+
+    @staticmethod
+    def _add_polyline(profile, vertices, flags, mirrored):
+        if mirrored:
+            vertices = [[-x, y, -bulge] for x, y, bulge in vertices]
+        pairs = list(zip(vertices, vertices[1:]))
+        if flags & 1 and len(vertices) > 2:
+            pairs.append((vertices[-1], vertices[0]))
+        for (x1, y1, bulge), (x2, y2, _) in pairs:
+            _add_bulge(profile, x1, y1, x2, y2, bulge)
+
+    def close(self):
+        if self._polyline is not None:
+            self._end_polyline()
+
+
+def read_dxf(path, by_layer=False):
+    """
+    Read the supported entities of a DXF file into Profiles.
+
+    Parameters:
+    - path (str): The DXF file (ASCII DXF, any version).
+    - by_layer (bool): Return one shape per layer instead of one for the whole file.
+
+    Returns:
+    - Tuple: (shapes, skipped) where shapes maps the layer name (None for the whole file) to a Profile in drawing
+      coordinates, and skipped is a Counter of the entity types that were not imported.
+    """
+    reader = _Reader(by_layer)
+    with open(path, 'r', encoding=DXF_ENCODING, errors='replace') as f:
+        for kind, groups in _entity_groups(group_codes(f)):
+            reader.add(kind, groups)
+    reader.close()
+    return reader.shapes, reader.skipped
+
+
+def _segment_distance(x, y, x1, y1, x2, y2):
+    dx, dy = x2 - x1, y2 - y1
+    length2 = dx * dx + dy * dy
+    t = min(max(((x - x1) * dx + (y - y1) * dy) / length2, 0.0), 1.0) if length2 else 0.0
+    return math.hypot(x - x1 - t * dx, y - y1 - t * dy)
+
+
+def nearest_distance(profile, x, y):
+    """ Distance from (x, y) to the nearest point of a profile's curves (splines through their fit points). """
+    best = math.inf
+    lines = profile.lines
+    for i in range(0, len(lines), LINE_STRIDE):
+        best = min(best, _segment_distance(x, y, lines[i], lines[i + 1], lines[i + 3], lines[i + 4]))
+    for cx, cy, radius, start, sweep in profile._arc_geometry():
+        offset = (math.atan2(y - cy, x - cx) - start) % (2 * math.pi)
+        if offset <= sweep:
+            best = min(best, abs(math.hypot(x - cx, y - cy) - radius))
+        else:
+            for angle in (start, start + sweep):
+                best = min(best, math.hypot(x - cx - radius * math.cos(angle), y - cy - radius * math.sin(angle)))
+    circles = profile.circles
+    for i in range(0, len(circles), CIRCLE_STRIDE):
+        best = min(best, abs(math.hypot(x - circles[i], y - circles[i + 1]) - circles[i + 3]))
+    points, start = profile.spline_points, 0
+    for count in profile.spline_counts:
+        end = start + count * POINT_STRIDE
+        for i in range(start, end - POINT_STRIDE, POINT_STRIDE):
+            best = min(best, _segment_distance(x, y, points[i], points[i + 1], points[i + 3], points[i + 4]))
+        start = end
+    return best
+
+
+def find_bore(profile):
+    """
+    Locate the bore of a profile: the round hole its mating piece sits in.
+
+    The center is that of the circle, or arc sweeping at least half a turn, that encloses the profile's centroid (the
+    one centered nearest it if there are several); a profile with no such curve (a bore made of many short arcs or
+    lines) is taken to be centered on its centroid. The bore radius is the distance from that center to the nearest
+    point of the profile.
+
+    Returns:
+    - Tuple: (cx, cy, radius).
+    """
+    centroid = profile.centroid()
+    if centroid is None:
+        raise ValueError('The shape has no length to normalize')
+    candidates = [(cx, cy, r) for cx, cy, r, _, sweep in profile._arc_geometry() if sweep >= math.pi]
+    circles = profile.circles
+    candidates += [(circles[i], circles[i + 1], circles[i + 3]) for i in range(0, len(circles), CIRCLE_STRIDE)]
+    enclosing = [(math.hypot(cx - centroid[0], cy - centroid[1]), cx, cy) for cx, cy, r in candidates
+                 if math.hypot(cx - centroid[0], cy - centroid[1]) < r]
+    _, cx, cy = min(enclosing, default=(0.0, centroid[0], centroid[1]))
+    radius = nearest_distance(profile, cx, cy)
+    if radius <= 0:
+        raise ValueError('The shape has no bore: its center ({:.4g}, {:.4g}) lies on the geometry'.format(cx, cy))
+    return cx, cy, radius
+
+
+def normalize(profile, bore=None):
+    """
+    Center a profile on its bore and scale it so the bore radius is INNER_RADIUS, in place.
+
+    Parameters:
+    - profile (Profile): The shape, in drawing coordinates.
+    - bore (tuple): (cx, cy, radius) to use instead of find_bore's.
+
+    Returns:
+    - Tuple: The (cx, cy, radius) bore used, in drawing coordinates.
+    """
+    cx, cy, radius = bore or find_bore(profile)
+    scale = INNER_RADIUS / radius
+    profile.transform(scale, -cx * scale, -cy * scale)
+    return cx, cy, radius
+
+
+def import_dxf(path, store, category, name=None, by_layer=False, simplify_tolerance=None, symmetry_tolerance=None,
+               save=True):
+    """
+    Read a DXF file, normalize every shape in it and add each one to a profile store.
+
+    Parameters:
+    - path (str): The DXF file.
+    - store (ProfileStore): The library to add to.
+    - category (str): Category of the new profiles.
+    - name (str): Profile name; defaults to the file name. With by_layer, the layer name is appended.
+    - by_layer (bool): Import each layer as its own profile.
+    - simplify_tolerance (float): If set, each profile goes through simplify.simplify_entities with this tolerance (cm).
+    - symmetry_tolerance (float): Passed to ProfileStore.add, storing symmetric profiles as one sector.
+    - save (bool): Rewrite the store's index.json afterwards. Pass False when importing many files and save once.
+
+    Returns:
+    - Tuple: (entries, skipped), the new index entries and a Counter of the entity types that were not imported.
+
+    Raises ValueError if the file cannot be parsed or a shape has no bore; nothing of the file is added then.
+    """
+    shapes, skipped = read_dxf(path, by_layer)
+    name = name or os.path.splitext(os.path.basename(path))[0]
+    # Normalize every shape before adding any, so a file with one bad layer leaves the store untouched
+    bores = [(layer, profile, normalize(profile)) for layer, profile in shapes.items() if len(profile)]
+    entries = []
+    for layer, profile, (cx, cy, radius) in bores:
+        entities = loops.ordered_entities(list(profile))
+        metadata = {'source': os.path.basename(path), 'bore': [cx, cy, radius]}
+        if layer is not None:
+            metadata['layer'] = layer
+        if simplify_tolerance is not None:
+            entities, reduction = simplify.simplify_entities(entities, simplify_tolerance)
+            metadata['reduction'] = reduction.as_dict()
+        profile_name = name if layer is None else '{} {}'.format(name, layer)
+        entries.append(store.add(category, profile_name, Profile.from_entities(entities), save=False, metadata=metadata,
+                                 symmetry_tolerance=symmetry_tolerance))
+    if save:
+        store.save()
+    return entries, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Import DXF drawings into a flexure profile library.')
+    parser.add_argument('library', help='profile library folder (holding index.json)')
+    parser.add_argument('category', help='category to add the profiles to')
+    parser.add_argument('files', nargs='+', help='DXF files; each becomes one profile (or one per layer)')
+    parser.add_argument('--by-layer', action='store_true', help='import each layer as its own profile')
+    parser.add_argument('--simplify', type=float, default=simplify.SIMPLIFY_TOLERANCE,
+                        help='simplify tolerance in cm (0 keeps every entity)')
+    parser.add_argument('--symmetry', type=float, help='store profiles symmetric within this tolerance (cm) compressed')
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.library)
+    failed = 0
+    for path in args.files:
+        try:
+            entries, skipped = import_dxf(path, store, args.category, by_layer=args.by_layer,
+                                          simplify_tolerance=args.simplify or None, symmetry_tolerance=args.symmetry,
+                                          save=False)
+        except (OSError, ValueError) as e:
+            # Skip the file but keep going: the payloads of the files already added still need the index saved below
+            print('{}: not imported: {}'.format(path, e), file=sys.stderr)
+            failed += 1
+            continue
+        for entry in entries:
+            print('{}: added {}/{} ({} lines, {} arcs, {} circles, {} splines)'.format(
+                path, entry['category'], entry['name'], entry['lines'], entry['arcs'], entry['circles'], entry['splines']))
+        if skipped:
+            print('{}: skipped {}'.format(path, ', '.join('{} {}'.format(n, kind) for kind, n in skipped.most_common())))
+    store.save()
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+'''
+Description: Headless SVG and R12 DXF export of library profiles, for reviewing and diffing the library without Fusion.
+A single profile, or a whole library laid out as a contact sheet (one labelled cell per profile, all at the same
+scale), is written straight from the stored entity data. The writers stream: the document header is sized from the
+bounding radii in the index, then each entity is written as it is read and each payload is dropped once written, so
+neither a large profile nor a large library is ever held as a document in memory.
+Splines are written through their biarc fit (flexure_tools.biarc), as they are offset and checked elsewhere.
+
+Usage: python -m flexure_tools.export LIBRARY_FOLDER OUTPUT.svg|OUTPUT.dxf [--profile CATEGORY/NAME] [--columns N]
+'''
+
+import argparse, math, os, re, sys
+
+from . import biarc
+from .profile import Profile
+from .profile_store import ProfileStore
+
+DIGITS = 6           # Decimals written per coordinate (cm); 1e-6 cm is well below the library tolerances
+CELL_MARGIN = 0.15   # Contact sheet cell padding, as a fraction of the largest bounding radius
+LABEL_HEIGHT = 0.08  # Contact sheet label height, as a fraction of the largest bounding radius
+LAYER_LENGTH = 31    # Longest layer name R12 readers accept
+LABEL_LAYER = 'LABELS'
+
+
+def _number(value):
+    text = '{:.{}f}'.format(value, DIGITS).rstrip('0').rstrip('.')
+    return '0' if text in ('-0', '') else text
+
+
+def _segments(entities):
+    """ Yield the entities one at a time, each spline replaced by the lines and arcs of its biarc fit. """
+    for entity in entities:
+        if entity[0] == 'spline':
+            yield from biarc.splines_to_arcs([entity])
+        else:
+            yield entity
+
+
+class SvgWriter:
+    """
+    Streams profiles into an SVG document. Coordinates stay in cm with y pointing up (the y axis is flipped as each
+    value is written), and every profile becomes one path element.
+    """
+
+    def __init__(self, stream, min_x, min_y, max_x, max_y):
+        """
+        Parameters:
+        - stream (file): Text stream to write to.
+        - min_x, min_y, max_x, max_y (float): Extent of everything that will be written, in cm.
+        """
+        self.stream = stream
+        width, height = max_x - min_x, max_y - min_y
+        stream.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        stream.write('<svg xmlns="http://www.w3.org/2000/svg" width="{w}cm" height="{h}cm" viewBox="{x} {y} {w} {h}">\n'
+                     .format(x=_number(min_x), y=_number(-max_y), w=_number(width), h=_number(height)))
+        stream.write('<g fill="none" stroke="black" stroke-width="1" vector-effect="non-scaling-stroke">\n')
+
+    def profile(self, entities, dx=0.0, dy=0.0, name=None):
+        """ Write one profile as a path, moved by (dx, dy). """
+        write = self.stream.write
+        write('<path{} d="'.format(' id="{}"'.format(_escape(name)) if name else ''))
+        for entity_type, params in _segments(entities):
+            if entity_type == 'line':
+                [(p1, p2)] = params
+                write('M{} {}L{} {}'.format(_number(p1[0] + dx), _number(-p1[1] - dy),
+                                            _number(p2[0] + dx), _number(-p2[1] - dy)))
+            elif entity_type == 'arc':
+                [(center, start, sweep)] = params
+                radius = math.hypot(start[0] - center[0], start[1] - center[1])
+                end = math.atan2(start[1] - center[1], start[0] - center[0]) + sweep
+                # Counter-clockwise with y up is the negative sweep direction once y points down
+                write('M{} {}A{r} {r} 0 {} 0 {} {}'.format(
+                    _number(start[0] + dx), _number(-start[1] - dy), 1 if sweep > math.pi else 0,
+                    _number(center[0] + radius * math.cos(end) + dx), _number(-center[1] - radius * math.sin(end) - dy),
+                    r=_number(radius)))
+            elif entity_type == 'circle':
+                [(center, radius)] = params
+                x, y, r = center[0] + dx, -center[1] - dy, _number(radius)
+                write('M{x1} {y}A{r} {r} 0 1 0 {x0} {y}A{r} {r} 0 1 0 {x1} {y}'.format(
+                    x1=_number(x + radius), x0=_number(x - radius), y=_number(y), r=r))
+        write('"/>\n')
+
+    def label(self, text, x, y, height):
+        """ Write a centered text label with its baseline at (x, y). """
+        self.stream.write('<text x="{}" y="{}" font-size="{}" text-anchor="middle" fill="black" stroke="none">{}</text>\n'
+                          .format(_number(x), _number(-y), _number(height), _escape(text)))
+
+    def close(self):
+        self.stream.write('</g>\n</svg>\n')
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('"', '&quot;')
+
+
+class DxfWriter:
+    """
+    Streams profiles into an AutoCAD R12 (AC1009) DXF file: LINE, ARC and CIRCLE entities in cm, one layer per profile,
+    and TEXT for contact sheet labels. R12 is the version every CAD package and DXF library reads.
+    """
+
+    def __init__(self, stream, min_x, min_y, max_x, max_y):
+        """
+        Parameters:
+        - stream (file): Text stream to write to.
+        - min_x, min_y, max_x, max_y (float): Extent of everything that will be written, in cm.
+        """
+        self.stream = stream
+        self._layers = {LABEL_LAYER}
+        self._codes(0, 'SECTION', 2, 'HEADER', 9, '$ACADVER', 1, 'AC1009',
+                    9, '$EXTMIN', 10, _number(min_x), 20, _number(min_y), 30, 0,
+                    9, '$EXTMAX', 10, _number(max_x), 20, _number(max_y), 30, 0,
+                    0, 'ENDSEC', 0, 'SECTION', 2, 'ENTITIES')
+
+    def _codes(self, *pairs):
+        self.stream.write(''.join('{}\n{}\n'.format(pairs[k], pairs[k + 1]) for k in range(0, len(pairs), 2)))
+
+    def _layer(self, name):
+        """
+        A layer name for a profile, unique within the file. R12 names are short and upper case, so distinct profile
+        names can reduce to the same layer; the later ones get a number suffix, keeping each profile on its own layer
+        (dxf_import --by-layer reads them back apart).
+        """
+        base = layer = re.sub(r'[^A-Z0-9_$-]+', '_', (name or '0').upper())[:LAYER_LENGTH]
+        position = len(self._layers)
+        while layer in self._layers:
+            suffix = '_{}'.format(position)
+            layer = base[:LAYER_LENGTH - len(suffix)] + suffix
+            position += 1
+        self._layers.add(layer)
+        return layer
+
+    def profile(self, entities, dx=0.0, dy=0.0, name=None):
+        """ Write one profile's entities, moved by (dx, dy), on a layer of its own named after the profile. """
+        layer = self._layer(name)
+        for entity_type, params in _segments(entities):
+            if entity_type == 'line':
+                [(p1, p2)] = params
+                self._codes(0, 'LINE', 8, layer, 10, _number(p1[0] + dx), 20, _number(p1[1] + dy), 30, 0,
+                            11, _number(p2[0] + dx), 21, _number(p2[1] + dy), 31, 0)
+            elif entity_type == 'arc':
+                [(center, start, sweep)] = params
+                radius = math.hypot(start[0] - center[0], start[1] - center[1])
+                start_angle = math.degrees(math.atan2(start[1] - center[1], start[0] - center[0]))
+                self._codes(0, 'ARC', 8, layer, 10, _number(center[0] + dx), 20, _number(center[1] + dy), 30, 0,
+                            40, _number(radius), 50, _number(start_angle % 360),
+                            51, _number((start_angle + math.degrees(sweep)) % 360))
+            elif entity_type == 'circle':
+                [(center, radius)] = params
+                self._codes(0, 'CIRCLE', 8, layer, 10, _number(center[0] + dx), 20, _number(center[1] + dy), 30, 0,
+                            40, _number(radius))
+
+    def label(self, text, x, y, height):
+        """ Write a centered text label with its baseline at (x, y). """
+        self._codes(0, 'TEXT', 8, LABEL_LAYER, 10, _number(x), 20, _number(y), 30, 0, 40, _number(height), 1, text,
+                    72, 1, 11, _number(x), 21, _number(y), 31, 0)
+
+    def close(self):
+        self._codes(0, 'ENDSEC', 0, 'EOF')
+
+
+WRITERS = {'.svg': SvgWriter, '.dxf': DxfWriter}
+
+
+def _writer_class(path):
+    writer = WRITERS.get(os.path.splitext(path)[1].lower())
+    if writer is None:
+        raise ValueError('Cannot export to {}: use a .svg or .dxf file name'.format(path))
+    return writer
+
+
+def export_profile(path, entities, name=None):
+    """
+    Write one profile to an SVG or DXF file, chosen by the file extension.
+
+    Parameters:
+    - path (str): Output file, ending in .svg or .dxf.
+    - entities (list, Profile or SymmetricProfile): The profile, e.g. from ProfileStore.load.
+    - name (str): Optional profile name, used as the SVG path id and the DXF layer name.
+    """
+    writer_class = _writer_class(path)
+    if isinstance(entities, Profile):
+        radius = entities.bounding_radius()
+    elif hasattr(entities, 'expand'):
+        radius = entities.expand().bounding_radius()
+    else:
+        radius = Profile.from_entities(entities).bounding_radius()
+    radius = radius * (1 + CELL_MARGIN) or 1.0
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        writer = writer_class(f, -radius, -radius, radius, radius)
+        writer.profile(entities, name=name)
+        writer.close()
+
+
+def export_contact_sheet(store, path, columns=None, categories=None):
+    """
+    Write every profile of a library (or of some categories) to one SVG or DXF file as a labelled grid.
+
+    All cells are the same size, set by the largest bounding radius in the index, so profiles are shown at a common
+    scale and centered on their origin. Profiles are read one at a time in library order and not kept in memory.
+
+    Parameters:
+    - store (ProfileStore): The library.
+    - path (str): Output file, ending in .svg or .dxf.
+    - columns (int): Cells per row; defaults to a roughly square sheet.
+    - categories (list): Category names to include; defaults to all.
+
+    Returns:
+    - int: The number of profiles written.
+    """
+    writer_class = _writer_class(path)
+    keys = [(category, name) for category in (categories or store.categories()) for name in store.names(category)]
+    if not keys:
+        raise ValueError('The library at {} has no profiles to export'.format(store.root))
+    radius = max(store.entry(category, name)['bounding_radius'] for category, name in keys) or 1.0
+    columns = columns or math.ceil(math.sqrt(len(keys)))
+    rows = math.ceil(len(keys) / columns)
+    cell = 2 * radius * (1 + CELL_MARGIN) + 2 * LABEL_HEIGHT * radius
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        writer = writer_class(f, 0.0, -rows * cell, columns * cell, 0.0)
+        for position, (category, name) in enumerate(keys):
+            row, column = divmod(position, columns)
+            x, y = (column + 0.5) * cell, -(row + 0.5) * cell + LABEL_HEIGHT * radius
+            label = '{}/{}'.format(category, name)
+            writer.profile(store.load(category, name, cache=False), x, y, name=label)
+            writer.label(label, x, y - radius * (1 + CELL_MARGIN) - 0.5 * LABEL_HEIGHT * radius, LABEL_HEIGHT * radius)
+        writer.close()
+    return len(keys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export library profiles to SVG or R12 DXF for review.')
+    parser.add_argument('library', help='profile library folder (holding index.json)')
+    parser.add_argument('output', help='output file, .svg or .dxf')
+    parser.add_argument('--profile', help='export only this profile, given as CATEGORY/NAME')
+    parser.add_argument('--category', action='append', help='limit the contact sheet to this category (repeatable)')
+    parser.add_argument('--columns', type=int, help='contact sheet cells per row')
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.library)
+    if args.profile:
+        category, _, name = args.profile.partition('/')
+        export_profile(args.output, store.load(category, name, cache=False), name=args.profile)
+        print('Wrote {} to {}'.format(args.profile, args.output))
+    else:
+        count = export_contact_sheet(store, args.output, args.columns, args.category)
+        print('Wrote {} profiles to {}'.format(count, args.output))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
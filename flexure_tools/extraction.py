@@ -0,0 +1,326 @@
+'''
+Description: Reads the profile of a planar face straight from its BRep edge geometry (Line3D, Arc3D, Circle3D, and
+stroked points for NURBS or other curves), mapping it into the face's plane with one fixed transform. Nothing is
+added to the design, so extraction cost scales with the number of edges rather than with sketch recomputes. Profiles
+come out loop by loop, outer boundary first (see flexure_tools.loops), whatever order the face lists its edges in.
+stream_profiles walks every planar face of one or more bodies and writes each profile out (JSON lines or the profile
+store) as soon as it is read, so whole part catalogs can be digitized with flat memory use, optionally simplifying each
+profile on the way (see flexure_tools.simplify).
+'''
+
+import adsk.core
+import json, math
+from array import array
+
+from . import loops, simplify, symmetry
+
+SPLINE_TOLERANCE = 0.001  # cm; chordal tolerance used to stroke curves that are not lines, arcs or circles
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _cross(a, b):
+    return (a[1] * b[2] - a[2] * b[1], a[2] * b[0] - a[0] * b[2], a[0] * b[1] - a[1] * b[0])
+
+
+def plane_frame(planar_face):
+    """
+    Return the in-plane axes of a planar face as plain tuples.
+
+    Points are mapped by projecting onto these axes through the world origin, so a face lying on the XY plane keeps
+    its world X and Y coordinates, exactly as a sketch created on that face would report them.
+
+    Parameters:
+    - planar_face (adsk.fusion.BRepFace): A face whose geometry is an adsk.core.Plane.
+
+    Returns:
+    - Tuple: (u, v, normal), each an (x, y, z) tuple.
+    """
+    plane = planar_face.geometry
+    u, v, normal = plane.uDirection, plane.vDirection, plane.normal
+    return (u.x, u.y, u.z), (v.x, v.y, v.z), (normal.x, normal.y, normal.z)
+
+
+def map_point(point, frame):
+    """ Map a world point (Point3D or (x, y, z) tuple) into the plane frame as an (x, y, 0.0) tuple. """
+    p = point.asArray() if hasattr(point, 'asArray') else point
+    return (_dot(p, frame[0]), _dot(p, frame[1]), 0.0)
+
+
+def arc_entity(center, normal, reference, radius, start_angle, end_angle, frame):
+    """
+    Convert Arc3D data to a library arc entity in the plane frame.
+
+    Parameters:
+    - center, normal, reference (tuple): Arc center, axis and reference vector as (x, y, z) tuples.
+    - radius (float): Arc radius.
+    - start_angle, end_angle (float): Arc3D angles, measured counter-clockwise about normal from reference.
+    - frame (tuple): Plane frame from plane_frame.
+
+    Returns:
+    - Tuple: ('arc', [(center, start, sweep)]) with a positive sweep, counter-clockwise about the plane normal.
+    """
+    binormal = _cross(normal, reference)
+
+    def point_at(angle):
+        c, s = math.cos(angle) * radius, math.sin(angle) * radius
+        return tuple(center[k] + c * reference[k] + s * binormal[k] for k in range(3))
+
+    # An arc whose axis opposes the plane normal runs clockwise in the plane, so it starts from its Arc3D end point
+    start = point_at(start_angle) if _dot(normal, frame[2]) >= 0 else point_at(end_angle)
+    return ('arc', [(map_point(center, frame), map_point(start, frame), end_angle - start_angle)])
+
+
+def edge_entity(edge, frame, spline_tolerance=SPLINE_TOLERANCE):
+    """
+    Convert one BRep edge to a library entity in the plane frame.
+
+    Parameters:
+    - edge (adsk.fusion.BRepEdge): The edge to convert.
+    - frame (tuple): Plane frame from plane_frame.
+    - spline_tolerance (float): Chordal tolerance for stroking curves that have no exact library form.
+
+    Returns:
+    - Tuple: A library entity, e.g. ('line', [((x1, y1, z1), (x2, y2, z2))]).
+    """
+    geom = edge.geometry
+    if isinstance(geom, adsk.core.Line3D):
+        return ('line', [(map_point(geom.startPoint, frame), map_point(geom.endPoint, frame))])
+    if isinstance(geom, adsk.core.Arc3D):
+        return arc_entity(geom.center.asArray(), geom.normal.asArray(), geom.referenceVector.asArray(),
+                          geom.radius, geom.startAngle, geom.endAngle, frame)
+    if isinstance(geom, adsk.core.Circle3D):
+        return ('circle', [(map_point(geom.center, frame), geom.radius)])
+
+    # NURBS and any other curve: store points along the edge, as the sketch path stores fitted-spline points
+    evaluator = edge.evaluator
+    _, start_param, end_param = evaluator.getParameterExtents()
+    _, points = evaluator.getStrokes(start_param, end_param, spline_tolerance)
+    return ('spline', [[map_point(point, frame) for point in points]])
+
+
+def extract_face_entities(planar_face, spline_tolerance=SPLINE_TOLERANCE):
+    """
+    Extract every edge of a planar face as library entities without creating a sketch.
+
+    Parameters:
+    - planar_face (adsk.fusion.BRepFace): The planar face to read.
+    - spline_tolerance (float): Chordal tolerance for stroking curves that have no exact library form.
+
+    Returns:
+    - list: Library entities loop by loop, outer boundary first, each loop in chain order (see loops.find_loops).
+    """
+    frame = plane_frame(planar_face)
+    return loops.ordered_entities([edge_entity(edge, frame, spline_tolerance) for edge in planar_face.edges])
+
+
+def sketch_normal(sketch):
+    """
+    Return the normal of a sketch's plane in sketch coordinates.
+
+    Sketch entities report their points in sketch space, while the reference plane's normal is in model space, so the
+    normal is mapped through the sketch transform before it is compared with sketch vectors.
+
+    Parameters:
+    - sketch (adsk.fusion.Sketch): The sketch.
+
+    Returns:
+    - Tuple: The unit normal as (x, y, z); the sketch z axis if the sketch has no planar reference.
+    """
+    try:
+        normal = sketch.referencePlane.geometry.normal
+    except Exception:  # No reference plane, or one without plane geometry
+        return (0.0, 0.0, 1.0)
+    origin = sketch.modelToSketchSpace(adsk.core.Point3D.create(0, 0, 0))
+    tip = sketch.modelToSketchSpace(adsk.core.Point3D.create(normal.x, normal.y, normal.z))
+    nx, ny, nz = tip.x - origin.x, tip.y - origin.y, tip.z - origin.z
+    length = math.sqrt(nx * nx + ny * ny + nz * nz)
+    if length == 0:
+        return (0.0, 0.0, 1.0)
+    return (nx / length, ny / length, nz / length)
+
+
+def arc_sweeps(centers, starts, ends, normal=(0.0, 0.0, 1.0)):
+    """
+    Compute the counter-clockwise sweep of many arcs in one pass.
+
+    Each sweep is atan2((u x v) . n, u . v) for the vectors u and v from the center to the start and end point, which
+    needs no normalizing or clamping and keeps full precision for sweeps close to 0 and to 2*pi, where acos of the dot
+    product loses half its digits.
+
+    Parameters:
+    - centers, starts, ends (sequence): Flat x, y, z coordinates, three per arc (e.g. array('d')).
+    - normal (tuple): Plane normal the sweeps are measured about, in the same coordinates as the points.
+
+    Returns:
+    - array: Sweeps in radians, in (0, 2*pi]; an arc whose end coincides with its start sweeps a full turn.
+    """
+    nx, ny, nz = normal
+    two_pi = 2 * math.pi
+    sweeps = array('d')
+    for cx, cy, cz, sx, sy, sz, ex, ey, ez in zip(centers[0::3], centers[1::3], centers[2::3],
+                                                  starts[0::3], starts[1::3], starts[2::3],
+                                                  ends[0::3], ends[1::3], ends[2::3]):
+        ux, uy, uz = sx - cx, sy - cy, sz - cz
+        vx, vy, vz = ex - cx, ey - cy, ez - cz
+        sweep = math.atan2((uy * vz - uz * vy) * nx + (uz * vx - ux * vz) * ny + (ux * vy - uy * vx) * nz,
+                           ux * vx + uy * vy + uz * vz)
+        sweeps.append(sweep if sweep > 0 else sweep + two_pi)
+    return sweeps
+
+
+def sketch_arc_entities(arcs, normal=(0.0, 0.0, 1.0)):
+    """
+    Convert sketch arcs to library arc entities, reading all their points first and computing the sweeps in one pass.
+
+    Parameters:
+    - arcs (list): adsk.fusion.SketchArc objects of one sketch.
+    - normal (tuple): The sketch's plane normal in sketch coordinates, from sketch_normal.
+
+    Returns:
+    - list: ('arc', [(center, start, sweep)]) tuples in the order of arcs, counter-clockwise about the sketch z axis.
+    """
+    centers, starts, ends = array('d'), array('d'), array('d')
+    for arc in arcs:
+        centers.extend(arc.geometry.center.asArray())
+        starts.extend(arc.startSketchPoint.geometry.asArray())
+        ends.extend(arc.endSketchPoint.geometry.asArray())
+    # Sketch arcs run counter-clockwise about the sketch z axis; seen along a normal opposing it they run from the end
+    sweeps = arc_sweeps(centers, starts, ends, normal) if normal[2] >= 0 else arc_sweeps(centers, ends, starts, normal)
+    return [('arc', [(tuple(centers[k:k + 3]), tuple(starts[k:k + 3]), sweep)])
+            for k, sweep in zip(range(0, len(centers), 3), sweeps)]
+
+
+def planar_faces(bodies, face_filter=None):
+    """
+    Yield (body, face_index, face) for every planar face of the given bodies, one at a time.
+
+    Parameters:
+    - bodies (iterable): adsk.fusion.BRepBody objects.
+    - face_filter (callable): Optional predicate taking a BRepFace; faces for which it returns False are skipped.
+    """
+    for body in bodies:
+        for face_index, face in enumerate(body.faces):
+            if face.geometry.surfaceType != adsk.core.SurfaceTypes.PlaneSurfaceType:
+                continue
+            if face_filter is None or face_filter(face):
+                yield body, face_index, face
+
+
+def profile_name(body, face_index):
+    """
+    Name a face profile after its component, body and face index; body names repeat across components.
+
+    Parameters:
+    - body (adsk.fusion.BRepBody): The body the face belongs to.
+    - face_index (int): The face's index in body.faces.
+
+    Returns:
+    - str: '<component>/<body> face <index>'.
+    """
+    return '{}/{} face {}'.format(body.parentComponent.name, body.name, face_index)
+
+
+class JsonlProfileWriter:
+    """ Writes one JSON object per profile to a .jsonl file, flushing as it goes so nothing accumulates in memory. """
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        self._file.write(json.dumps(record, separators=(',', ':')))
+        self._file.write('\n')
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+class StoreProfileWriter:
+    """
+    Adds each profile to a flexure_tools.profile_store.ProfileStore, saving the index once at the end.
+
+    With a symmetry_tolerance, symmetric profiles are stored as their fundamental sector (see flexure_tools.symmetry);
+    symmetric counts them and noisy collects the names of profiles whose symmetry check suggests extraction noise.
+    """
+
+    def __init__(self, store, category, symmetry_tolerance=None):
+        self.store = store
+        self.category = category
+        self.symmetry_tolerance = symmetry_tolerance
+        self.count = 0
+        self.symmetric = 0
+        self.noisy = []
+
+    def write(self, record):
+        metadata = {'component': record['component'], 'body': record['body'], 'face': record['face']}
+        if 'reduction' in record:
+            metadata['reduction'] = record['reduction']
+        entities = record['entities']
+        if self.symmetry_tolerance is not None:
+            found = symmetry.detect_symmetry(entities, self.symmetry_tolerance)
+            compressed = symmetry.compress(entities, self.symmetry_tolerance, found) if found.size > 1 else None
+            if compressed is not None:
+                entities = compressed
+                self.symmetric += 1
+            if found.is_noisy():
+                self.noisy.append(record['name'])
+                metadata['symmetry_check'] = str(found)
+        self.store.add(self.category, record['name'], entities, save=False, metadata=metadata)
+        self.count += 1
+
+    def close(self):
+        self.store.save()
+
+
+def stream_profiles(bodies, writer, face_filter=None, spline_tolerance=SPLINE_TOLERANCE, progress=None,
+                    simplify_tolerance=None, reduction=None, clashes=None):
+    """
+    Extract every planar face of the bodies and hand each profile to writer as soon as it is read.
+
+    Parameters:
+    - bodies (iterable): adsk.fusion.BRepBody objects to walk.
+    - writer (object): JsonlProfileWriter, StoreProfileWriter, or any object with write(record).
+    - face_filter (callable): Optional predicate taking a BRepFace.
+    - spline_tolerance (float): Chordal tolerance for stroking curves that have no exact library form.
+    - progress (callable): Optional callback taking the number of profiles written so far; return False to stop.
+    - simplify_tolerance (float): If set, each profile goes through simplify.simplify_entities with this tolerance and
+      its record gains a 'reduction' dict of entity counts.
+    - reduction (simplify.Reduction): Optional running total the per-profile reductions are added to.
+    - clashes (list): Optional list that collects the names that were already taken, for instance by two components
+      with the same name; those profiles are written as '<name> (2)', '<name> (3)', ... instead of overwriting.
+
+    Returns:
+    - int: The number of profiles written.
+    """
+    count = 0
+    taken = {}
+    for body, face_index, face in planar_faces(bodies, face_filter):
+        name = profile_name(body, face_index)
+        if name in taken:
+            taken[name] += 1
+            if clashes is not None:
+                clashes.append(name)
+            name = '{} ({})'.format(name, taken[name])
+        else:
+            taken[name] = 1
+        record = {'name': name,
+                  'component': body.parentComponent.name,
+                  'body': body.name,
+                  'face': face_index,
+                  'entities': extract_face_entities(face, spline_tolerance)}
+        if simplify_tolerance is not None:
+            record['entities'], face_reduction = simplify.simplify_entities(record['entities'], simplify_tolerance)
+            record['reduction'] = face_reduction.as_dict()
+            if reduction is not None:
+                reduction.add(face_reduction)
+        writer.write(record)
+        count += 1
+        if progress is not None and progress(count) is False:
+            break
+    return count
@@ -0,0 +1,199 @@
+'''
+Description: Opt-in timing of the adsk API calls made by the scripts. When enabled, the methods listed in CALL_SITES
+are replaced on their adsk classes by thin wrappers that record each call's latency against the command that is
+running; when the command finishes, a per-call-site breakdown (count, total, mean, p50/p90/p99, max) plus the time
+spent in our own Python is appended to a log file. While disabled nothing is patched, and the command decorator costs
+one attribute check per command.
+'''
+
+import adsk.core, adsk.fusion
+import functools, inspect, time
+
+# (module, class, attribute) of every API entry point that is timed. Entries missing from the running API are skipped.
+# Properties are timed on assignment, which is where e.g. Sketch.isComputeDeferred = False pays for the solve.
+CALL_SITES = (
+    (adsk.fusion, 'Sketches', 'add'),
+    (adsk.fusion, 'Sketch', 'project'),
+    (adsk.fusion, 'Sketch', 'findConnectedCurves'),
+    (adsk.fusion, 'Sketch', 'offset'),
+    (adsk.fusion, 'Sketch', 'move'),
+    (adsk.fusion, 'Sketch', 'modelToSketchSpace'),
+    (adsk.fusion, 'Sketch', 'sketchToModelSpace'),
+    (adsk.fusion, 'Sketch', 'isComputeDeferred'),
+    (adsk.fusion, 'SketchLines', 'addByTwoPoints'),
+    (adsk.fusion, 'SketchArcs', 'addByCenterStartSweep'),
+    (adsk.fusion, 'SketchCircles', 'addByCenterRadius'),
+    (adsk.fusion, 'SketchFittedSplines', 'add'),
+    (adsk.fusion, 'SketchPoint', 'merge'),
+    (adsk.core, 'UserInterface', 'selectEntity'),
+    (adsk.core, 'UserInterface', 'messageBox'),  # Modal, so its wait is kept out of the Python share
+    (adsk.core, 'SelectionCommandInput', 'selection'),
+    (adsk.core, 'CommandInputs', 'itemById'),
+)
+
+NO_COMMAND = '(outside commands)'
+
+
+def percentile(sorted_samples, fraction):
+    """ Nearest-rank percentile of an already sorted, non-empty list. """
+    rank = max(int(fraction * len(sorted_samples) + 0.999999999) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+class CommandStats:
+    """
+    Timings gathered while one command ran.
+
+    Attributes:
+    - name (str): The command name given to Recorder.command.
+    - samples (dict): Call site name -> list of call durations in seconds.
+    - api_seconds (float): Time spent inside timed API calls, counting nested calls once.
+    - wall_seconds (float): Wall time of the whole command; set when it finishes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.samples = {}
+        self.api_seconds = 0.0
+        self.wall_seconds = 0.0
+
+    def summary(self):
+        """ Return {site: {'calls', 'total', 'mean', 'p50', 'p90', 'p99', 'max'}} with times in seconds. """
+        result = {}
+        for site, samples in self.samples.items():
+            ordered = sorted(samples)
+            total = sum(ordered)
+            result[site] = {'calls': len(ordered), 'total': total, 'mean': total / len(ordered),
+                            'p50': percentile(ordered, 0.5), 'p90': percentile(ordered, 0.9),
+                            'p99': percentile(ordered, 0.99), 'max': ordered[-1]}
+        return result
+
+    def format_report(self):
+        """ Return the breakdown as text, busiest call site first. """
+        python_seconds = max(self.wall_seconds - self.api_seconds, 0.0)
+        lines = ['{}: {:.1f} ms total, {:.1f} ms in API calls, {:.1f} ms in Python'.format(
+            self.name, self.wall_seconds * 1e3, self.api_seconds * 1e3, python_seconds * 1e3)]
+        lines.append('  {:<42}{:>8}{:>11}{:>10}{:>10}{:>10}{:>10}{:>10}'.format(
+            'call site', 'calls', 'total ms', 'mean ms', 'p50 ms', 'p90 ms', 'p99 ms', 'max ms'))
+        rows = sorted(self.summary().items(), key=lambda item: item[1]['total'], reverse=True)
+        for site, s in rows:
+            lines.append('  {:<42}{:>8}{:>11.2f}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}{:>10.3f}'.format(
+                site, s['calls'], s['total'] * 1e3, s['mean'] * 1e3, s['p50'] * 1e3, s['p90'] * 1e3,
+                s['p99'] * 1e3, s['max'] * 1e3))
+        return '\n'.join(lines)
+
+
+class Recorder:
+    """
+    Installs the call-site wrappers and attributes every timed call to the innermost running command.
+
+    Attributes:
+    - log_path (str): File the report of every finished command is appended to, or None to keep reports in memory.
+    - history (list): CommandStats of the most recent finished commands, newest last (at most keep of them).
+    """
+
+    def __init__(self, sites=CALL_SITES, log_path=None, keep=20):
+        self.sites = sites
+        self.log_path = log_path
+        self.keep = keep
+        self.history = []
+        self._patched = []
+        self._commands = []
+        self._depth = 0
+        self._loose = CommandStats(NO_COMMAND)
+
+    @property
+    def enabled(self):
+        return bool(self._patched)
+
+    def enable(self, log_path=None):
+        """ Patch every available call site. Calling enable again only updates log_path. """
+        if log_path is not None:
+            self.log_path = log_path
+        if self._patched:
+            return
+        for module, class_name, attribute in self.sites:
+            cls = getattr(module, class_name, None)
+            original = inspect.getattr_static(cls, attribute, None) if cls is not None else None
+            if original is None:
+                continue
+            site = '{}.{}'.format(class_name, attribute)
+            if isinstance(original, property):
+                if original.fset is None:
+                    continue
+                wrapped = property(original.fget, self._wrap(site, original.fset), original.fdel, original.__doc__)
+            elif isinstance(original, staticmethod):
+                wrapped = staticmethod(self._wrap(site, original.__func__))
+            elif callable(original):
+                wrapped = self._wrap(site, original)
+            else:
+                continue
+            self._patched.append((cls, attribute, original, attribute in vars(cls)))
+            setattr(cls, attribute, wrapped)
+
+    def disable(self):
+        """ Restore the original API methods. Recorded history is kept. """
+        while self._patched:
+            cls, attribute, original, own = self._patched.pop()
+            if own:
+                setattr(cls, attribute, original)
+            else:
+                delattr(cls, attribute)  # The method was inherited; uncover the base class again
+
+    def _wrap(self, site, method):
+        clock = time.perf_counter
+
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            self._depth += 1
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                self._depth -= 1
+                stats = self._commands[-1] if self._commands else self._loose
+                stats.samples.setdefault(site, []).append(elapsed)
+                if not self._depth:
+                    stats.api_seconds += elapsed
+        return timed
+
+    def command(self, name):
+        """
+        Decorator that times every call of a function as one command, e.g. a handler's notify or a script's run.
+        The report is written when the function returns or raises. Does nothing beyond the call while disabled.
+        """
+        def decorate(function):
+            @functools.wraps(function)
+            def timed_command(*args, **kwargs):
+                if not self._patched:
+                    return function(*args, **kwargs)
+                stats = CommandStats(name)
+                self._commands.append(stats)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    stats.wall_seconds = time.perf_counter() - start
+                    self._commands.pop()
+                    self._finish(stats)
+            return timed_command
+        return decorate
+
+    def _finish(self, stats):
+        self.history.append(stats)
+        del self.history[:-self.keep]
+        if self.log_path:
+            with open(self.log_path, 'a') as f:
+                f.write('[{}] {}\n\n'.format(time.strftime('%Y-%m-%d %H:%M:%S'), stats.format_report()))
+
+    def last_report(self):
+        """ Return the text report of the most recent command, or '' if none has finished. """
+        return self.history[-1].format_report() if self.history else ''
+
+
+# Shared recorder used by the scripts
+recorder = Recorder()
+enable = recorder.enable
+disable = recorder.disable
+command = recorder.command
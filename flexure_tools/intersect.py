@@ -0,0 +1,293 @@
+'''
+Description: Sweep-line self-intersection check for lines, arcs and circles, run on the pure-Python geometry before
+anything is emitted, so an offset distance or fit that makes the geometry overlap itself is caught before Fusion has
+to recompute (and later fail to extrude) it.
+Arcs and circles are split into x-monotone pieces (the parts above and below their center), and a left-to-right sweep
+keeps the pieces crossing the sweep line sorted by height in a skip list. As in the Shamos-Hoey algorithm, only pieces
+that become neighbours in that order are tested against each other, and every piece is inserted by an O(log n)
+search and removed through its node in O(1) expected time, so n pieces are checked in O(n log n) expected time and
+the sweep stops at the first crossing. Points where two segments meet end to end (chain vertices, junctions) are not crossings.
+'''
+
+import math, random
+
+from . import biarc
+from .profile import Profile, LINE, ARC, LINE_STRIDE, ARC_STRIDE, CIRCLE_STRIDE
+
+TOLERANCE = 1e-6    # cm; segment end points closer than this are shared
+JOIN_RADIUS = 1e-4  # cm; crossings this close to a shared end point are the joint itself (tangent joints only locate
+                    # their contact point to about the square root of the rounding error)
+
+# The input is turned by this angle (radians) before sweeping so no line is vertical; results are turned back
+_TURN = 0.000618
+_COS, _SIN = math.cos(_TURN), math.sin(_TURN)
+
+
+def _turn(x, y):
+    return x * _COS - y * _SIN, x * _SIN + y * _COS
+
+
+def _unturn(x, y):
+    return x * _COS + y * _SIN, -x * _SIN + y * _COS
+
+
+class _Piece:
+    """ An x-monotone part of one input segment: a line, or an arc within the upper or lower half of its circle. """
+    __slots__ = ('segment', 'xl', 'yl', 'xr', 'yr', 'slope', 'cx', 'cy', 'r', 'side')
+
+    def __init__(self, segment, xl, yl, xr, yr, slope=None, cx=0.0, cy=0.0, r=0.0, side=0.0):
+        self.segment = segment
+        self.xl, self.yl, self.xr, self.yr = xl, yl, xr, yr
+        self.slope = slope  # None for arc pieces
+        self.cx, self.cy, self.r, self.side = cx, cy, r, side  # side: +1 above the center, -1 below
+
+    def y_at(self, x):
+        if self.slope is not None:
+            return self.yl + (x - self.xl) * self.slope
+        dx = min(max(x - self.cx, -self.r), self.r)
+        return self.cy + self.side * math.sqrt(max(self.r * self.r - dx * dx, 0.0))
+
+    def slope_at(self, x):
+        if self.slope is not None:
+            return self.slope
+        dy = self.side * max(math.sqrt(max(self.r * self.r - (x - self.cx) ** 2, 0.0)), 1e-300)
+        return -(x - self.cx) / dy
+
+    def contains(self, x, y, tolerance):
+        """ Whether a point of this piece's carrier lies on the piece. """
+        if x < self.xl - tolerance or x > self.xr + tolerance:
+            return False
+        return self.slope is not None or (y - self.cy) * self.side >= -tolerance
+
+
+class _Node:
+    """ A skip list node; prev and next hold the neighbouring nodes on each of its levels. """
+    __slots__ = ('piece', 'prev', 'next')
+
+    def __init__(self, piece, levels):
+        self.piece = piece
+        self.prev = [None] * levels
+        self.next = [None] * levels
+
+
+class _ActiveList:
+    """
+    The pieces crossing the sweep line, bottom to top, as a skip list: insertion searches down the levels in O(log n)
+    expected comparisons, and a node unlinks itself from its neighbours without a search.
+    """
+    MAX_LEVELS = 32
+
+    def __init__(self, seed=0):
+        self.head = _Node(None, self.MAX_LEVELS)
+        self.levels = 1
+        self._random = random.Random(seed)  # Fixed seed: the same input always builds the same list
+
+    def insert(self, piece, below):
+        """ Insert piece after every piece p with below(p, piece) and return its node. """
+        levels = 1
+        while levels < self.MAX_LEVELS and self._random.random() < 0.5:
+            levels += 1
+        self.levels = max(self.levels, levels)
+        node = _Node(piece, levels)
+        current = self.head
+        for level in range(self.levels - 1, -1, -1):
+            while current.next[level] is not None and below(current.next[level].piece, piece):
+                current = current.next[level]
+            if level < levels:
+                following = current.next[level]
+                node.prev[level], node.next[level] = current, following
+                current.next[level] = node
+                if following is not None:
+                    following.prev[level] = node
+        return node
+
+    def remove(self, node):
+        """ Unlink node; returns the pieces that were directly below and above it (None at either end). """
+        for level in range(len(node.next)):
+            previous, following = node.prev[level], node.next[level]
+            previous.next[level] = following
+            if following is not None:
+                following.prev[level] = previous
+        return node.prev[0].piece, node.next[0].piece if node.next[0] is not None else None
+
+
+def _end_points(seg):
+    """ Start and end point of a segment in the flexure_tools.offset form. """
+    if seg[0] == 'line':
+        return (seg[1], seg[2]), (seg[3], seg[4])
+    _, cx, cy, r, start, sweep = seg
+    return ((cx + r * math.cos(start), cy + r * math.sin(start)),
+            (cx + r * math.cos(start + sweep), cy + r * math.sin(start + sweep)))
+
+
+def _line_pieces(index, x0, y0, x1, y1, pieces):
+    (x0, y0), (x1, y1) = _turn(x0, y0), _turn(x1, y1)
+    if x1 < x0:
+        x0, y0, x1, y1 = x1, y1, x0, y0
+    if x1 - x0 > 0:
+        pieces.append(_Piece(index, x0, y0, x1, y1, slope=(y1 - y0) / (x1 - x0)))
+
+
+def _arc_pieces(index, cx, cy, r, start, sweep, pieces):
+    """ Split an arc (or a circle, sweep 2*pi) at the leftmost and rightmost points of its circle. """
+    cx, cy = _turn(cx, cy)
+    start += _TURN
+    if sweep < 0:
+        start, sweep = start + sweep, -sweep
+    end = start + sweep
+    cuts = [start]
+    k = math.floor(start / math.pi) + 1
+    while k * math.pi < end:
+        cuts.append(k * math.pi)
+        k += 1
+    cuts.append(end)
+    for a0, a1 in zip(cuts, cuts[1:]):
+        if a1 - a0 <= 0:
+            continue
+        side = 1.0 if math.sin((a0 + a1) / 2) > 0 else -1.0
+        xa, ya = cx + r * math.cos(a0), cy + r * math.sin(a0)
+        xb, yb = cx + r * math.cos(a1), cy + r * math.sin(a1)
+        if xb < xa:
+            xa, ya, xb, yb = xb, yb, xa, ya
+        pieces.append(_Piece(index, xa, ya, xb, yb, cx=cx, cy=cy, r=r, side=side))
+
+
+def _carrier_points(p, q, tolerance):
+    """ Points shared by the carriers (line or circle) of two pieces, including one point of any overlap. """
+    if p.slope is not None and q.slope is not None:
+        dpx, dpy, dqx, dqy = p.xr - p.xl, p.yr - p.yl, q.xr - q.xl, q.yr - q.yl
+        length_p, length_q = math.hypot(dpx, dpy), math.hypot(dqx, dqy)
+        denominator = dpx * dqy - dpy * dqx
+        if abs(denominator) <= 1e-14 * length_p * length_q:
+            if abs((q.xl - p.xl) * dpy - (q.yl - p.yl) * dpx) > tolerance * length_p:
+                return []  # Parallel carriers
+            # Collinear: the middle of the overlap, if the pieces overlap
+            t0 = ((q.xl - p.xl) * dpx + (q.yl - p.yl) * dpy) / length_p
+            t1 = ((q.xr - p.xl) * dpx + (q.yr - p.yl) * dpy) / length_p
+            lo, hi = max(min(t0, t1), 0.0), min(max(t0, t1), length_p)
+            t = (lo + hi) / 2 / length_p
+            return [(p.xl + t * dpx, p.yl + t * dpy)] if hi - lo > tolerance else []
+        t = ((q.xl - p.xl) * dqy - (q.yl - p.yl) * dqx) / denominator
+        return [(p.xl + t * dpx, p.yl + t * dpy)]
+    if p.slope is None and q.slope is None:
+        dx, dy = q.cx - p.cx, q.cy - p.cy
+        d = math.hypot(dx, dy)
+        if d <= tolerance and abs(p.r - q.r) <= tolerance:
+            lo, hi = max(p.xl, q.xl), min(p.xr, q.xr)
+            return [((lo + hi) / 2, p.y_at((lo + hi) / 2))] if p.side == q.side and hi - lo > tolerance else []
+        if d <= 1e-14 or d > p.r + q.r or d < abs(p.r - q.r):
+            return []
+        along = (p.r * p.r - q.r * q.r + d * d) / (2 * d)
+        h = math.sqrt(max(p.r * p.r - along * along, 0.0))
+        mx, my = p.cx + along * dx / d, p.cy + along * dy / d
+        return [(mx - h * dy / d, my + h * dx / d), (mx + h * dy / d, my - h * dx / d)]
+    line, arc = (p, q) if p.slope is not None else (q, p)
+    dx, dy = line.xr - line.xl, line.yr - line.yl
+    fx, fy = line.xl - arc.cx, line.yl - arc.cy
+    qa, qb, qc = dx * dx + dy * dy, 2 * (fx * dx + fy * dy), fx * fx + fy * fy - arc.r * arc.r
+    disc = qb * qb - 4 * qa * qc
+    if disc < 0:
+        return []
+    root = math.sqrt(disc)
+    return [(line.xl + t * dx, line.yl + t * dy) for t in ((-qb - root) / (2 * qa), (-qb + root) / (2 * qa))]
+
+
+def find_intersection(segments, circles=(), tolerance=TOLERANCE):
+    """
+    Find a point where two of the segments cross, touch or overlap, other than at an end point they share.
+
+    Parameters:
+    - segments (list): Segments in the flexure_tools.offset form, ['line', x0, y0, x1, y1] or
+      ['arc', cx, cy, radius, start_angle, sweep], in any order and orientation.
+    - circles (list): (cx, cy, radius) tuples; they are numbered after the segments.
+    - tolerance (float): Largest distance between end points that are shared; crossings within JOIN_RADIUS of a
+      shared end point are not reported.
+
+    Returns:
+    - Tuple: (i, j, (x, y)) for the first crossing found, i and j indexing segments then circles; None if there is none.
+    """
+    pieces, ends = [], []
+    for index, seg in enumerate(segments):
+        if seg[0] == 'line':
+            _line_pieces(index, seg[1], seg[2], seg[3], seg[4], pieces)
+        else:
+            _arc_pieces(index, seg[1], seg[2], seg[3], seg[4], seg[5], pieces)
+        ends.append(_end_points(seg))
+    for index, (cx, cy, radius) in enumerate(circles, len(segments)):
+        _arc_pieces(index, cx, cy, radius, 0.0, 2 * math.pi, pieces)
+        ends.append(())
+
+    def shared_end(p, q, x, y):
+        x, y = _unturn(x, y)
+        return any(math.hypot(x - px, y - py) <= JOIN_RADIUS and
+                   any(math.hypot(px - qx, py - qy) <= tolerance for qx, qy in ends[q.segment])
+                   for px, py in ends[p.segment])
+
+    def crossing(p, q):
+        if p.segment == q.segment:
+            return None
+        for x, y in _carrier_points(p, q, tolerance):
+            if p.contains(x, y, tolerance) and q.contains(x, y, tolerance) and not shared_end(p, q, x, y):
+                i, j = sorted((p.segment, q.segment))
+                return i, j, _unturn(x, y)
+        return None
+
+    def below(p, q, x):
+        yp, yq = p.y_at(x), q.y_at(x)
+        if abs(yp - yq) > tolerance:
+            return yp < yq
+        return p.slope_at(x) < q.slope_at(x)
+
+    # Left ends are inserted before right ends at the same point, so pieces meeting there are compared
+    events = [(p.xl, p.yl, 0, n) for n, p in enumerate(pieces)] + [(p.xr, p.yr, 1, n) for n, p in enumerate(pieces)]
+    events.sort()
+    active = _ActiveList()
+    nodes = [None] * len(pieces)  # Piece number -> its node while it crosses the sweep line
+    for x, _, kind, n in events:
+        if kind == 0:
+            node = nodes[n] = active.insert(pieces[n], lambda p, q: below(p, q, x))
+            for other in (node.prev[0].piece, node.next[0].piece if node.next[0] is not None else None):
+                if other is not None:
+                    found = crossing(pieces[n], other)
+                    if found:
+                        return found
+        else:
+            lower, upper = active.remove(nodes[n])
+            nodes[n] = None
+            if lower is not None and upper is not None:
+                found = crossing(lower, upper)
+                if found:
+                    return found
+    return None
+
+
+def find_profile_intersection(profile, tolerance=TOLERANCE):
+    """
+    Check a profile for self-intersections.
+
+    Parameters:
+    - profile (list, Profile or ScaledGeometry): Entities in the library tuple format, or flat coordinate buffers
+      (anything with lines, arcs, circles and order arrays). Splines are checked through their biarc fit.
+    - tolerance (float): As for find_intersection.
+
+    Returns:
+    - Tuple: (x, y) of the first crossing found, or None.
+    """
+    if not hasattr(profile, 'arcs') or getattr(profile, 'spline_counts', None):
+        profile = Profile.from_entities(biarc.splines_to_arcs(list(profile)))
+    segments, circles = [], []
+    lines, arcs, circle_data = profile.lines, profile.arcs, profile.circles
+    li = ai = 0
+    for kind in profile.order:
+        if kind == LINE:
+            x1, y1, _, x2, y2, _ = lines[li:li + LINE_STRIDE]
+            segments.append(['line', x1, y1, x2, y2])
+            li += LINE_STRIDE
+        elif kind == ARC:
+            cx, cy, _, sx, sy, _, sweep = arcs[ai:ai + ARC_STRIDE]
+            segments.append(['arc', cx, cy, math.hypot(sx - cx, sy - cy), math.atan2(sy - cy, sx - cx), sweep])
+            ai += ARC_STRIDE
+    for ci in range(0, len(circle_data), CIRCLE_STRIDE):
+        circles.append((circle_data[ci], circle_data[ci + 1], circle_data[ci + 3]))
+    found = find_intersection(segments, circles, tolerance)
+    return found[2] if found else None
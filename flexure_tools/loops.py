@@ -0,0 +1,305 @@
+'''
+Description: Connectivity graph for profile entities, built without a sketch. End points are snapped together through a
+hash grid of tolerance-sized cells, the entities are walked vertex to vertex into chains, and every closed chain is
+oriented from its signed area: outer loops counter-clockwise, the holes inside them clockwise. Each entity is visited
+once, so chaining a profile is O(n), where sketch.findConnectedCurves needs a round trip per selection and an endpoint
+search over every pair of curves is O(n^2). Nesting the L closed loops looks each loop up in a grid of their bounding
+boxes, so it only runs point-in-polygon tests against loops whose box covers the loop; for a plate with many separate
+holes that is near O(n + L), while loops nested inside many others still cost one test per enclosing loop.
+'''
+
+import math
+
+LOOP_TOLERANCE = 1e-7  # cm; end points closer than this are the same vertex
+ARC_STEPS = 8          # Points per arc in the polygons used for containment tests
+
+
+class VertexGrid:
+    """
+    Numbers 2D points so that points within tolerance of each other share a number. Points are bucketed in a hash grid
+    of cells twice the tolerance wide, so the tolerance disc around a point overlaps at most four cells: its own and the
+    neighbours across the cell borders it is nearest to.
+    """
+
+    def __init__(self, tolerance=LOOP_TOLERANCE):
+        self.tolerance = tolerance
+        self.xs, self.ys = [], []
+        self._cells = {}
+        self._cell_size = 2 * tolerance
+        self._tolerance2 = tolerance * tolerance
+
+    def vertex(self, x, y):
+        """ Return the number of the vertex at (x, y), adding a new vertex if none is within tolerance. """
+        fx, fy = x / self._cell_size, y / self._cell_size
+        i, j = math.floor(fx), math.floor(fy)
+        di, dj = (-1 if fx - i < 0.5 else 1), (-1 if fy - j < 0.5 else 1)
+        xs, ys, cells, tolerance2 = self.xs, self.ys, self._cells, self._tolerance2
+        for cell in ((i, j), (i + di, j), (i, j + dj), (i + di, j + dj)):
+            for number in cells.get(cell, ()):
+                if (xs[number] - x) ** 2 + (ys[number] - y) ** 2 <= tolerance2:
+                    return number
+        number = len(xs)
+        xs.append(x)
+        ys.append(y)
+        cells.setdefault((i, j), []).append(number)
+        return number
+
+    def __len__(self):
+        return len(self.xs)
+
+
+class BoxGrid:
+    """
+    Finds the boxes containing a point. The boxes' overall extent is split into about len(boxes) cells, and each box is
+    listed in every cell it overlaps, so a lookup only checks the boxes sharing the point's cell.
+    """
+
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self._cells = {}
+        if not boxes:
+            return
+        self._x0, self._y0 = min(box[0] for box in boxes), min(box[1] for box in boxes)
+        width = max(box[2] for box in boxes) - self._x0
+        height = max(box[3] for box in boxes) - self._y0
+        self._side = max(1, int(math.sqrt(len(boxes))))
+        self._width = width / self._side or 1.0
+        self._height = height / self._side or 1.0
+        for number, (x0, y0, x1, y1) in enumerate(boxes):
+            i0, j0 = self._cell(x0, y0)
+            i1, j1 = self._cell(x1, y1)
+            for i in range(i0, i1 + 1):
+                for j in range(j0, j1 + 1):
+                    self._cells.setdefault((i, j), []).append(number)
+
+    def _cell(self, x, y):
+        i = min(max(int((x - self._x0) / self._width), 0), self._side - 1)
+        j = min(max(int((y - self._y0) / self._height), 0), self._side - 1)
+        return i, j
+
+    def containing(self, x, y):
+        """ Numbers of the boxes containing (x, y). """
+        if not self.boxes:
+            return []
+        boxes = self.boxes
+        return [number for number in self._cells.get(self._cell(x, y), ())
+                if boxes[number][0] <= x <= boxes[number][2] and boxes[number][1] <= y <= boxes[number][3]]
+
+
+class Loop:
+    """
+    One chain of entities joined end to end.
+
+    Attributes:
+    - items (list): (index, reversed) pairs in walk order; index points into the input list, reversed is True where the
+      entity is traversed from its end point to its start point.
+    - closed (bool): Whether the chain ends where it starts.
+    - area (float): Signed area enclosed by the oriented loop; positive for outer loops, negative for holes, 0 for open
+      chains.
+    - outer (bool): False for a closed loop lying inside an odd number of other loops (a hole).
+    - parent (int): Position in the returned list of the smallest loop containing this one, or -1.
+    """
+
+    def __init__(self, items, closed, area=0.0, outer=True, parent=-1):
+        self.items = items
+        self.closed = closed
+        self.area = area
+        self.outer = outer
+        self.parent = parent
+
+    def reverse(self):
+        """ Traverse the loop the other way round. """
+        self.items = [(index, not reversed_) for index, reversed_ in reversed(self.items)]
+        self.area = -self.area
+
+    def __len__(self):
+        return len(self.items)
+
+
+def chain_end_points(ends, tolerance=LOOP_TOLERANCE):
+    """
+    Walk items into chains through their shared end points.
+
+    Walks start at the free ends of open chains (vertices used by an odd number of items), then at the first unvisited
+    item in input order, which is followed in its own direction. At junctions of three or more items the walk takes any
+    unvisited item, so every item ends up in exactly one chain.
+
+    Parameters:
+    - ends (list): ((x0, y0), (x1, y1)) start and end point of each item, or None for items without ends (circles).
+    - tolerance (float): Largest distance between end points that are joined.
+
+    Returns:
+    - list: (items, closed) per chain, items being (index, reversed) pairs as in Loop.
+    """
+    grid = VertexGrid(tolerance)
+    starts, stops, incident = [], [], {}
+    for index, pair in enumerate(ends):
+        if pair is None:
+            starts.append(-1)
+            stops.append(-1)
+            continue
+        (x0, y0), (x1, y1) = pair
+        start, stop = grid.vertex(x0, y0), grid.vertex(x1, y1)
+        starts.append(start)
+        stops.append(stop)
+        incident.setdefault(start, []).append(index)
+        incident.setdefault(stop, []).append(index)
+    used = bytearray(len(ends))
+
+    def walk(vertex, index=None):
+        first, items = vertex, []
+        while True:
+            if index is None:
+                candidates = incident[vertex]
+                while candidates and used[candidates[-1]]:
+                    candidates.pop()
+                if not candidates:
+                    break
+                index = candidates.pop()
+            used[index] = 1
+            backwards = starts[index] != vertex
+            items.append((index, backwards))
+            vertex = starts[index] if backwards else stops[index]
+            index = None
+        return items, vertex == first
+
+    chains = []
+    for vertex, indices in incident.items():
+        if len(indices) % 2 and any(not used[index] for index in indices):
+            chains.append(walk(vertex))
+    for index in range(len(ends)):
+        if starts[index] >= 0 and not used[index]:
+            chains.append(walk(starts[index], index))
+    return chains
+
+
+def _arc_data(params):
+    [(center, start, sweep)] = params
+    radius = math.hypot(start[0] - center[0], start[1] - center[1])
+    return center[0], center[1], radius, math.atan2(start[1] - center[1], start[0] - center[0]), sweep
+
+
+def entity_end_points(entity):
+    """
+    Start and end point of a library entity as ((x0, y0), (x1, y1)); None for circles, which have no ends.
+    """
+    entity_type, params = entity
+    if entity_type == 'line':
+        [(p1, p2)] = params
+        return (p1[0], p1[1]), (p2[0], p2[1])
+    if entity_type == 'arc':
+        cx, cy, radius, angle, sweep = _arc_data(params)
+        return ((cx + radius * math.cos(angle), cy + radius * math.sin(angle)),
+                (cx + radius * math.cos(angle + sweep), cy + radius * math.sin(angle + sweep)))
+    if entity_type == 'spline':
+        points = params[0]
+        return (points[0][0], points[0][1]), (points[-1][0], points[-1][1])
+    return None
+
+
+def _path(entity):
+    """ Points along an entity from its start to its end (arcs and circles sampled), for containment tests. """
+    entity_type, params = entity
+    if entity_type == 'line':
+        [(p1, p2)] = params
+        return [(p1[0], p1[1]), (p2[0], p2[1])]
+    if entity_type == 'spline':
+        return [(p[0], p[1]) for p in params[0]]
+    if entity_type == 'circle':
+        [(center, radius)] = params
+        cx, cy, angle, sweep = center[0], center[1], 0.0, 2 * math.pi
+    else:
+        cx, cy, radius, angle, sweep = _arc_data(params)
+    return [(cx + radius * math.cos(angle + sweep * k / ARC_STEPS), cy + radius * math.sin(angle + sweep * k / ARC_STEPS))
+            for k in range(ARC_STEPS + 1)]
+
+
+def _area_term(entity):
+    """ Half the integral of x dy - y dx along an entity from its start to its end; the terms of a loop sum to its area. """
+    entity_type, params = entity
+    if entity_type == 'circle':
+        return math.pi * params[0][1] ** 2
+    if entity_type == 'arc':
+        cx, cy, radius, angle, sweep = _arc_data(params)
+        end = angle + sweep
+        return 0.5 * (radius * (cx * (math.sin(end) - math.sin(angle)) - cy * (math.cos(end) - math.cos(angle)))
+                      + radius * radius * sweep)
+    path = _path(entity)
+    return 0.5 * sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(path, path[1:]))
+
+
+def _contains(polygon, box, x, y):
+    if not (box[0] <= x <= box[2] and box[1] <= y <= box[3]):
+        return False
+    inside = False
+    for (x0, y0), (x1, y1) in zip(polygon, polygon[1:] + polygon[:1]):
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def find_loops(entities, tolerance=LOOP_TOLERANCE):
+    """
+    Order and orient the entities of a profile into loops.
+
+    Closed loops are oriented so outer boundaries run counter-clockwise and the holes inside them clockwise, which puts
+    the material on the left of every loop. Each circle is a closed loop of its own.
+
+    Parameters:
+    - entities (list): Entities in the library tuple format, in any order.
+    - tolerance (float): Largest distance between end points that are joined.
+
+    Returns:
+    - list: Loop objects, closed loops first from the largest enclosed area down (so every loop comes after the loops
+      containing it), then open chains in the order they were found.
+    """
+    loops = []
+    for index, entity in enumerate(entities):
+        if entity[0] == 'circle':
+            loops.append(Loop([(index, False)], True))
+    for items, closed in chain_end_points([entity_end_points(entity) for entity in entities], tolerance):
+        loops.append(Loop(items, closed))
+
+    closed_loops, shapes = [], []
+    for loop in loops:
+        if not loop.closed:
+            continue
+        polygon = []
+        for index, backwards in loop.items:
+            path = _path(entities[index])
+            polygon.extend(reversed(path[1:]) if backwards else path[:-1])
+            term = _area_term(entities[index])
+            loop.area += -term if backwards else term
+        xs, ys = [p[0] for p in polygon], [p[1] for p in polygon]
+        closed_loops.append(loop)
+        shapes.append((polygon, (min(xs), min(ys), max(xs), max(ys))))
+
+    # Nesting: a loop inside an odd number of other loops is a hole; its parent is the smallest loop around it
+    grid = BoxGrid([box for _, box in shapes])
+    for loop, (polygon, box) in zip(closed_loops, shapes):
+        x, y = polygon[len(polygon) // 2]
+        depth, parent = 0, None
+        for number in grid.containing(x, y):
+            other, (other_polygon, other_box) = closed_loops[number], shapes[number]
+            if other is not loop and _contains(other_polygon, other_box, x, y):
+                depth += 1
+                if parent is None or abs(other.area) < abs(parent.area):
+                    parent = other
+        loop.outer = depth % 2 == 0
+        loop.parent = parent
+        if (loop.area < 0) == loop.outer:
+            loop.reverse()
+
+    ordered = sorted(closed_loops, key=lambda loop: -abs(loop.area)) + [loop for loop in loops if not loop.closed]
+    positions = {id(loop): position for position, loop in enumerate(ordered)}
+    for loop in closed_loops:
+        loop.parent = -1 if loop.parent is None else positions[id(loop.parent)]
+    return ordered
+
+
+def ordered_entities(entities, tolerance=LOOP_TOLERANCE):
+    """
+    Return the entities of a profile loop by loop (outer boundaries before the holes inside them), each loop in walk
+    order. The entities themselves are unchanged; find_loops gives the direction each one is traversed in.
+    """
+    return [entities[index] for loop in find_loops(entities, tolerance) for index, _ in loop.items]
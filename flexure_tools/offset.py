@@ -0,0 +1,363 @@
+'''
+Description: Analytic offset engine for chains of lines, arcs and circles. The chain is ordered and oriented once, then
+any number of concentric offsets are computed in one pass: every segment is offset exactly (lines shift along their
+normal, arcs change radius), neighbouring offsets are trimmed or extended to their intersection, and segments that
+collapse are dropped. All rings are emitted into the sketch in a single compute-deferred batch, after checking that
+no ring crosses itself or another ring.
+'''
+
+import math
+
+from . import biarc, intersect, loops
+
+TOLERANCE = 1e-7  # cm; endpoints closer than this are treated as coincident
+
+
+def _wrap_pi(angle):
+    """ Wrap an angle into (-pi, pi]. """
+    angle = math.fmod(angle + math.pi, 2 * math.pi)
+    if angle <= 0:
+        angle += 2 * math.pi
+    return angle - math.pi
+
+
+# Segments are oriented along the chain and held as plain lists:
+#   ['line', x0, y0, x1, y1]
+#   ['arc', cx, cy, radius, start_angle, sweep]   (sweep > 0 is counter-clockwise, < 0 clockwise)
+
+def _start(seg):
+    if seg[0] == 'line':
+        return seg[1], seg[2]
+    return seg[1] + seg[3] * math.cos(seg[4]), seg[2] + seg[3] * math.sin(seg[4])
+
+
+def _end(seg):
+    if seg[0] == 'line':
+        return seg[3], seg[4]
+    angle = seg[4] + seg[5]
+    return seg[1] + seg[3] * math.cos(angle), seg[2] + seg[3] * math.sin(angle)
+
+
+def _reverse(seg):
+    if seg[0] == 'line':
+        return ['line', seg[3], seg[4], seg[1], seg[2]]
+    return ['arc', seg[1], seg[2], seg[3], seg[4] + seg[5], -seg[5]]
+
+
+def entities_to_segments(entities):
+    """
+    Split library entities into oriented 2D segments and standalone circles.
+
+    Parameters:
+    - entities (list): Entities in the library tuple format. Splines are first replaced by their biarc fit
+      (flexure_tools.biarc), so they are offset exactly like the lines and arcs around them.
+
+    Returns:
+    - Tuple: (segments, circles, z) where segments are unordered 2D segment lists, circles are (cx, cy, radius)
+      tuples and z is the sketch-plane height taken from the first entity.
+    """
+    segments, circles, z = [], [], None
+    for entity_type, params in biarc.splines_to_arcs(entities):
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            segments.append(['line', p1[0], p1[1], p2[0], p2[1]])
+            z = p1[2] if z is None else z
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            radius = math.hypot(start[0] - center[0], start[1] - center[1])
+            segments.append(['arc', center[0], center[1], radius, math.atan2(start[1] - center[1], start[0] - center[0]), sweep])
+            z = center[2] if z is None else z
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            circles.append((center[0], center[1], radius))
+            z = center[2] if z is None else z
+        else:
+            raise ValueError('Cannot offset {} entities'.format(entity_type))
+    return segments, circles, 0.0 if z is None else z
+
+
+def order_chain(segments, tolerance=TOLERANCE):
+    """
+    Order and orient segments into a single connected chain, following shared endpoints (flexure_tools.loops).
+
+    Parameters:
+    - segments (list): Unordered segments from entities_to_segments.
+    - tolerance (float): Maximum distance between endpoints considered connected.
+
+    Returns:
+    - Tuple: (chain, closed) where chain is the ordered list of oriented segments and closed tells whether the last
+      segment ends where the first one starts.
+    """
+    if not segments:
+        return [], False
+    chains = loops.chain_end_points([(_start(seg), _end(seg)) for seg in segments], tolerance)
+    if len(chains) > 1:
+        raise ValueError('Curves do not form a single connected chain')
+    items, closed = chains[0]
+    return [_reverse(segments[index]) if backwards else segments[index] for index, backwards in items], closed
+
+
+def _polyline(chain, steps=8):
+    """ Sample a chain as a polyline (arcs subdivided) for orientation and containment tests. """
+    points = []
+    for seg in chain:
+        if seg[0] == 'line':
+            points.append((seg[1], seg[2]))
+        else:
+            for k in range(steps):
+                angle = seg[4] + seg[5] * k / steps
+                points.append((seg[1] + seg[3] * math.cos(angle), seg[2] + seg[3] * math.sin(angle)))
+    return points
+
+
+def _signed_area(points):
+    n = len(points)
+    return 0.5 * sum(points[i][0] * points[(i + 1) % n][1] - points[(i + 1) % n][0] * points[i][1] for i in range(n))
+
+
+def _contains(points, x, y):
+    inside = False
+    n = len(points)
+    for i in range(n):
+        (x0, y0), (x1, y1) = points[i], points[(i + 1) % n]
+        if (y0 > y) != (y1 > y) and x < x0 + (y - y0) * (x1 - x0) / (y1 - y0):
+            inside = not inside
+    return inside
+
+
+def _side_of(chain, x, y):
+    """ Return +1 if (x, y) lies to the left of the nearest chain segment, -1 otherwise. """
+    best, side = float('inf'), 1
+    for seg in chain:
+        if seg[0] == 'line':
+            dx, dy = seg[3] - seg[1], seg[4] - seg[2]
+            length2 = dx * dx + dy * dy or 1.0
+            t = min(max(((x - seg[1]) * dx + (y - seg[2]) * dy) / length2, 0.0), 1.0)
+            distance = math.hypot(x - seg[1] - t * dx, y - seg[2] - t * dy)
+            cross = dx * (y - seg[2]) - dy * (x - seg[1])
+        else:
+            distance = abs(math.hypot(x - seg[1], y - seg[2]) - seg[3])
+            # Left of a counter-clockwise arc is toward its center
+            cross = (seg[3] - math.hypot(x - seg[1], y - seg[2])) * seg[5]
+        if distance < best:
+            best, side = distance, 1 if cross > 0 else -1
+    return side
+
+
+def _offset_segment(seg, distance):
+    """ Offset a segment by distance along its left normal. Returns None for degenerate lines and collapsed arcs. """
+    if seg[0] == 'line':
+        dx, dy = seg[3] - seg[1], seg[4] - seg[2]
+        length = math.hypot(dx, dy)
+        if length <= TOLERANCE:
+            return None
+        nx, ny = -dy / length * distance, dx / length * distance
+        return ['line', seg[1] + nx, seg[2] + ny, seg[3] + nx, seg[4] + ny]
+    radius = seg[3] - distance if seg[5] > 0 else seg[3] + distance
+    if radius <= TOLERANCE:
+        return None
+    return ['arc', seg[1], seg[2], radius, seg[4], seg[5]]
+
+
+def _intersections(a, b):
+    """ Intersection points of the carriers (infinite line or full circle) of two segments. """
+    if a[0] == 'line' and b[0] == 'line':
+        dax, day = a[3] - a[1], a[4] - a[2]
+        dbx, dby = b[3] - b[1], b[4] - b[2]
+        denom = dax * dby - day * dbx
+        if abs(denom) <= 1e-14 * (math.hypot(dax, day) * math.hypot(dbx, dby)):
+            return []
+        t = ((b[1] - a[1]) * dby - (b[2] - a[2]) * dbx) / denom
+        return [(a[1] + t * dax, a[2] + t * day)]
+    if a[0] == 'arc' and b[0] == 'arc':
+        dx, dy = b[1] - a[1], b[2] - a[2]
+        d = math.hypot(dx, dy)
+        if d <= 1e-14 or d > a[3] + b[3] or d < abs(a[3] - b[3]):
+            return []
+        along = (a[3] * a[3] - b[3] * b[3] + d * d) / (2 * d)
+        h = math.sqrt(max(a[3] * a[3] - along * along, 0.0))
+        mx, my = a[1] + along * dx / d, a[2] + along * dy / d
+        return [(mx - h * dy / d, my + h * dx / d), (mx + h * dy / d, my - h * dx / d)]
+    line, arc = (a, b) if a[0] == 'line' else (b, a)
+    dx, dy = line[3] - line[1], line[4] - line[2]
+    fx, fy = line[1] - arc[1], line[2] - arc[2]
+    qa, qb, qc = dx * dx + dy * dy, 2 * (fx * dx + fy * dy), fx * fx + fy * fy - arc[3] * arc[3]
+    disc = qb * qb - 4 * qa * qc
+    if disc < 0:
+        return []
+    root = math.sqrt(disc)
+    return [(line[1] + t * dx, line[2] + t * dy) for t in ((-qb - root) / (2 * qa), (-qb + root) / (2 * qa))]
+
+
+def _set_end(seg, point):
+    if seg[0] == 'line':
+        seg[3], seg[4] = point
+    else:
+        end_angle = seg[4] + seg[5]
+        seg[5] += _wrap_pi(math.atan2(point[1] - seg[2], point[0] - seg[1]) - end_angle)
+
+
+def _set_start(seg, point):
+    if seg[0] == 'line':
+        seg[1], seg[2] = point
+    else:
+        delta = _wrap_pi(math.atan2(point[1] - seg[2], point[0] - seg[1]) - seg[4])
+        seg[4] += delta
+        seg[5] -= delta
+
+
+def _join(offsets, originals, closed, tolerance):
+    """
+    Trim or extend neighbouring offset segments so they meet.
+
+    Returns:
+    - Tuple: (trimmed, round_joins) where trimmed is aligned with offsets and round_joins maps the index of a segment
+      to the arc that closes the gap after it, for corners whose carriers do not intersect.
+    """
+    trimmed = [list(seg) for seg in offsets]
+    round_joins = {}
+    count = len(trimmed)
+    for i in range(count if closed else count - 1):
+        a, b = trimmed[i], trimmed[(i + 1) % count]
+        end, start = _end(a), _start(b)
+        if math.hypot(end[0] - start[0], end[1] - start[1]) <= tolerance:
+            continue
+        mid = ((end[0] + start[0]) / 2, (end[1] + start[1]) / 2)
+        candidates = _intersections(a, b)
+        if candidates:
+            point = min(candidates, key=lambda p: (p[0] - mid[0]) ** 2 + (p[1] - mid[1]) ** 2)
+            _set_end(a, point)
+            _set_start(b, point)
+        else:
+            # Round the corner about the point the two original segments shared
+            corner_end, corner_start = _end(originals[i]), _start(originals[(i + 1) % count])
+            cx, cy = (corner_end[0] + corner_start[0]) / 2, (corner_end[1] + corner_start[1]) / 2
+            start_angle = math.atan2(end[1] - cy, end[0] - cx)
+            sweep = _wrap_pi(math.atan2(start[1] - cy, start[0] - cx) - start_angle)
+            round_joins[i] = ['arc', cx, cy, math.hypot(end[0] - cx, end[1] - cy), start_angle, sweep]
+    return trimmed, round_joins
+
+
+def _collapsed(original, trimmed):
+    """ A trimmed segment has collapsed when it reversed direction or shrank to nothing. """
+    if trimmed[0] == 'line':
+        return ((trimmed[3] - trimmed[1]) * (original[3] - original[1]) + (trimmed[4] - trimmed[2]) * (original[4] - original[2])) <= 0
+    return trimmed[5] * original[5] <= 0 or abs(trimmed[5]) * trimmed[3] <= TOLERANCE
+
+
+def offset_segments(chain, closed, distance, tolerance=TOLERANCE):
+    """
+    Offset an ordered chain by distance along the left normal of its segments.
+
+    Parameters:
+    - chain (list): Ordered, oriented segments from order_chain.
+    - closed (bool): Whether the chain is a closed loop.
+    - distance (float): Offset distance; positive moves to the left of the chain direction.
+    - tolerance (float): Endpoint coincidence tolerance.
+
+    Returns:
+    - list: The offset chain as oriented segments. Empty if every segment collapsed.
+    """
+    pairs = [(seg, _offset_segment(seg, distance)) for seg in chain]
+    pairs = [pair for pair in pairs if pair[1] is not None]
+
+    # Joining can make short segments invert; drop them and re-join until the chain is stable
+    while pairs:
+        originals, offsets = [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+        trimmed, round_joins = _join(offsets, originals, closed, tolerance)
+        keep = [i for i, seg in enumerate(trimmed) if not _collapsed(offsets[i], seg)]
+        if len(keep) < len(pairs):
+            pairs = [pairs[i] for i in keep]
+            continue
+        result = []
+        for i, seg in enumerate(trimmed):
+            result.append(seg)
+            if i in round_joins:
+                result.append(round_joins[i])
+        return result
+    return []
+
+
+def segments_to_entities(segments, z=0.0):
+    """
+    Convert oriented segments back to library entities. Clockwise arcs are re-expressed from their end point so every
+    sweep is positive, as addByCenterStartSweep expects.
+
+    Parameters:
+    - segments (list): Oriented segments.
+    - z (float): Sketch-plane height written into every point.
+
+    Returns:
+    - list: Entities in the library tuple format.
+    """
+    entities = []
+    for seg in segments:
+        if seg[0] == 'line':
+            entities.append(('line', [((seg[1], seg[2], z), (seg[3], seg[4], z))]))
+        else:
+            start = _start(seg) if seg[5] > 0 else _end(seg)
+            entities.append(('arc', [((seg[1], seg[2], z), (start[0], start[1], z), abs(seg[5]))]))
+    return entities
+
+
+def offset_chain(entities, distances, direction_point=None, tolerance=TOLERANCE):
+    """
+    Compute several offsets of a chain of lines, arcs and circles in one pass.
+
+    Parameters:
+    - entities (list): The chain in the library tuple format, in any order and orientation. Circles are offset on
+      their own, each as a separate ring.
+    - distances (list): Offset distances in cm. Positive distances move toward direction_point, negative away from it.
+    - direction_point (tuple): (x, y) point picking the side of a positive offset, e.g. the profile centroid. Defaults
+      to the left side of the chain (the inside of a counter-clockwise loop).
+    - tolerance (float): Endpoint coincidence tolerance.
+
+    Returns:
+    - list: One list of library entities per distance, in the order of distances.
+    """
+    segments, circles, z = entities_to_segments(entities)
+    chain, closed = order_chain(segments, tolerance)
+
+    # Work out once which side of the chain direction_point is on; every ring reuses it
+    side = 1
+    if chain and direction_point is not None:
+        if closed:
+            polygon = _polyline(chain)
+            inside = _contains(polygon, direction_point[0], direction_point[1])
+            side = 1 if inside == (_signed_area(polygon) > 0) else -1
+        else:
+            side = _side_of(chain, direction_point[0], direction_point[1])
+
+    rings = []
+    for distance in distances:
+        ring = segments_to_entities(offset_segments(chain, closed, side * distance, tolerance), z) if chain else []
+        for cx, cy, radius in circles:
+            inside = direction_point is None or math.hypot(direction_point[0] - cx, direction_point[1] - cy) < radius
+            new_radius = radius - distance if inside else radius + distance
+            if new_radius > tolerance:
+                ring.append(('circle', [((cx, cy, z), new_radius)]))
+        rings.append(ring)
+    return rings
+
+
+def emit_rings(sketch, rings, validate=True):
+    """
+    Add every offset ring to the sketch in one compute-deferred batch.
+
+    Parameters:
+    - sketch (adsk.fusion.Sketch): The sketch to draw into.
+    - rings (list): Rings returned by offset_chain.
+    - validate (bool): Check the rings for crossings first (flexure_tools.intersect) and add nothing if there are any.
+
+    Returns:
+    - int: The number of sketch entities created.
+    """
+    from . import placement  # Imported here: it imports adsk, which offset_chain does not need
+
+    entities = [e for ring in rings for e in ring]
+    if validate:
+        crossing = intersect.find_profile_intersection(entities)
+        if crossing is not None:
+            raise ValueError('The offset geometry crosses itself near ({:.4f}, {:.4f}) cm; try a smaller offset distance '
+                             'or fewer offsets.'.format(*crossing))
+    return placement.emit_entities(sketch, placement.scale_entities(entities, 0.0, 0.0, 1.0))
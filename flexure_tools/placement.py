@@ -0,0 +1,321 @@
+'''
+Description: Batched placement engine for library profiles. All scaled and translated coordinates of a profile are
+computed in one pass into flat float buffers, then emitted into the sketch inside a single isComputeDeferred window so
+the sketch solver recomputes once per placement instead of once per entity.
+PlacementCache keeps recently scaled profiles so repeat placements of the same profile, size and fit skip the math.
+Consecutive entities share their end SketchPoints instead of each creating its own, which halves the points (and the
+coincident pairs the solver has to keep together) of a chained profile and closes loops without any fix-up.
+'''
+
+import adsk.core
+import math
+import threading
+from array import array
+from collections import OrderedDict
+
+from . import biarc, intersect, loops
+from .symmetry import SymmetricProfile
+# Entity kinds (stored in ScaledGeometry.order to preserve the source ordering) and buffer strides, shared with Profile
+from .profile import Profile, LINE, ARC, CIRCLE, LINE_STRIDE, ARC_STRIDE, CIRCLE_STRIDE
+
+VERTEX_TOLERANCE = 1e-7  # cm; entity end points closer than this are emitted as one shared SketchPoint
+
+
+class ScaledGeometry:
+    """
+    Flat, sketch-ready coordinates of a scaled and translated profile.
+
+    Attributes:
+    - lines (array('d')): Line endpoints, LINE_STRIDE floats per line.
+    - arcs (array('d')): Arc centers, start points and sweep angles, ARC_STRIDE floats per arc.
+    - circles (array('d')): Circle centers and radii, CIRCLE_STRIDE floats per circle.
+    - order (array('b')): Kind of each entity (LINE, ARC or CIRCLE) in the order it appeared in the profile.
+    - vertices (array('i')): Start and end vertex number of each entity (-1 for circles), filled in by connect_vertices
+      on first emission; None until then. Translation does not change it, so cached geometry keeps it.
+    """
+
+    def __init__(self):
+        self.lines = array('d')
+        self.arcs = array('d')
+        self.circles = array('d')
+        self.order = array('b')
+        self.vertices = None
+
+    def __len__(self):
+        return len(self.order)
+
+
+def scale_entities(entities, offsetX, offsetY, scaleFactor, spline_tolerance=biarc.BIARC_TOLERANCE):
+    """
+    Scale a profile about the origin and translate it by (offsetX, offsetY) in a single pass.
+
+    Parameters:
+    - entities (list or Profile): Profile entities in the library format, e.g. ('line', [((x1, y1, z1), (x2, y2, z2))]),
+      or a Profile, whose arrays are transformed whole, or a SymmetricProfile, whose sector is expanded through the
+      symmetry matrices with the scale and translation folded in.
+    - offsetX (float): Translation applied along X after scaling.
+    - offsetY (float): Translation applied along Y after scaling.
+    - scaleFactor (float): Uniform scale applied to X and Y coordinates and to radii.
+    - spline_tolerance (float): Spline entries are replaced by biarcs within this distance of their fit points
+      (in profile units, before scaling), so they are emitted as lines and arcs like the rest of the profile.
+
+    Returns:
+    - ScaledGeometry: The transformed coordinates.
+    """
+    if isinstance(entities, (Profile, SymmetricProfile)):
+        if isinstance(entities, SymmetricProfile):
+            profile = entities.expand(scaleFactor, offsetX, offsetY)
+        else:
+            profile = entities.copy().transform(scaleFactor, offsetX, offsetY)
+        if profile.spline_counts:
+            # Fitted after scaling, so the tolerance scales with the profile
+            profile = Profile.from_entities(biarc.splines_to_arcs(profile, spline_tolerance * scaleFactor))
+        geometry = ScaledGeometry()
+        geometry.lines, geometry.arcs, geometry.circles, geometry.order = profile.lines, profile.arcs, profile.circles, profile.order
+        return geometry
+
+    entities = biarc.splines_to_arcs(entities, spline_tolerance)
+    geometry = ScaledGeometry()
+    lines, arcs, circles, order = geometry.lines, geometry.arcs, geometry.circles, geometry.order
+    s, dx, dy = scaleFactor, offsetX, offsetY
+
+    for entity_type, params in entities:
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            lines.extend((p1[0] * s + dx, p1[1] * s + dy, p1[2], p2[0] * s + dx, p2[1] * s + dy, p2[2]))
+            order.append(LINE)
+        elif entity_type == 'arc':
+            # Scaling the start point about the origin is equivalent to re-deriving it from the scaled radius and the
+            # start angle around the scaled center, without the atan2/cos/sin round-trip.
+            [(center, start, sweep)] = params
+            arcs.extend((center[0] * s + dx, center[1] * s + dy, center[2], start[0] * s + dx, start[1] * s + dy, start[2], sweep))
+            order.append(ARC)
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            circles.extend((center[0] * s + dx, center[1] * s + dy, center[2], radius * s))
+            order.append(CIRCLE)
+
+    return geometry
+
+
+def connect_vertices(geometry, tolerance=VERTEX_TOLERANCE):
+    """
+    Number the distinct end points of a ScaledGeometry's lines and arcs.
+
+    End points within tolerance of each other get the same number (see loops.VertexGrid). Arc end points are derived
+    from the center, start and sweep the same way Fusion derives them.
+
+    Parameters:
+    - geometry (ScaledGeometry): Coordinates produced by scale_entities.
+    - tolerance (float): Largest distance between end points that are treated as one.
+
+    Returns:
+    - array('i'): Start and end vertex number of each entity in geometry.order; -1, -1 for circles.
+    """
+    vertex = loops.VertexGrid(tolerance).vertex
+    vertices = array('i')
+    line_data, arc_data = geometry.lines, geometry.arcs
+    li = ai = 0
+    for kind in geometry.order:
+        if kind == LINE:
+            vertices.append(vertex(line_data[li], line_data[li + 1]))
+            vertices.append(vertex(line_data[li + 3], line_data[li + 4]))
+            li += LINE_STRIDE
+        elif kind == ARC:
+            cx, cy, _, sx, sy, _, sweep = arc_data[ai:ai + ARC_STRIDE]
+            radius, angle = math.hypot(sx - cx, sy - cy), math.atan2(sy - cy, sx - cx) + sweep
+            vertices.append(vertex(sx, sy))
+            vertices.append(vertex(cx + radius * math.cos(angle), cy + radius * math.sin(angle)))
+            ai += ARC_STRIDE
+        else:
+            vertices.extend((-1, -1))
+    return vertices
+
+
+def emit_entities(sketch, geometry, offsetX=0.0, offsetY=0.0, share_points=True):
+    """
+    Create the sketch entities for a ScaledGeometry with the sketch solver deferred for the whole batch.
+
+    With share_points, an end point already created by an earlier entity is passed back to the API as that SketchPoint,
+    so chained entities are connected through one point instead of two coincident ones. Arcs cannot be given their end
+    point; when an arc ends on an existing point, the arc's own end point is merged into it.
+
+    Parameters:
+    - sketch (adsk.fusion.Sketch): The sketch to add the entities to.
+    - geometry (ScaledGeometry): Coordinates produced by scale_entities.
+    - offsetX (float): Extra translation along X applied while emitting, e.g. to place cached origin-centered geometry.
+    - offsetY (float): Extra translation along Y applied while emitting.
+    - share_points (bool): Connect entities through shared end points; False creates separate points for every entity.
+
+    Returns:
+    - int: The number of sketch entities created.
+    """
+    create = adsk.core.Point3D.create
+    curves = sketch.sketchCurves
+    lines, arcs, circles = curves.sketchLines, curves.sketchArcs, curves.sketchCircles
+    line_data, arc_data, circle_data = geometry.lines, geometry.arcs, geometry.circles
+    dx, dy = offsetX, offsetY
+    if share_points and geometry.vertices is None:
+        geometry.vertices = connect_vertices(geometry)
+    vertices = geometry.vertices if share_points else None
+    points = {}  # Vertex number -> SketchPoint created for it
+
+    def point(number, x, y, z):
+        existing = points.get(number) if vertices is not None else None
+        return existing if existing is not None else create(x + dx, y + dy, z)
+
+    was_deferred = sketch.isComputeDeferred
+    sketch.isComputeDeferred = True
+    created = 0
+    try:
+        li = ai = ci = 0
+        for n, kind in enumerate(geometry.order):
+            start, end = (vertices[2 * n], vertices[2 * n + 1]) if vertices is not None else (-1, -1)
+            if kind == LINE:
+                x1, y1, z1, x2, y2, z2 = line_data[li:li + LINE_STRIDE]
+                li += LINE_STRIDE
+                if vertices is not None and start == end:
+                    continue  # Zero-length: both ends would be the same SketchPoint
+                line = lines.addByTwoPoints(point(start, x1, y1, z1), point(end, x2, y2, z2))
+                if vertices is not None:
+                    if start not in points:
+                        points[start] = line.startSketchPoint
+                    if end not in points:
+                        points[end] = line.endSketchPoint
+            elif kind == ARC:
+                cx, cy, cz, sx, sy, sz, sweep = arc_data[ai:ai + ARC_STRIDE]
+                ai += ARC_STRIDE
+                arc = arcs.addByCenterStartSweep(create(cx + dx, cy + dy, cz), point(start, sx, sy, sz), sweep)
+                if vertices is not None:
+                    if start not in points:
+                        points[start] = arc.startSketchPoint
+                    existing = points.get(end)
+                    if existing is None:
+                        points[end] = arc.endSketchPoint
+                    else:
+                        existing.merge(arc.endSketchPoint)
+            else:
+                cx, cy, cz, radius = circle_data[ci:ci + CIRCLE_STRIDE]
+                circles.addByCenterRadius(create(cx + dx, cy + dy, cz), radius)
+                ci += CIRCLE_STRIDE
+            created += 1
+    finally:
+        # Restoring the previous state triggers the single recompute for the whole batch
+        sketch.isComputeDeferred = was_deferred
+
+    return created
+
+
+class PlacementCache:
+    """
+    Bounded least-recently-used cache of profiles scaled about the origin.
+
+    Entries are keyed by (profile id, scale factor rounded to scale_tolerance, fit type). The cached geometry is not
+    translated; pass the target centroid to emit_entities as offsetX/offsetY.
+    """
+
+    def __init__(self, maxsize=32, scale_tolerance=1e-6):
+        """
+        Parameters:
+        - maxsize (int): Maximum number of scaled profiles kept; the least recently used entry is evicted first.
+        - scale_tolerance (float): Scale factors closer than this share a cache entry.
+        """
+        self.maxsize = maxsize
+        self.scale_tolerance = scale_tolerance
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._crossings = {}  # profile id -> first self-intersection found, or None
+        self._lock = threading.Lock()  # get() is also called from the background geometry worker
+
+    def key(self, profile_id, scaleFactor, fitType):
+        return (profile_id, round(scaleFactor / self.scale_tolerance), fitType)
+
+    def get(self, profile_id, entities, scaleFactor, fitType):
+        """
+        Return the origin-centered geometry of a profile at a scale, computing and caching it on a miss.
+
+        Parameters:
+        - profile_id (hashable): Identifies the profile, e.g. (category, name).
+        - entities (list or callable): The profile entities, or a function returning them (only called on a miss).
+        - scaleFactor (float): Scale applied to the profile.
+        - fitType (str): Fit setting the scale was derived from ('Tight', 'Normal', 'Loose').
+
+        Returns:
+        - ScaledGeometry: Geometry scaled about the origin and not yet translated.
+        """
+        key = self.key(profile_id, scaleFactor, fitType)
+        with self._lock:
+            geometry = self._entries.get(key)
+            if geometry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return geometry
+
+            self.misses += 1
+            geometry = scale_entities(entities() if callable(entities) else entities, 0.0, 0.0, scaleFactor)
+            geometry.vertices = connect_vertices(geometry)  # Here rather than at emission, off the UI thread
+            self._entries[key] = geometry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return geometry
+
+    def intersection(self, profile_id, entities):
+        """
+        Return where a profile crosses itself, checking each profile once (uniform scaling cannot add crossings).
+
+        Parameters:
+        - profile_id (hashable): Identifies the profile, e.g. (category, name).
+        - entities (list or callable): The profile entities, or a function returning them (only called once per profile).
+
+        Returns:
+        - Tuple: (x, y) of a crossing in profile coordinates, or None if the profile is clean.
+        """
+        with self._lock:
+            if profile_id not in self._crossings:
+                profile = entities() if callable(entities) else entities
+                self._crossings[profile_id] = intersect.find_profile_intersection(profile)
+            return self._crossings[profile_id]
+
+    def clear(self):
+        self._entries.clear()
+        self._crossings.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """ Return hit/miss counters and current size as a dict. """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'size': len(self._entries),
+                'maxsize': self.maxsize}
+
+
+def format_placement_summary(timings, solve_seconds=0.0, problems=()):
+    """
+    Summarise a multi-target placement for a single message box.
+
+    Parameters:
+    - timings (list): One dict per target with 'target', 'radius', 'placed', 'compute' and 'emit' (seconds).
+    - solve_seconds (float): Time spent in the final sketch recompute.
+    - problems (list): Messages about selections that were left out of the run, listed after the skipped targets.
+
+    Returns:
+    - str: The summary text.
+    """
+    placed = [t for t in timings if t['placed']]
+    compute = sum(t['compute'] for t in timings)
+    emit = sum(t['emit'] for t in timings)
+    lines = ['Placed {} of {} targets in {:.1f} ms (compute {:.1f} ms, emit {:.1f} ms, solve {:.1f} ms).'.format(
+        len(placed), len(timings), (compute + emit + solve_seconds) * 1e3, compute * 1e3, emit * 1e3, solve_seconds * 1e3)]
+    skipped = [t for t in timings if not t['placed']]
+    if skipped:
+        lines.append('Skipped targets (no enclosed area): {}'.format(', '.join(str(t['target'] + 1) for t in skipped)))
+    lines.extend(problems)
+    if placed:
+        slowest = max(placed, key=lambda t: t['compute'] + t['emit'])
+        lines.append('Slowest target: #{} (radius {:.4g} cm), {:.2f} ms.'.format(
+            slowest['target'] + 1, slowest['radius'], (slowest['compute'] + slowest['emit']) * 1e3))
+    return '\n'.join(lines)
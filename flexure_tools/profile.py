@@ -0,0 +1,307 @@
+'''
+Description: Compact in-memory profile. Lines, arcs and circles live in separate contiguous float64 arrays with one
+kind code per entity recording the profile order, instead of a tuple-of-lists per entity; a large library takes about
+a tenth of the memory, and scaling, translation, centroid and bounds work on whole arrays.
+A Profile iterates as legacy ('line', [...]) tuples, so code written against the tuple format keeps working with it.
+'''
+
+import math
+from array import array
+
+# Entity kind codes stored in Profile.order (the same codes as the profile store payload)
+LINE, ARC, CIRCLE, SPLINE = 0, 1, 2, 3
+
+# Number of floats stored per entity in each buffer
+LINE_STRIDE = 6    # x1, y1, z1, x2, y2, z2
+ARC_STRIDE = 7     # cx, cy, cz, sx, sy, sz, sweep
+CIRCLE_STRIDE = 4  # cx, cy, cz, radius
+POINT_STRIDE = 3   # x, y, z of each spline fit point
+
+# Offsets of the in-plane coordinates within each stride
+_X_OFFSETS = {LINE: (0, 3), ARC: (0, 3), CIRCLE: (0,)}
+_Y_OFFSETS = {LINE: (1, 4), ARC: (1, 4), CIRCLE: (1,)}
+
+
+def _map_strided(values, start, stride, scale, offset):
+    """ values[start::stride] = values[start::stride] * scale + offset, in place. """
+    if values:
+        values[start::stride] = array('d', [v * scale + offset for v in values[start::stride]])
+
+
+class Profile:
+    """
+    A flexure profile held in flat float64 arrays.
+
+    Attributes:
+    - lines (array('d')): Line endpoints, LINE_STRIDE floats per line.
+    - arcs (array('d')): Arc centers, start points and counter-clockwise sweeps, ARC_STRIDE floats per arc.
+    - circles (array('d')): Circle centers and radii, CIRCLE_STRIDE floats per circle.
+    - spline_points (array('d')): Fit points of every spline, POINT_STRIDE floats per point.
+    - spline_counts (array('I')): Number of fit points of each spline.
+    - order (array('b')): Kind code of each entity in profile order.
+    """
+    __slots__ = ('lines', 'arcs', 'circles', 'spline_points', 'spline_counts', 'order')
+
+    def __init__(self):
+        self.lines = array('d')
+        self.arcs = array('d')
+        self.circles = array('d')
+        self.spline_points = array('d')
+        self.spline_counts = array('I')
+        self.order = array('b')
+
+    @classmethod
+    def from_entities(cls, entities):
+        """
+        Build a Profile from entities in the legacy tuple format.
+
+        Parameters:
+        - entities (iterable): e.g. [('line', [((x1, y1, z1), (x2, y2, z2))]), ('arc', [(center, start, sweep)]), ...].
+        """
+        if isinstance(entities, Profile):
+            return entities.copy()
+        profile = cls()
+        lines, arcs, circles, order = profile.lines, profile.arcs, profile.circles, profile.order
+        for entity_type, params in entities:
+            if entity_type == 'line':
+                [(p1, p2)] = params
+                lines.extend(p1)
+                lines.extend(p2)
+                order.append(LINE)
+            elif entity_type == 'arc':
+                [(center, start, sweep)] = params
+                arcs.extend(center)
+                arcs.extend(start)
+                arcs.append(sweep)
+                order.append(ARC)
+            elif entity_type == 'circle':
+                [(center, radius)] = params
+                circles.extend(center)
+                circles.append(radius)
+                order.append(CIRCLE)
+            elif entity_type == 'spline':
+                [points] = params
+                for point in points:
+                    profile.spline_points.extend(point)
+                profile.spline_counts.append(len(points))
+                order.append(SPLINE)
+            else:
+                raise ValueError('Unknown entity type {!r}'.format(entity_type))
+        return profile
+
+    def __len__(self):
+        return len(self.order)
+
+    def __iter__(self):
+        """ Yield the entities in profile order in the legacy tuple format. """
+        lines, arcs, circles, points = self.lines, self.arcs, self.circles, self.spline_points
+        li = ai = ci = pi = si = 0
+        for kind in self.order:
+            if kind == LINE:
+                yield ('line', [(tuple(lines[li:li + 3]), tuple(lines[li + 3:li + 6]))])
+                li += LINE_STRIDE
+            elif kind == ARC:
+                yield ('arc', [(tuple(arcs[ai:ai + 3]), tuple(arcs[ai + 3:ai + 6]), arcs[ai + 6])])
+                ai += ARC_STRIDE
+            elif kind == CIRCLE:
+                yield ('circle', [(tuple(circles[ci:ci + 3]), circles[ci + 3])])
+                ci += CIRCLE_STRIDE
+            else:
+                end = pi + POINT_STRIDE * self.spline_counts[si]
+                yield ('spline', [[tuple(points[j:j + 3]) for j in range(pi, end, POINT_STRIDE)]])
+                pi, si = end, si + 1
+
+    def to_entities(self):
+        """ Return the entities as a list in the legacy tuple format. """
+        return list(self)
+
+    def counts(self):
+        """ Return {'lines', 'arcs', 'circles', 'splines'} entity counts. """
+        return {'lines': len(self.lines) // LINE_STRIDE, 'arcs': len(self.arcs) // ARC_STRIDE,
+                'circles': len(self.circles) // CIRCLE_STRIDE, 'splines': len(self.spline_counts)}
+
+    def copy(self):
+        profile = Profile()
+        for name in Profile.__slots__:
+            setattr(profile, name, array(getattr(self, name).typecode, getattr(self, name)))
+        return profile
+
+    def nbytes(self):
+        """ Bytes held by the coordinate buffers. """
+        return sum(len(a) * a.itemsize for a in (getattr(self, name) for name in Profile.__slots__))
+
+    # Whole-array transforms
+
+    def transform(self, scale=1.0, dx=0.0, dy=0.0):
+        """
+        Scale about the origin, then translate, in place. Z coordinates and sweeps are unchanged; radii scale.
+
+        Parameters:
+        - scale (float): Uniform scale of X, Y and radii.
+        - dx, dy (float): Translation applied after scaling.
+
+        Returns:
+        - Profile: self, for chaining.
+        """
+        for values, stride, kind in ((self.lines, LINE_STRIDE, LINE), (self.arcs, ARC_STRIDE, ARC),
+                                     (self.circles, CIRCLE_STRIDE, CIRCLE)):
+            for start in _X_OFFSETS[kind]:
+                _map_strided(values, start, stride, scale, dx)
+            for start in _Y_OFFSETS[kind]:
+                _map_strided(values, start, stride, scale, dy)
+        _map_strided(self.circles, 3, CIRCLE_STRIDE, scale, 0.0)
+        _map_strided(self.spline_points, 0, POINT_STRIDE, scale, dx)
+        _map_strided(self.spline_points, 1, POINT_STRIDE, scale, dy)
+        return self
+
+    def scale(self, factor):
+        return self.transform(factor)
+
+    def translate(self, dx, dy):
+        return self.transform(1.0, dx, dy)
+
+    def transformed(self, scale=1.0, dx=0.0, dy=0.0):
+        """ Return a scaled and translated copy, leaving this profile unchanged. """
+        return self.copy().transform(scale, dx, dy)
+
+    def apply_matrix(self, a, b, c, d, dx=0.0, dy=0.0):
+        """
+        Map every point through x' = a x + b y + dx, y' = c x + d y + dy, in place.
+
+        The matrix must be a rotation or reflection times a uniform scale; radii scale by sqrt(|ad - bc|). A reflection
+        reverses the arcs' direction, so each arc then starts from the image of its old end point to stay
+        counter-clockwise.
+
+        Returns:
+        - Profile: self, for chaining.
+        """
+        determinant = a * d - b * c
+        arcs = self.arcs
+        if determinant < 0 and arcs:
+            # Move every arc's start to its end point before mapping
+            for i in range(0, len(arcs), ARC_STRIDE):
+                cx, cy, sx, sy, sweep = arcs[i], arcs[i + 1], arcs[i + 3], arcs[i + 4], arcs[i + 6]
+                cos_sweep, sin_sweep = math.cos(sweep), math.sin(sweep)
+                rx, ry = sx - cx, sy - cy
+                arcs[i + 3], arcs[i + 4] = cx + rx * cos_sweep - ry * sin_sweep, cy + rx * sin_sweep + ry * cos_sweep
+        for values, stride, x_offsets in ((self.lines, LINE_STRIDE, (0, 3)), (arcs, ARC_STRIDE, (0, 3)),
+                                          (self.circles, CIRCLE_STRIDE, (0,)), (self.spline_points, POINT_STRIDE, (0,))):
+            for x_offset in x_offsets if values else ():
+                xs, ys = values[x_offset::stride], values[x_offset + 1::stride]
+                values[x_offset::stride] = array('d', [a * x + b * y + dx for x, y in zip(xs, ys)])
+                values[x_offset + 1::stride] = array('d', [c * x + d * y + dy for x, y in zip(xs, ys)])
+        _map_strided(self.circles, 3, CIRCLE_STRIDE, math.sqrt(abs(determinant)), 0.0)
+        return self
+
+    def extend(self, other):
+        """ Append the entities of another Profile after this profile's entities. """
+        for name in Profile.__slots__:
+            getattr(self, name).extend(getattr(other, name))
+        return self
+
+    # Measurements
+
+    def _arc_geometry(self):
+        """ Yield (cx, cy, radius, start_angle, sweep) of every arc. """
+        arcs = self.arcs
+        for i in range(0, len(arcs), ARC_STRIDE):
+            cx, cy, _, sx, sy, _, sweep = arcs[i:i + ARC_STRIDE]
+            yield cx, cy, math.hypot(sx - cx, sy - cy), math.atan2(sy - cy, sx - cx), sweep
+
+    def bounds(self):
+        """
+        Exact axis-aligned bounds of the profile in its plane.
+
+        Returns:
+        - Tuple: (xmin, ymin, xmax, ymax), or None for an empty profile.
+        """
+        xs, ys = [], []
+        if self.lines:
+            xs += (min(self.lines[0::3]), max(self.lines[0::3]))
+            ys += (min(self.lines[1::3]), max(self.lines[1::3]))
+        if self.spline_points:
+            xs += (min(self.spline_points[0::3]), max(self.spline_points[0::3]))
+            ys += (min(self.spline_points[1::3]), max(self.spline_points[1::3]))
+        circles = self.circles
+        for i in range(0, len(circles), CIRCLE_STRIDE):
+            cx, cy, _, r = circles[i:i + CIRCLE_STRIDE]
+            xs += (cx - r, cx + r)
+            ys += (cy - r, cy + r)
+        for cx, cy, r, start, sweep in self._arc_geometry():
+            end = start + sweep
+            xs += (cx + r * math.cos(start), cx + r * math.cos(end))
+            ys += (cy + r * math.sin(start), cy + r * math.sin(end))
+            # Axis extremes the arc passes through
+            first = math.ceil(start / (math.pi / 2))
+            for quadrant in range(first, first + 4):
+                if quadrant * (math.pi / 2) > end:
+                    break
+                q = quadrant % 4
+                if q == 0:
+                    xs.append(cx + r)
+                elif q == 1:
+                    ys.append(cy + r)
+                elif q == 2:
+                    xs.append(cx - r)
+                else:
+                    ys.append(cy - r)
+        if not xs:
+            return None
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def bounding_radius(self):
+        """ Upper bound of the distance of the profile from the origin (arcs count as their full circle). """
+        radius = 0.0
+        lines, points = self.lines, self.spline_points
+        for values in (lines, points):
+            if values:
+                radius = max(radius, max(map(math.hypot, values[0::3], values[1::3])))
+        for cx, cy, r, _, _ in self._arc_geometry():
+            radius = max(radius, math.hypot(cx, cy) + r)
+        circles = self.circles
+        for i in range(0, len(circles), CIRCLE_STRIDE):
+            radius = max(radius, math.hypot(circles[i], circles[i + 1]) + circles[i + 3])
+        return radius
+
+    def centroid(self):
+        """
+        Length-weighted centroid of the profile's curves, independent of how the loops are oriented.
+
+        Returns:
+        - Tuple: (x, y), or None if the profile has no length.
+        """
+        total = sx = sy = 0.0
+        lines = self.lines
+        for i in range(0, len(lines), LINE_STRIDE):
+            x1, y1, _, x2, y2, _ = lines[i:i + LINE_STRIDE]
+            length = math.hypot(x2 - x1, y2 - y1)
+            total += length
+            sx += length * (x1 + x2) / 2
+            sy += length * (y1 + y2) / 2
+        for cx, cy, r, start, sweep in self._arc_geometry():
+            # The centroid of an arc lies on its bisector at r * sin(h) / h from the center, h = sweep / 2
+            half = sweep / 2
+            length = r * abs(sweep)
+            distance = r * math.sin(half) / half if half else r
+            total += length
+            sx += length * (cx + distance * math.cos(start + half))
+            sy += length * (cy + distance * math.sin(start + half))
+        circles = self.circles
+        for i in range(0, len(circles), CIRCLE_STRIDE):
+            cx, cy, _, r = circles[i:i + CIRCLE_STRIDE]
+            length = 2 * math.pi * r
+            total += length
+            sx += length * cx
+            sy += length * cy
+        points, pi = self.spline_points, 0
+        for count in self.spline_counts:
+            for j in range(pi, pi + POINT_STRIDE * (count - 1), POINT_STRIDE):
+                x1, y1, x2, y2 = points[j], points[j + 1], points[j + 3], points[j + 4]
+                length = math.hypot(x2 - x1, y2 - y1)
+                total += length
+                sx += length * (x1 + x2) / 2
+                sy += length * (y1 + y2) / 2
+            pi += POINT_STRIDE * count
+        if total == 0:
+            return None
+        return sx / total, sy / total
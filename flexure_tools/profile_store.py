@@ -0,0 +1,653 @@
+'''
+Description: On-disk flexure profile library. The library folder holds an index.json describing every profile
+(category, name, entity counts, bounding radius) and one compact binary payload per profile holding its coordinates
+as packed float64 values. The index is all that is read to fill the category/profile dropdowns; a payload is only
+read the first time its profile is requested.
+Symmetric profiles may be stored compressed: a symmetric payload holds the symmetry descriptor and only the
+fundamental sector (see flexure_tools.symmetry), and loads as a SymmetricProfile that expands when placed.
+Each entry also records the profile's shape descriptor (see flexure_tools.similarity), so similarity searches only need
+the index.
+Payloads may instead be quantized: coordinates become int32 multiples of QUANTUM and sweeps int32 multiples of
+SWEEP_QUANTUM, delta-encoded and zlib-compressed. Quantized payloads are a fraction of the size, and float noise such as
+-1.5e-16 rounds away, so identical geometry gives identical integers; every entry records a content hash of them
+(content_hash), which makes finding identical profiles a dictionary lookup.
+
+Usage: python -m flexure_tools.profile_store LIBRARY_FOLDER [--format quantized|float64] [--identical]
+'''
+
+import argparse, hashlib, json, math, os, re, struct, sys, zlib
+from array import array
+from itertools import accumulate, islice
+from operator import sub
+
+from .profile import Profile, LINE, ARC, CIRCLE, SPLINE, LINE_STRIDE, ARC_STRIDE, CIRCLE_STRIDE, POINT_STRIDE
+from .similarity import SimilarityIndex, profile_descriptor, stored_descriptor
+from .symmetry import Symmetry, SymmetricProfile, compress
+
+INDEX_FILE = 'index.json'
+INDEX_VERSION = 1
+
+# Payload layout: header, one kind code per entity, one point count per spline, then the float64 coordinates of every
+# entity in profile order (line: 6, arc: 7, circle: 4, spline: 3 per fit point). All values are little-endian.
+PAYLOAD_MAGIC = b'FXPR'
+PAYLOAD_VERSION = 1
+PAYLOAD_HEADER = struct.Struct('<4sHI')  # magic, version, entity count
+
+# Symmetric payload: header, then the sector, axial and fixed parts as three plain payloads of the given byte lengths
+SYMMETRIC_MAGIC = b'FXSY'
+SYMMETRIC_VERSION = 1
+SYMMETRIC_HEADER = struct.Struct('<4sHHBddddIII')  # magic, version, order, has mirror, mirror, cx, cy, deviation, lengths
+
+# Quantized payload: header, kind codes and spline counts as in the plain payload, then a zlib stream of integers: the
+# x, y, z of every point in profile order (line ends, arc centers and starts, circle centers, spline fit points), each
+# as its difference from the previous point, followed by the circle radii, then the arc sweeps. Consecutive points of a
+# loop-ordered profile are close together (a shared vertex is stored twice, so its delta is 0), which is what makes the
+# stream compress well. Every coordinate and radius comes back within QUANTUM / 2 and every sweep within
+# SWEEP_QUANTUM / 2, which keeps arc end points of profiles up to QUANTIZED_RANGE inside the 1e-7 cm vertex tolerance
+# of flexure_tools.loops and placement (a nanometre grid would not).
+QUANTIZED_MAGIC = b'FXPQ'
+QUANTIZED_VERSION = 1
+QUANTIZED_HEADER = struct.Struct('<4sHIIB')  # magic, version, entity count, point count, 1 if the integers are int64
+QUANTUM = 1e-8                      # cm per coordinate step (0.1 nm)
+SWEEP_QUANTUM = 2 * math.pi / 2**30  # radians per sweep step
+QUANTIZED_RANGE = (2**31 - 1) * QUANTUM  # cm; largest coordinate an int32 holds (21.47 cm)
+COMPRESSION_LEVEL = 6  # zlib level; 9 saves under 1% more and takes eight times as long
+
+KIND_CODES = {'line': LINE, 'arc': ARC, 'circle': CIRCLE, 'spline': SPLINE}
+KIND_NAMES = {code: kind for kind, code in KIND_CODES.items()}
+
+
+def _little_endian(values):
+    """ Return an array in little-endian byte order, swapping a copy on big-endian hosts. """
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values
+
+
+def encode_entities(entities):
+    """
+    Pack profile entities into the binary payload format.
+
+    Parameters:
+    - entities (list): Profile entities in the library tuple format.
+
+    Returns:
+    - bytes: The encoded payload.
+    """
+    kinds = array('B')
+    spline_counts = array('I')
+    values = array('d')
+
+    for entity_type, params in entities:
+        kinds.append(KIND_CODES[entity_type])
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            values.extend(p1)
+            values.extend(p2)
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            values.extend(center)
+            values.extend(start)
+            values.append(sweep)
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            values.extend(center)
+            values.append(radius)
+        else:
+            [points] = params
+            spline_counts.append(len(points))
+            for point in points:
+                values.extend(point)
+
+    return b''.join((PAYLOAD_HEADER.pack(PAYLOAD_MAGIC, PAYLOAD_VERSION, len(kinds)), kinds.tobytes(),
+                     _little_endian(spline_counts).tobytes(), _little_endian(values).tobytes()))
+
+
+def encode_symmetric(profile, quantized=False):
+    """
+    Pack a SymmetricProfile into the symmetric payload format.
+
+    Parameters:
+    - profile (SymmetricProfile): The compressed profile.
+    - quantized (bool): Store the sector, axial and fixed parts as quantized payloads.
+
+    Returns:
+    - bytes: The encoded payload.
+    """
+    symmetry = profile.symmetry
+    encode = encode_quantized if quantized else encode_entities
+    parts = [encode(part) for part in (profile.sector, profile.axial, profile.fixed)]
+    has_mirror = symmetry.mirror is not None
+    header = SYMMETRIC_HEADER.pack(SYMMETRIC_MAGIC, SYMMETRIC_VERSION, symmetry.order, has_mirror,
+                                   symmetry.mirror if has_mirror else 0.0, symmetry.center[0], symmetry.center[1],
+                                   symmetry.deviation, *(len(part) for part in parts))
+    return b''.join([header] + parts)
+
+
+def decode_stored(data):
+    """
+    Unpack either payload format without expanding it.
+
+    Parameters:
+    - data (bytes): A payload produced by encode_entities, encode_quantized or encode_symmetric.
+
+    Returns:
+    - Profile or SymmetricProfile: The profile as stored.
+    """
+    if data[:4] != SYMMETRIC_MAGIC:
+        return decode_profile(data)
+    magic, version, order, has_mirror, mirror, cx, cy, deviation, *lengths = SYMMETRIC_HEADER.unpack_from(data)
+    if version != SYMMETRIC_VERSION:
+        raise ValueError('Unsupported symmetric profile payload (version {})'.format(version))
+    parts, offset = [], SYMMETRIC_HEADER.size
+    for length in lengths:
+        parts.append(decode_profile(data[offset:offset + length]))
+        offset += length
+    symmetry = Symmetry(order, mirror if has_mirror else None, (cx, cy), deviation)
+    return SymmetricProfile(symmetry, *parts)
+
+
+def decode_profile(data):
+    """
+    Unpack a binary payload into a Profile, copying each entity's floats straight into the per-kind arrays.
+
+    Parameters:
+    - data (bytes): A payload produced by encode_entities or encode_quantized, or by encode_symmetric (expanded to the
+      full profile).
+
+    Returns:
+    - Profile: The profile.
+    """
+    if data[:4] == SYMMETRIC_MAGIC:
+        return decode_stored(data).expand()
+    if data[:4] == QUANTIZED_MAGIC:
+        return decode_quantized(data)
+    magic, version, count = PAYLOAD_HEADER.unpack_from(data)
+    if magic != PAYLOAD_MAGIC or version != PAYLOAD_VERSION:
+        raise ValueError('Unsupported profile payload (magic {!r}, version {})'.format(magic, version))
+
+    offset = PAYLOAD_HEADER.size
+    kinds = array('B', data[offset:offset + count])
+    offset += count
+    spline_total = kinds.count(KIND_CODES['spline'])
+    spline_counts = _little_endian(array('I', data[offset:offset + 4 * spline_total]))
+    offset += 4 * spline_total
+    values = _little_endian(array('d', data[offset:]))
+
+    profile = Profile()
+    profile.order = array('b', kinds.tobytes())
+    profile.spline_counts = spline_counts
+    targets = {LINE: (profile.lines, LINE_STRIDE), ARC: (profile.arcs, ARC_STRIDE), CIRCLE: (profile.circles, CIRCLE_STRIDE)}
+    i = s = 0
+    for code in kinds:
+        if code in targets:
+            target, stride = targets[code]
+        else:
+            target, stride = profile.spline_points, POINT_STRIDE * spline_counts[s]
+            s += 1
+        target.extend(values[i:i + stride])
+        i += stride
+    return profile
+
+
+def decode_entities(data):
+    """
+    Unpack a binary payload back into profile entities in the library tuple format.
+
+    Parameters:
+    - data (bytes): A payload produced by encode_entities.
+
+    Returns:
+    - list: The profile entities, e.g. [('line', [((x1, y1, z1), (x2, y2, z2))]), ...].
+    """
+    return decode_profile(data).to_entities()
+
+
+def _quantized_parts(entities):
+    """ Return the uncompressed quantized payload as (header with kind codes and spline counts, integer bytes). """
+    kinds = array('B')
+    spline_counts = array('I')
+    coordinates, radii, sweeps = [], [], []
+    for entity_type, params in entities:
+        kinds.append(KIND_CODES[entity_type])
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            coordinates.extend(p1)
+            coordinates.extend(p2)
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            coordinates.extend(center)
+            coordinates.extend(start)
+            sweeps.append(sweep)
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            coordinates.extend(center)
+            radii.append(radius)
+        else:
+            [points] = params
+            spline_counts.append(len(points))
+            for point in points:
+                coordinates.extend(point)
+
+    extremes = coordinates + radii
+    if extremes and max(max(extremes), -min(extremes)) > QUANTIZED_RANGE:
+        raise ValueError('Profile extends past {:g} cm and cannot be quantized; store it as float64'
+                         .format(QUANTIZED_RANGE))
+    # round() gives ints, so -1.5e-16 and 0.0 become the same 0
+    points = [round(value / QUANTUM) for value in coordinates]
+    deltas = [0] * len(points)
+    for axis in range(3):
+        column = points[axis::3]
+        deltas[axis::3] = column[:1] + list(map(sub, column[1:], column[:-1]))
+    values = deltas + [round(radius / QUANTUM) for radius in radii] + [round(sweep / SWEEP_QUANTUM) for sweep in sweeps]
+    # Deltas between far apart points can outgrow an int32
+    wide = bool(values) and not -2**31 <= min(values) <= max(values) < 2**31
+    header = QUANTIZED_HEADER.pack(QUANTIZED_MAGIC, QUANTIZED_VERSION, len(kinds), len(points) // 3, wide)
+    return (b''.join((header, kinds.tobytes(), _little_endian(spline_counts).tobytes())),
+            _little_endian(array('q' if wide else 'i', values)).tobytes())
+
+
+def encode_quantized(entities):
+    """
+    Pack profile entities into the quantized payload format.
+
+    Parameters:
+    - entities (list or Profile): Profile entities in the library tuple format.
+
+    Returns:
+    - bytes: The encoded payload.
+
+    Raises:
+    - ValueError: If a coordinate or radius exceeds QUANTIZED_RANGE.
+    """
+    header, values = _quantized_parts(entities)
+    return header + zlib.compress(values, COMPRESSION_LEVEL)
+
+
+def decode_quantized(data):
+    """
+    Unpack a quantized payload into a Profile.
+
+    Parameters:
+    - data (bytes): A payload produced by encode_quantized.
+
+    Returns:
+    - Profile: The profile, its values rounded to the quantization grid.
+    """
+    magic, version, count, point_count, wide = QUANTIZED_HEADER.unpack_from(data)
+    if magic != QUANTIZED_MAGIC or version != QUANTIZED_VERSION:
+        raise ValueError('Unsupported quantized profile payload (magic {!r}, version {})'.format(magic, version))
+
+    offset = QUANTIZED_HEADER.size
+    kinds = array('B', data[offset:offset + count])
+    offset += count
+    spline_total = kinds.count(KIND_CODES['spline'])
+    spline_counts = _little_endian(array('I', data[offset:offset + 4 * spline_total]))
+    offset += 4 * spline_total
+    values = _little_endian(array('q' if wide else 'i', zlib.decompress(data[offset:])))
+
+    size = 3 * point_count
+    points = array('d', bytes(8 * size))
+    for axis in range(3):
+        points[axis:size:3] = array('d', [value * QUANTUM for value in accumulate(values[axis:size:3])])
+    scalars = iter(values[size:])
+    radii = [radius * QUANTUM for radius in islice(scalars, kinds.count(CIRCLE))]
+    sweeps = [sweep * SWEEP_QUANTUM for sweep in scalars]
+
+    profile = Profile()
+    profile.order = array('b', kinds.tobytes())
+    profile.spline_counts = spline_counts
+    lines, arcs, circles = profile.lines, profile.arcs, profile.circles
+    i = a = c = s = 0
+    for code in kinds:
+        if code == LINE:
+            lines.extend(points[i:i + 6])
+            i += 6
+        elif code == ARC:
+            arcs.extend(points[i:i + 6])
+            arcs.append(sweeps[a])
+            i, a = i + 6, a + 1
+        elif code == CIRCLE:
+            circles.extend(points[i:i + 3])
+            circles.append(radii[c])
+            i, c = i + 3, c + 1
+        else:
+            end = i + POINT_STRIDE * spline_counts[s]
+            profile.spline_points.extend(points[i:end])
+            i, s = end, s + 1
+    return profile
+
+
+def content_hash(entities):
+    """
+    Hash the geometry of a profile on the quantization grid, so that copies differing only by float noise (below
+    QUANTUM / 2, unless a value sits right at a rounding boundary) hash the same. Each entity is hashed as its kind code
+    and grid integers, lines and splines in whichever direction gives the smaller integers (arcs always run
+    counter-clockwise), and the entity records are sorted first, so neither the order or direction of the entities nor
+    the way the profile is stored (float64, quantized or as a symmetric sector, whose mirrored copies run backwards)
+    changes the hash. The exception is a symmetric profile read back from quantized parts: its copies are rotated grid
+    values, which are off the grid again, so ProfileStore records the hash of each profile as it is added.
+
+    Parameters:
+    - entities (list, Profile or SymmetricProfile): The profile.
+
+    Returns:
+    - str: Hex SHA-256 digest.
+    """
+    if isinstance(entities, SymmetricProfile):
+        entities = entities.expand()
+    records = []
+    for entity_type, params in entities:
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            values = min([round(value / QUANTUM) for value in p1], [round(value / QUANTUM) for value in p2])
+            values += max([round(value / QUANTUM) for value in p1], [round(value / QUANTUM) for value in p2])
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            values = [round(value / QUANTUM) for value in (*center, *start)] + [round(sweep / SWEEP_QUANTUM)]
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            values = [round(value / QUANTUM) for value in (*center, radius)]
+        else:
+            [points] = params
+            values = min([round(value / QUANTUM) for point in points for value in point],
+                         [round(value / QUANTUM) for point in reversed(points) for value in point])
+        records.append(_little_endian(array('q', [KIND_CODES[entity_type], len(values)] + values)).tobytes())
+    records.sort()
+    return hashlib.sha256(b''.join(records)).hexdigest()
+
+
+def profile_summary(entities):
+    """
+    Compute the index metadata of a profile: entity counts and the bounding radius about the origin.
+
+    Parameters:
+    - entities (list, Profile or SymmetricProfile): Profile entities in the library tuple format, or a Profile.
+
+    Returns:
+    - dict: Keys 'lines', 'arcs', 'circles', 'splines' (counts) and 'bounding_radius' (float, in cm).
+    """
+    if isinstance(entities, SymmetricProfile):
+        profile = entities.expand()
+    else:
+        profile = entities if isinstance(entities, Profile) else Profile.from_entities(entities)
+    summary = profile.counts()
+    summary['bounding_radius'] = profile.bounding_radius()
+    return summary
+
+
+class ProfileStore:
+    """
+    A profile library folder: index.json plus one payload file per profile.
+
+    The index is read on first use; payloads are read on demand by load() and kept in memory afterwards. The index
+    records whether the library writes quantized payloads, so every script adding to a library keeps its format.
+    """
+
+    def __init__(self, root, quantized=None):
+        """
+        Parameters:
+        - root (str): Path of the library folder. It is created on the first save if it does not exist.
+        - quantized (bool): Write new payloads quantized (True) or as float64 (False). None keeps the library's format
+          (float64 for a new library). Existing payloads are only rewritten by convert().
+        """
+        self.root = root
+        self._quantized = quantized
+        self._categories = None
+        self._entries = None
+        self._loaded = {}
+        self._similarity = None
+        self._hashes = None
+
+    def _index(self):
+        if self._entries is None:
+            path = os.path.join(self.root, INDEX_FILE)
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                if index.get('version') != INDEX_VERSION:
+                    raise ValueError('Unsupported profile index version: {}'.format(index.get('version')))
+                self._categories = list(index['categories'])
+                self._entries = {}
+                for entry in index['profiles']:
+                    self._entries[(entry['category'], entry['name'])] = entry
+                if self._quantized is None:
+                    self._quantized = index.get('quantized', False)
+            else:
+                self._categories, self._entries = [], {}
+            if self._quantized is None:
+                self._quantized = False
+        return self._entries
+
+    @property
+    def quantized(self):
+        """ Whether new payloads are written quantized. """
+        self._index()
+        return self._quantized
+
+    def categories(self):
+        """ Return the category names, in library order. Categories may be empty. """
+        self._index()
+        return list(self._categories)
+
+    def names(self, category):
+        """ Return the profile names of a category, in library order, without reading any payload. """
+        return [name for (cat, name) in self._index() if cat == category]
+
+    def entry(self, category, name):
+        """ Return the index entry (metadata only) of a profile, or None if it does not exist. """
+        return self._index().get((category, name))
+
+    def __len__(self):
+        return len(self._index())
+
+    def load(self, category, name, cache=True):
+        """
+        Return a profile, reading its payload on first access. Either type iterates as library tuples.
+
+        Parameters:
+        - category (str): Profile category, e.g. 'Circular'.
+        - name (str): Profile name, e.g. '1st Flexure'.
+        - cache (bool): Keep the payload in memory for later calls. Pass False when walking the whole library once.
+
+        Returns:
+        - Profile or SymmetricProfile: The profile's geometry, as stored (symmetric profiles stay compressed).
+        """
+        key = (category, name)
+        entities = self._loaded.get(key)
+        if entities is None:
+            entry = self._index().get(key)
+            if entry is None:
+                raise KeyError('No profile {!r} in category {!r}'.format(name, category))
+            with open(os.path.join(self.root, entry['file']), 'rb') as f:
+                entities = decode_stored(f.read())
+            if cache:
+                self._loaded[key] = entities
+        return entities
+
+    def add_category(self, category):
+        """ Register a category so it shows in the dropdown even before it holds any profile. """
+        self._index()
+        if category not in self._categories:
+            self._categories.append(category)
+
+    def add(self, category, name, entities, save=True, metadata=None, symmetry_tolerance=None):
+        """
+        Write a profile payload and record it in the index, replacing any profile with the same category and name.
+
+        Parameters:
+        - category (str): Profile category. Created if missing.
+        - name (str): Profile name.
+        - entities (list, Profile or SymmetricProfile): Profile entities in the library tuple format, or a Profile.
+        - save (bool): Rewrite index.json immediately. Pass False when adding many profiles and call save() once.
+        - metadata (dict): Extra index fields to record with the profile, e.g. {'source': url}.
+        - symmetry_tolerance (float): If set, a profile found symmetric within this tolerance (cm) is stored as its
+          fundamental sector and the entry gains a 'symmetry' descriptor; see symmetry.compress for profiles whose
+          deviation is too large to expand back into closed loops.
+
+        Returns:
+        - dict: The new index entry.
+        """
+        entries = self._index()
+        self.add_category(category)
+        existing = entries.get((category, name))
+        file_name = existing['file'] if existing else self._new_file_name(category, name)
+
+        if symmetry_tolerance is not None and not isinstance(entities, SymmetricProfile):
+            entities = compress(entities, symmetry_tolerance) or entities
+
+        data = self._encode(entities)
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, file_name), 'wb') as f:
+            f.write(data)
+
+        entry = {'category': category, 'name': name, 'file': file_name}
+        entry.update(profile_summary(entities))
+        if isinstance(entities, SymmetricProfile):
+            entry['symmetry'] = entities.symmetry.as_dict()
+        entry['descriptor'] = stored_descriptor(profile_descriptor(entities))
+        entry['hash'] = content_hash(entities)
+        if metadata:
+            entry.update(metadata)
+        if existing and self._hashes is not None and 'hash' in existing:
+            self._hashes[existing['hash']].remove((category, name))
+        entries[(category, name)] = entry
+        if self._similarity is not None:
+            self._similarity.add((category, name), entry['descriptor'])
+        if self._hashes is not None:
+            self._hashes.setdefault(entry['hash'], []).append((category, name))
+        self._loaded.pop((category, name), None)
+        if save:
+            self.save()
+        return entry
+
+    def similarity_index(self):
+        """
+        Return the shape similarity index of the library, keyed by (category, name).
+
+        Built from the descriptors in the index on first use and kept up to date by add(). Entries written before
+        descriptors were recorded get theirs computed from their payload here (saved with the next save()).
+
+        Returns:
+        - SimilarityIndex: The index.
+        """
+        if self._similarity is None:
+            index = SimilarityIndex()
+            for key, entry in self._index().items():
+                if 'descriptor' not in entry:
+                    entry['descriptor'] = stored_descriptor(profile_descriptor(self.load(*key, cache=False)))
+                index.add(key, entry['descriptor'])
+            self._similarity = index
+        return self._similarity
+
+    def find_identical(self, entities):
+        """
+        Return the profiles with the same geometry as the given one, compared by content_hash.
+
+        The hashes are taken from the index (entries written before hashes were recorded get theirs computed from their
+        payload on first use, saved with the next save()) and kept in a dictionary, so each call is a lookup.
+
+        Parameters:
+        - entities (list, Profile or SymmetricProfile): The profile to look for.
+
+        Returns:
+        - list: (category, name) of every matching profile, in library order.
+        """
+        return list(self._hash_index().get(content_hash(entities), ()))
+
+    def identical_groups(self):
+        """ Return every group of two or more profiles sharing a content hash, as lists of (category, name). """
+        return [list(keys) for keys in self._hash_index().values() if len(keys) > 1]
+
+    def _hash_index(self):
+        if self._hashes is None:
+            hashes = {}
+            for key, entry in self._index().items():
+                if 'hash' not in entry:
+                    entry['hash'] = content_hash(self.load(*key, cache=False))
+                hashes.setdefault(entry['hash'], []).append(key)
+            self._hashes = hashes
+        return self._hashes
+
+    def convert(self, quantized=True):
+        """
+        Rewrite every payload in the quantized or the float64 format and make it the library's format.
+
+        Quantizing moves every value to the grid (see QUANTUM); converting back to float64 does not restore the
+        digits dropped. Entries keep the hash recorded when they were added (see content_hash), so find_identical
+        still matches the original geometry; only entries without one are hashed here, before re-encoding.
+
+        Parameters:
+        - quantized (bool): The format to convert to.
+
+        Returns:
+        - tuple: Total payload bytes before and after.
+        """
+        self._index()
+        self._quantized = quantized
+        before = after = 0
+        for key, entry in self._entries.items():
+            path = os.path.join(self.root, entry['file'])
+            with open(path, 'rb') as f:
+                data = f.read()
+            profile = decode_stored(data)
+            data, before = self._encode(profile), before + len(data)
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+            after += len(data)
+            if 'hash' not in entry:
+                entry['hash'] = content_hash(profile)
+            self._loaded.pop(key, None)
+        self._hashes = None
+        self.save()
+        return before, after
+
+    def _encode(self, entities):
+        if isinstance(entities, SymmetricProfile):
+            return encode_symmetric(entities, self._quantized)
+        return encode_quantized(entities) if self._quantized else encode_entities(entities)
+
+    def save(self):
+        """ Write index.json. """
+        self._index()
+        os.makedirs(self.root, exist_ok=True)
+        index = {'version': INDEX_VERSION, 'categories': self._categories, 'profiles': list(self._entries.values())}
+        if self._quantized:
+            index['quantized'] = True
+        path = os.path.join(self.root, INDEX_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def _new_file_name(self, category, name):
+        stem = re.sub(r'[^a-z0-9]+', '_', '{}_{}'.format(category, name).lower()).strip('_')
+        used = {entry['file'] for entry in self._entries.values()}
+        file_name, n = stem + '.bin', 1
+        while file_name in used or os.path.exists(os.path.join(self.root, file_name)):
+            n += 1
+            file_name = '{}_{}.bin'.format(stem, n)
+        return file_name
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Convert a flexure profile library between payload formats, and list '
+                                                 'identical profiles.')
+    parser.add_argument('library', help='profile library folder (holding index.json)')
+    parser.add_argument('--format', choices=('quantized', 'float64'), help='rewrite every payload in this format')
+    parser.add_argument('--identical', action='store_true', help='list profiles with the same content hash')
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.library)
+    if args.format:
+        before, after = store.convert(args.format == 'quantized')
+        print('Rewrote {} profiles as {}: {} bytes -> {} bytes'.format(len(store), args.format, before, after))
+    if args.identical:
+        for group in store.identical_groups():
+            print('  '.join('{}/{}'.format(*key) for key in group))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
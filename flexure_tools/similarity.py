@@ -0,0 +1,241 @@
+'''
+Description: Shape similarity search over the profile library. Every profile gets a translation-, rotation- and
+scale-invariant descriptor: its curves are resampled at equal arc-length steps, each sample is binned by its distance
+from the profile's bore center (dxf_import.find_bore; the origin for library profiles, but wherever the sketch put it
+for extracted ones) relative to the profile's RMS radius, and within each radial band the angular Fourier
+coefficients of the samples are accumulated. Rotating the profile only changes the phases of those coefficients and
+scaling it changes neither the bands nor the weights, so the coefficient magnitudes describe the shape alone (mirror
+images get the same descriptor too). Unlike a single-outline Fourier descriptor, this works for
+profiles made of several loops, slots and open chains.
+SimilarityIndex holds the descriptors as vectors and answers k-nearest and within-epsilon queries and finds
+near-duplicate pairs through a hash grid; ProfileStore keeps it up to date as profiles are added.
+
+Usage: python -m flexure_tools.similarity LIBRARY_FOLDER [--like CATEGORY/NAME [-k N]] [--duplicates EPSILON]
+'''
+
+import argparse, heapq, math, sys
+
+from .profile import Profile, CIRCLE_STRIDE, LINE_STRIDE, POINT_STRIDE
+
+SAMPLES = 512         # Points resampled along each profile's curves
+RADIAL_BANDS = 8      # Radial bands of the descriptor, spanning 0 to MAX_RADIUS RMS radii
+MAX_RADIUS = 2.5      # Samples farther out (in RMS radii) count in the outermost band
+HARMONICS = 8         # Angular Fourier coefficients per band, 0 to HARMONICS - 1
+DIMENSIONS = RADIAL_BANDS * HARMONICS
+DESCRIPTOR_DIGITS = 6  # Decimals kept when a descriptor is stored in the library index
+DUPLICATE_EPSILON = 0.01
+GRID_DIMENSIONS = 3   # Descriptor components used to bucket profiles when looking for duplicates
+
+
+def _pieces(profile):
+    """ Yield (length, point_at) for every curve of a profile; point_at maps a fraction 0..1 to (x, y). """
+    lines = profile.lines
+    for i in range(0, len(lines), LINE_STRIDE):
+        x1, y1, _, x2, y2, _ = lines[i:i + LINE_STRIDE]
+        yield math.hypot(x2 - x1, y2 - y1), lambda t, x1=x1, y1=y1, x2=x2, y2=y2: (x1 + (x2 - x1) * t, y1 + (y2 - y1) * t)
+    arcs = [(cx, cy, r, start, sweep) for cx, cy, r, start, sweep in profile._arc_geometry()]
+    circles = profile.circles
+    arcs += [(circles[i], circles[i + 1], circles[i + 3], 0.0, 2 * math.pi) for i in range(0, len(circles), CIRCLE_STRIDE)]
+    for cx, cy, r, start, sweep in arcs:
+        yield r * abs(sweep), lambda t, cx=cx, cy=cy, r=r, start=start, sweep=sweep: (
+            cx + r * math.cos(start + sweep * t), cy + r * math.sin(start + sweep * t))
+    points, first = profile.spline_points, 0
+    for count in profile.spline_counts:
+        end = first + count * POINT_STRIDE
+        for i in range(first, end - POINT_STRIDE, POINT_STRIDE):
+            x1, y1, x2, y2 = points[i], points[i + 1], points[i + 3], points[i + 4]
+            yield math.hypot(x2 - x1, y2 - y1), lambda t, x1=x1, y1=y1, x2=x2, y2=y2: (
+                x1 + (x2 - x1) * t, y1 + (y2 - y1) * t)
+        first = end
+
+
+def profile_descriptor(profile):
+    """
+    Compute the shape descriptor of a profile.
+
+    Parameters:
+    - profile (list, Profile or SymmetricProfile): The profile, in any position; samples are measured from its bore.
+
+    Returns:
+    - tuple: DIMENSIONS floats, RADIAL_BANDS groups of HARMONICS coefficient magnitudes; all zeros for an empty
+      profile.
+    """
+    if hasattr(profile, 'expand'):
+        profile = profile.expand()
+    elif not isinstance(profile, Profile):
+        profile = Profile.from_entities(profile)
+    pieces = [piece for piece in _pieces(profile) if piece[0] > 0]
+    total = sum(length for length, _ in pieces)
+    if total == 0:
+        return (0.0,) * DIMENSIONS
+    # Imported here: dxf_import imports profile_store, which imports this module
+    from .dxf_import import find_bore
+    try:
+        cx, cy, _ = find_bore(profile)
+    except ValueError:
+        cx, cy = profile.centroid()  # The centroid lies on the geometry, e.g. a single open chain
+
+    # Resample at (close to) equal arc-length steps: the midpoints of equal subdivisions of every curve
+    samples = []
+    step = total / SAMPLES
+    for length, point_at in pieces:
+        count = max(1, round(length / step))
+        weight = length / count
+        for n in range(count):
+            x, y = point_at((n + 0.5) / count)
+            samples.append((weight, (x - cx, y - cy)))
+    weights = sum(weight for weight, _ in samples)
+    rms = math.sqrt(sum(weight * (x * x + y * y) for weight, (x, y) in samples) / weights) or 1.0
+
+    coefficients = [[0j] * HARMONICS for _ in range(RADIAL_BANDS)]
+    for weight, (x, y) in samples:
+        r = math.hypot(x, y)
+        # Split the sample linearly between the two nearest bands so descriptors change smoothly with the shape
+        position = min(r / rms / MAX_RADIUS, 1.0) * RADIAL_BANDS - 0.5
+        band = math.floor(position)
+        fraction = position - band
+        rotation = complex(x, -y) / r if r > 0 else 0j
+        for target, share in ((band, 1.0 - fraction), (band + 1, fraction)):
+            if share <= 0:
+                continue
+            row, term = coefficients[min(max(target, 0), RADIAL_BANDS - 1)], weight * share
+            for k in range(HARMONICS):
+                row[k] += term
+                term *= rotation
+    return tuple(abs(c) / weights for row in coefficients for c in row)
+
+
+def stored_descriptor(descriptor):
+    """ Round a descriptor for the library index, as a list. """
+    return [round(value, DESCRIPTOR_DIGITS) for value in descriptor]
+
+
+class SimilarityIndex:
+    """
+    Descriptor vectors keyed by profile, with nearest-neighbour and duplicate queries.
+
+    Distances are Euclidean between descriptors. Queries scan the vectors with math.dist, which runs in C, so a few
+    thousand profiles answer in milliseconds; duplicates() buckets the vectors in a hash grid first so it does not
+    compare every pair.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.vectors = []
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def add(self, key, descriptor):
+        """ Add or replace the descriptor of a profile. """
+        vector = tuple(descriptor)
+        if len(vector) != DIMENSIONS:
+            raise ValueError('Descriptor of {} has {} values, expected {}'.format(key, len(vector), DIMENSIONS))
+        position = self._positions.get(key)
+        if position is None:
+            self._positions[key] = len(self.keys)
+            self.keys.append(key)
+            self.vectors.append(vector)
+        else:
+            self.vectors[position] = vector
+
+    def remove(self, key):
+        """ Drop a profile from the index (the last entry moves into its place). """
+        position = self._positions.pop(key)
+        last_key, last_vector = self.keys.pop(), self.vectors.pop()
+        if position < len(self.keys):
+            self.keys[position], self.vectors[position] = last_key, last_vector
+            self._positions[last_key] = position
+
+    def descriptor(self, key):
+        return self.vectors[self._positions[key]]
+
+    def nearest(self, descriptor, k=5, exclude=None):
+        """
+        Return the k profiles most similar to a descriptor.
+
+        Parameters:
+        - descriptor (tuple): A descriptor from profile_descriptor, or SimilarityIndex.descriptor.
+        - k (int): Number of profiles to return.
+        - exclude (object): A key to leave out, e.g. the profile the query came from.
+
+        Returns:
+        - list: (distance, key) pairs, most similar first.
+        """
+        dist = math.dist
+        found = heapq.nsmallest(k + (exclude is not None), zip(map(dist, self.vectors, [descriptor] * len(self.vectors)),
+                                                               range(len(self.keys))))
+        return [(distance, self.keys[position]) for distance, position in found if self.keys[position] != exclude][:k]
+
+    def within(self, descriptor, epsilon=DUPLICATE_EPSILON):
+        """ Return (distance, key) of every profile within epsilon of a descriptor, most similar first. """
+        dist = math.dist
+        return sorted((distance, self.keys[position]) for position, distance in
+                      enumerate(map(dist, self.vectors, [descriptor] * len(self.vectors))) if distance <= epsilon)
+
+    def duplicates(self, epsilon=DUPLICATE_EPSILON):
+        """
+        Find every pair of profiles whose descriptors are within epsilon of each other.
+
+        Vectors are bucketed by GRID_DIMENSIONS of their components (the most spread out ones) in cells epsilon wide;
+        two vectors within epsilon differ by at most epsilon in every component, so only neighbouring cells are compared.
+
+        Returns:
+        - list: (distance, key_a, key_b) triples, closest pairs first.
+        """
+        if len(self.vectors) < 2:
+            return []
+        spreads = [(max(column) - min(column), d) for d, column in enumerate(zip(*self.vectors))]
+        axes = [d for _, d in sorted(spreads, reverse=True)[:GRID_DIMENSIONS]]
+        cells = {}
+        for position, vector in enumerate(self.vectors):
+            cells.setdefault(tuple(math.floor(vector[d] / epsilon) for d in axes), []).append(position)
+        neighbours = [()]
+        for _ in axes:
+            neighbours = [offset + (step,) for offset in neighbours for step in (-1, 0, 1)]
+        pairs = []
+        for cell, members in cells.items():
+            for offset in neighbours:
+                others = cells.get(tuple(c + o for c, o in zip(cell, offset)))
+                if not others:
+                    continue
+                for a in members:
+                    for b in others:
+                        if a < b:
+                            distance = math.dist(self.vectors[a], self.vectors[b])
+                            if distance <= epsilon:
+                                pairs.append((distance, self.keys[a], self.keys[b]))
+        pairs.sort()
+        return pairs
+
+
+def main(argv=None):
+    # Imported here: profile_store itself imports this module to keep descriptors up to date
+    from .profile_store import ProfileStore
+
+    parser = argparse.ArgumentParser(description='Find similar and duplicate profiles in a flexure profile library.')
+    parser.add_argument('library', help='profile library folder (holding index.json)')
+    parser.add_argument('--like', help='list the profiles most similar to this one, given as CATEGORY/NAME')
+    parser.add_argument('-k', type=int, default=5, help='number of similar profiles to list')
+    parser.add_argument('--duplicates', type=float, nargs='?', const=DUPLICATE_EPSILON,
+                        help='list profile pairs whose descriptors are within this distance')
+    args = parser.parse_args(argv)
+
+    store = ProfileStore(args.library)
+    index = store.similarity_index()
+    if args.like:
+        category, _, name = args.like.partition('/')
+        for distance, (cat, other) in index.nearest(index.descriptor((category, name)), args.k, exclude=(category, name)):
+            print('{:.6f}  {}/{}'.format(distance, cat, other))
+    if args.duplicates is not None:
+        for distance, (cat_a, name_a), (cat_b, name_b) in index.duplicates(args.duplicates):
+            print('{:.6f}  {}/{}  {}/{}'.format(distance, cat_a, name_a, cat_b, name_b))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
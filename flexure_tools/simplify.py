@@ -0,0 +1,270 @@
+'''
+Description: Tolerance-driven profile simplifier. Extracted profiles often carry runs of tiny collinear lines and arcs
+split at arbitrary points of the same circle; each piece becomes its own sketch entity and solver variable. The
+simplifier drops entities no longer than the tolerance, moving their neighbours onto one shared end point so the loop
+stays closed, merges collinear line runs into one line and co-circular arc runs into one arc (or a circle once the run
+closes), and reports how many entities it removed.
+Merges happen only at vertices shared by exactly two entities, so junctions where three or more edges meet, and the
+overall shape, are preserved; no merged entity deviates from the original points by more than the tolerance.
+'''
+
+import math
+
+from .loops import VertexGrid
+
+SIMPLIFY_TOLERANCE = 1e-4  # cm
+TWO_PI = 2 * math.pi
+
+
+class Reduction:
+    """
+    Entity counts before and after simplification; instances can be added together to total a batch.
+
+    Attributes:
+    - before (int): Entities in the input.
+    - after (int): Entities in the output.
+    - dropped (int): Entities no longer than the tolerance removed.
+    - merged_lines (int): Line pieces absorbed into a neighbouring collinear line.
+    - merged_arcs (int): Arc pieces absorbed into a neighbouring co-circular arc.
+    """
+
+    def __init__(self, before=0, after=0, dropped=0, merged_lines=0, merged_arcs=0):
+        self.before, self.after = before, after
+        self.dropped, self.merged_lines, self.merged_arcs = dropped, merged_lines, merged_arcs
+
+    def add(self, other):
+        self.before += other.before
+        self.after += other.after
+        self.dropped += other.dropped
+        self.merged_lines += other.merged_lines
+        self.merged_arcs += other.merged_arcs
+
+    def as_dict(self):
+        return {'before': self.before, 'after': self.after, 'dropped': self.dropped,
+                'merged_lines': self.merged_lines, 'merged_arcs': self.merged_arcs}
+
+    def __str__(self):
+        removed = self.before - self.after
+        percent = 100.0 * removed / self.before if self.before else 0.0
+        return '{} -> {} entities ({:.0f}% fewer: {} too short dropped, {} lines and {} arcs merged)'.format(
+            self.before, self.after, percent, self.dropped, self.merged_lines, self.merged_arcs)
+
+
+def _line_record(p1, p2):
+    return {'kind': 'line', 'start': p1, 'end': p2, 'interior': []}
+
+
+def _arc_record(center, start, sweep):
+    radius = math.hypot(start[0] - center[0], start[1] - center[1])
+    angle = math.atan2(start[1] - center[1], start[0] - center[0]) + sweep
+    end = (center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle), start[2])
+    return {'kind': 'arc', 'center': center, 'radius': radius, 'start': start, 'end': end, 'sweep': sweep}
+
+
+def _distance_to_line(point, p1, p2):
+    dx, dy = p2[0] - p1[0], p2[1] - p1[1]
+    length = math.hypot(dx, dy)
+    return abs((point[0] - p1[0]) * dy - (point[1] - p1[1]) * dx) / length if length else math.inf
+
+
+def _merge_lines(a, a_end, b, b_end, tolerance):
+    """ Merge two lines meeting at a's a_end and b's b_end ('start' or 'end'); returns the new record or None. """
+    vertex = a[a_end]
+    far_a = a['start' if a_end == 'end' else 'end']
+    far_b = b['start' if b_end == 'end' else 'end']
+    # The shared vertex must lie between the far ends, not on a fold back over one of the lines
+    if (vertex[0] - far_a[0]) * (far_b[0] - vertex[0]) + (vertex[1] - far_a[1]) * (far_b[1] - vertex[1]) <= 0:
+        return None
+    interior = a['interior'] + [vertex] + b['interior']
+    if any(_distance_to_line(point, far_a, far_b) > tolerance for point in interior):
+        return None
+    merged = _line_record(far_a, far_b)
+    merged['interior'] = interior
+    return merged
+
+
+def _merge_arcs(a, a_end, b, b_end, tolerance):
+    """ Merge two counter-clockwise arcs of the same circle where one ends and the other starts; or None. """
+    if a_end == b_end:
+        return None  # Both end (or both start) here: they run in opposite directions
+    if a_end == 'start':
+        a, b = b, a
+    if math.hypot(a['center'][0] - b['center'][0], a['center'][1] - b['center'][1]) > tolerance:
+        return None
+    if abs(a['radius'] - b['radius']) > tolerance:
+        return None
+    merged = _arc_record(a['center'], a['start'], a['sweep'] + b['sweep'])
+    merged['end'] = b['end']
+    return merged
+
+
+def _refit_arc(record, start, end):
+    """ Move an arc's end points to start and end, keeping its sweep; the center follows the chord. """
+    sweep = record['sweep']
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    half = math.hypot(dx, dy) / 2
+    back = half / math.tan(sweep / 2)  # Signed: a clockwise or more-than-half arc has its center on the chord's right
+    center = ((start[0] + end[0]) / 2 - dy / (2 * half) * back, (start[1] + end[1]) / 2 + dx / (2 * half) * back,
+              record['center'][2])
+    refit = _arc_record(center, start, sweep)
+    refit['end'] = end
+    return refit
+
+
+def _snap_short_entities(records, tolerance):
+    """
+    Number the line and arc end points through a loops.VertexGrid, collapse every entity no longer than the tolerance
+    into one vertex, and move the surviving ends at a collapsed vertex onto one shared point so their loop stays closed.
+    Each record gets 'vertices' ({'start': number, 'end': number}); returns the surviving records and the dropped count.
+    """
+    grid = VertexGrid(tolerance)
+    for record in records:
+        if record['kind'] in ('line', 'arc'):
+            record['vertices'] = {end: grid.vertex(record[end][0], record[end][1]) for end in ('start', 'end')}
+    parents = list(range(len(grid)))
+
+    def root(number):
+        while parents[number] != number:
+            parents[number] = parents[parents[number]]
+            number = parents[number]
+        return number
+
+    short = [record for record in records if record.get('short')]
+    if not short:
+        return records, 0
+    for record in short:
+        parents[root(record['vertices']['end'])] = root(record['vertices']['start'])
+
+    # One shared point per collapsed vertex: an arc end if there is one (arcs are costly to move), else the mean
+    members = {}
+    for number in range(len(grid)):
+        members.setdefault(root(number), []).append(number)
+    collapsed = {root(record['vertices']['start']) for record in short}
+    points = {}
+    kept = [record for record in records if not record.get('short')]
+    for record in kept:
+        if record['kind'] == 'arc':
+            for end in ('start', 'end'):
+                points.setdefault(root(record['vertices'][end]), record[end])
+    for number in collapsed:
+        if number not in points:
+            group = members[number]
+            points[number] = (sum(grid.xs[k] for k in group) / len(group), sum(grid.ys[k] for k in group) / len(group),
+                              0.0)
+
+    survivors = []
+    for record in kept:
+        if record['kind'] not in ('line', 'arc'):
+            survivors.append(record)
+            continue
+        record['vertices'] = {end: root(number) for end, number in record['vertices'].items()}
+        if record['vertices']['start'] == record['vertices']['end']:
+            if record['kind'] == 'arc':
+                survivors.append(record)  # An arc closing on itself keeps its geometry
+            continue  # A line shrunk to nothing between collapsed pieces
+        moved = {end: points[number][:2] + (record[end][2],) for end, number in record['vertices'].items()
+                 if number in collapsed and record[end] is not points[number]}
+        if not moved:
+            survivors.append(record)
+            continue
+        start, end = moved.get('start', record['start']), moved.get('end', record['end'])
+        if record['kind'] == 'line':
+            snapped = _line_record(start, end)
+        else:
+            snapped = _refit_arc(record, start, end)
+        snapped['vertices'], snapped['position'] = record['vertices'], record['position']
+        survivors.append(snapped)
+    return survivors, len(records) - len(survivors)
+
+
+def simplify_entities(entities, tolerance=SIMPLIFY_TOLERANCE):
+    """
+    Drop entities no longer than the tolerance and merge collinear lines and co-circular arcs that meet end to end.
+
+    Parameters:
+    - entities (list): Profile entities in the library format.
+    - tolerance (float): Endpoints closer than this are the same vertex; merged lines stay within this distance of every
+      removed vertex, and arcs merge when their centers and radii agree within it.
+
+    Returns:
+    - Tuple: (entities, Reduction). Merged entities take the list position of their first piece; the neighbours of a
+      dropped entity are moved onto one shared end point; circles and splines pass through unchanged unless too small.
+    """
+    reduction = Reduction(before=len(entities))
+    records = []
+    for entity_type, params in entities:
+        if entity_type == 'line':
+            [(p1, p2)] = params
+            record = _line_record(p1, p2)
+            record['short'] = math.hypot(p2[0] - p1[0], p2[1] - p1[1]) <= tolerance
+            records.append(record)
+        elif entity_type == 'arc':
+            [(center, start, sweep)] = params
+            record = _arc_record(center, start, sweep)
+            record['short'] = record['radius'] * abs(sweep) <= tolerance
+            records.append(record)
+        elif entity_type == 'circle':
+            [(center, radius)] = params
+            if radius <= tolerance:
+                reduction.dropped += 1
+                continue
+            records.append({'kind': 'circle', 'entity': (entity_type, params)})
+        else:
+            records.append({'kind': 'other', 'entity': (entity_type, params)})
+    for position, record in enumerate(records):
+        record['position'] = position
+    records, dropped = _snap_short_entities(records, tolerance)
+    reduction.dropped += dropped
+
+    # Vertex index: vertex number -> list of [record, 'start' or 'end'] using that vertex
+    vertices = {}
+    for record in records:
+        if record['kind'] in ('line', 'arc'):
+            vertices.setdefault(record['vertices']['start'], []).append([record, 'start'])
+            vertices.setdefault(record['vertices']['end'], []).append([record, 'end'])
+
+    for vertex in list(vertices):
+        ends = vertices.get(vertex)
+        if not ends or len(ends) != 2:
+            continue
+        (a, a_end), (b, b_end) = ends
+        if a is b or a['kind'] != b['kind']:
+            continue
+        merge = _merge_lines if a['kind'] == 'line' else _merge_arcs
+        merged = merge(a, a_end, b, b_end, tolerance)
+        if merged is None:
+            continue
+        if a['kind'] == 'line':
+            reduction.merged_lines += 1
+        else:
+            reduction.merged_arcs += 1
+        merged['position'] = min(a['position'], b['position'])
+        merged['vertices'] = {}
+        a['merged'] = b['merged'] = True
+        del vertices[vertex]
+        # Point the far ends of both pieces at the merged record
+        for old in (a, b):
+            for end_name in ('start', 'end'):
+                merged_end = 'start' if old[end_name] is merged['start'] else 'end'
+                if old['vertices'][end_name] != vertex:
+                    merged['vertices'][merged_end] = old['vertices'][end_name]
+                for end in vertices.get(old['vertices'][end_name], ()):
+                    if end[0] is old:
+                        end[0] = merged
+                        end[1] = merged_end
+        records.append(merged)
+
+    result = []
+    for record in sorted((r for r in records if not r.get('merged')), key=lambda r: r['position']):
+        kind = record['kind']
+        if kind == 'line':
+            result.append(('line', [(record['start'], record['end'])]))
+        elif kind == 'arc':
+            if record['sweep'] >= TWO_PI - tolerance / record['radius']:
+                result.append(('circle', [(record['center'], record['radius'])]))
+            else:
+                result.append(('arc', [(record['center'], record['start'], record['sweep'])]))
+        else:
+            result.append(record['entity'])
+    reduction.after = len(result)
+    return result, reduction
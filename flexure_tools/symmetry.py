@@ -0,0 +1,387 @@
+'''
+Description: Symmetry detection and symmetry-compressed profiles. Most flexures repeat the same few entities N times
+around their center, often mirrored as well, so a profile can be stored as one fundamental sector plus a descriptor
+(order, mirror axis, center) instead of every entity. SymmetricProfile.expand rebuilds the whole profile by mapping
+the sector through the rotation and reflection matrices of the symmetry group, with the placement scale and offset
+folded into the same matrices, so only the sector is ever read, stored or kept in memory.
+Detection matches every entity against its image through a tolerance-sized hash grid, so it is linear in the entity
+count per candidate; the largest deviation it had to accept is reported, which flags noisy extractions.
+'''
+
+import math
+
+from .loops import LOOP_TOLERANCE
+from .profile import Profile, LINE, ARC, CIRCLE, LINE_STRIDE, ARC_STRIDE, CIRCLE_STRIDE
+
+SYMMETRY_TOLERANCE = 1e-4  # cm; entities matching their rotated/mirrored image within this count as symmetric
+MAX_ORDER = 360
+NOISE_THRESHOLD = 1e-9     # cm; symmetric profiles deviating more than this are reported as carrying extraction noise
+NEAR_MISS_FRACTION = 0.9   # A candidate matching at least this share of the entities is reported as broken symmetry
+# cm; compress refuses symmetries deviating more than this: the expanded sectors' end points would land further apart
+# than the vertex tolerance and the profile's loops would fall apart into open chains
+COMPRESS_DEVIATION = LOOP_TOLERANCE
+
+
+class Symmetry:
+    """
+    Symmetry group of a profile: `order`-fold rotation about `center`, plus `order` mirror axes if mirror is set.
+
+    Attributes:
+    - order (int): Rotational order N (1 = no rotational symmetry).
+    - mirror (float): Angle (radians) of one mirror axis through the center, or None.
+    - center (tuple): (x, y) the group acts about.
+    - deviation (float): Largest distance between an entity and its matched image (cm).
+    - near_miss (tuple): (order, unmatched entities) of the best rejected rotation that matched most of the profile,
+      or None; a near miss usually means an extraction error broke an otherwise symmetric profile.
+    """
+
+    def __init__(self, order=1, mirror=None, center=(0.0, 0.0), deviation=0.0, near_miss=None):
+        self.order = order
+        self.mirror = mirror
+        self.center = center
+        self.deviation = deviation
+        self.near_miss = near_miss
+
+    @property
+    def size(self):
+        """ Number of group elements (copies of the sector in the full profile). """
+        return self.order * (2 if self.mirror is not None else 1)
+
+    def matrices(self):
+        """
+        Return the group elements as (a, b, c, d) matrices acting on coordinates relative to the center: the
+        rotations by 2*pi*k/order first (identity first), then the reflections about each mirror axis.
+        """
+        elements = [_rotation(2 * math.pi * k / self.order) for k in range(self.order)]
+        if self.mirror is not None:
+            elements += [_reflection(self.mirror + math.pi * k / self.order) for k in range(self.order)]
+        return elements
+
+    def is_noisy(self):
+        return self.deviation > NOISE_THRESHOLD or self.near_miss is not None
+
+    def as_dict(self):
+        return {'order': self.order, 'mirror': self.mirror, 'center': list(self.center), 'deviation': self.deviation,
+                'near_miss': list(self.near_miss) if self.near_miss else None}
+
+    def __str__(self):
+        if self.size == 1:
+            text = 'none'
+        else:
+            text = '{}-fold rotation'.format(self.order) if self.order > 1 else 'mirror only'
+            if self.mirror is not None and self.order > 1:
+                text += ' with mirror'
+            text += ', max deviation {:.2g} cm'.format(self.deviation)
+        if self.near_miss is not None:
+            text += '; {}-fold except {} entities'.format(*self.near_miss)
+        if self.is_noisy():
+            text += ' (extraction noise?)'
+        return text
+
+
+def _rotation(angle):
+    c, s = math.cos(angle), math.sin(angle)
+    return (c, -s, s, c)
+
+
+def _reflection(axis):
+    c, s = math.cos(2 * axis), math.sin(2 * axis)
+    return (c, s, s, -c)
+
+
+def _records(profile, center):
+    """
+    Matching records of a profile's lines, arcs and circles relative to center, in profile order.
+
+    Returns:
+    - list: (kind, coordinates, key point, entity index); arcs hold (cx, cy, sx, sy, ex, ey), lines (x1, y1, x2, y2),
+      circles (cx, cy, r). Splines are left out; they are never compressed.
+    """
+    ox, oy = center
+    records = []
+    lines, arcs, circles = profile.lines, profile.arcs, profile.circles
+    li = ai = ci = 0
+    for index, kind in enumerate(profile.order):
+        if kind == LINE:
+            x1, y1, _, x2, y2, _ = lines[li:li + LINE_STRIDE]
+            coordinates = (x1 - ox, y1 - oy, x2 - ox, y2 - oy)
+            records.append((LINE, coordinates, _key_point(LINE, coordinates), index))
+            li += LINE_STRIDE
+        elif kind == ARC:
+            cx, cy, _, sx, sy, _, sweep = arcs[ai:ai + ARC_STRIDE]
+            rx, ry = sx - cx, sy - cy
+            cos_sweep, sin_sweep = math.cos(sweep), math.sin(sweep)
+            coordinates = (cx - ox, cy - oy, sx - ox, sy - oy,
+                           cx + rx * cos_sweep - ry * sin_sweep - ox, cy + rx * sin_sweep + ry * cos_sweep - oy)
+            records.append((ARC, coordinates, _key_point(ARC, coordinates), index))
+            ai += ARC_STRIDE
+        elif kind == CIRCLE:
+            cx, cy, _, radius = circles[ci:ci + CIRCLE_STRIDE]
+            coordinates = (cx - ox, cy - oy, radius)
+            records.append((CIRCLE, coordinates, (cx - ox, cy - oy), index))
+            ci += CIRCLE_STRIDE
+    return records
+
+
+def _key_point(kind, coordinates):
+    """ A point that moves with the entity: line midpoint, arc mid-sweep point. """
+    if kind == LINE:
+        x1, y1, x2, y2 = coordinates
+        return ((x1 + x2) / 2, (y1 + y2) / 2)
+    cx, cy, sx, sy, ex, ey = coordinates
+    mx, my = (sx + ex) / 2 - cx, (sy + ey) / 2 - cy
+    length = math.hypot(mx, my)
+    radius = math.hypot(sx - cx, sy - cy)
+    if length < 1e-12 * max(radius, 1.0):
+        mx, my, length = cy - sy, sx - cx, radius  # Half-circle arc: the mid point is a quarter turn on from the start
+    # The mid-sweep point is on the chord bisector; it is on the far side of the center for sweeps over pi
+    side = 1.0 if (sx - cx) * (ey - cy) - (sy - cy) * (ex - cx) >= 0 else -1.0
+    return (cx + side * mx * radius / length, cy + side * my * radius / length)
+
+
+def _map(record, matrix):
+    """ Image of a matching record through an orthogonal matrix about the center. """
+    kind, coordinates, key, _ = record
+    a, b, c, d = matrix
+    points = [(a * x + b * y, c * x + d * y) for x, y in zip(coordinates[0::2], coordinates[1::2])]
+    kx, ky = key
+    key = (a * kx + b * ky, c * kx + d * ky)
+    if kind == CIRCLE:
+        return kind, (points[0][0], points[0][1], coordinates[2]), key
+    if kind == ARC and a * d - b * c < 0:
+        points[1], points[2] = points[2], points[1]  # A reflected arc runs from the image of the old end
+    return kind, tuple(value for point in points for value in point), key
+
+
+def _distance(kind, p, q):
+    """ Largest coordinate distance between two entities of the same kind; lines match in either direction. """
+    if kind == CIRCLE:
+        return max(math.hypot(p[0] - q[0], p[1] - q[1]), abs(p[2] - q[2]))
+    forward = max(math.hypot(p[i] - q[i], p[i + 1] - q[i + 1]) for i in range(0, len(p), 2))
+    if kind == ARC:
+        return forward
+    return min(forward, max(math.hypot(p[0] - q[2], p[1] - q[3]), math.hypot(p[2] - q[0], p[3] - q[1])))
+
+
+class _Index:
+    """ Hash grid of record key points, for finding the record an image lands on. """
+
+    def __init__(self, records, tolerance):
+        self.records = records
+        self.tolerance = tolerance
+        self.cell = 2 * tolerance
+        self.cells = {}
+        for position, record in enumerate(records):
+            self.cells.setdefault(self._cell(record[2]), []).append(position)
+
+    def _cell(self, point):
+        return (math.floor(point[0] / self.cell), math.floor(point[1] / self.cell))
+
+    def find(self, image):
+        """ Return (position, distance) of the closest record matching the image within tolerance, or (None, None). """
+        kind, coordinates, key = image
+        i, j = self._cell(key)
+        best, best_distance = None, None
+        for ci in (i - 1, i, i + 1):
+            for cj in (j - 1, j, j + 1):
+                for position in self.cells.get((ci, cj), ()):
+                    record = self.records[position]
+                    if record[0] != kind:
+                        continue
+                    distance = _distance(kind, coordinates, record[1])
+                    if distance <= self.tolerance and (best is None or distance < best_distance):
+                        best, best_distance = position, distance
+        return best, best_distance
+
+    def match(self, matrix, give_up=None):
+        """
+        Map every record through the matrix and look its image up.
+
+        Returns:
+        - Tuple: (unmatched count, largest match distance). Stops counting once unmatched exceeds give_up.
+        """
+        unmatched, deviation = 0, 0.0
+        for record in self.records:
+            position, distance = self.find(_map(record, matrix))
+            if position is None:
+                unmatched += 1
+                if give_up is not None and unmatched > give_up:
+                    break
+            else:
+                deviation = max(deviation, distance)
+        return unmatched, deviation
+
+
+def detect_symmetry(entities, tolerance=SYMMETRY_TOLERANCE):
+    """
+    Find the largest rotational symmetry of a profile about its centroid, and a mirror axis if it has one.
+
+    Candidate orders come from the entities at the same distance from the center as the outermost one; each candidate
+    is accepted only if every line, arc and circle maps onto another within tolerance. Splines are ignored.
+
+    Parameters:
+    - entities (list or Profile): Profile entities in the library tuple format, or a Profile.
+    - tolerance (float): Largest distance between an entity and its image that still counts as a match (cm).
+
+    Returns:
+    - Symmetry: The detected symmetry; order 1 without mirror if the profile has none.
+    """
+    profile = entities if isinstance(entities, Profile) else Profile.from_entities(entities)
+    center = profile.centroid()
+    if center is None:
+        return Symmetry()
+    records = _records(profile, center)
+    if not records:
+        return Symmetry(center=center)
+    index = _Index(records, tolerance)
+
+    # The outermost key point and the records level with it: every group element maps it onto one of them
+    reference = max(records, key=lambda record: math.hypot(*record[2]))
+    radius = math.hypot(*reference[2])
+    if radius <= tolerance:
+        return Symmetry(center=center)
+    alpha = math.atan2(reference[2][1], reference[2][0])
+    level = [math.atan2(record[2][1], record[2][0]) for record in records
+             if record[0] == reference[0] and abs(math.hypot(*record[2]) - radius) <= tolerance]
+
+    orders = set()
+    for beta in level:
+        turn = (beta - alpha) % (2 * math.pi)
+        if turn * radius > tolerance:
+            order = int(round(2 * math.pi / turn))
+            if 2 <= order <= MAX_ORDER and abs(2 * math.pi / order - turn) * radius <= tolerance:
+                orders.add(order)
+
+    order, deviation, near_miss = 1, 0.0, None
+    allowed = int(len(records) * (1 - NEAR_MISS_FRACTION))
+    for candidate in sorted(orders, reverse=True):
+        unmatched, candidate_deviation = index.match(_rotation(2 * math.pi / candidate), give_up=allowed)
+        if unmatched == 0:
+            order, deviation = candidate, candidate_deviation
+            break
+        if unmatched <= allowed and (near_miss is None or unmatched < near_miss[1]):
+            near_miss = (candidate, unmatched)
+    if near_miss is not None and near_miss[0] <= order:
+        near_miss = None
+
+    # Mirror axes of the group are pi / order apart; try each axis that maps the reference onto a level record
+    period = math.pi / order
+    axes = []
+    for beta in level:
+        axis = ((alpha + beta) / 2) % period
+        if all(min(abs(axis - other), period - abs(axis - other)) * radius > tolerance for other in axes):
+            axes.append(axis)
+    mirror = None
+    for axis in axes:
+        unmatched, axis_deviation = index.match(_reflection(axis), give_up=0)
+        if unmatched == 0:
+            mirror, deviation = axis, max(deviation, axis_deviation)
+            break
+    return Symmetry(order, mirror, center, deviation, near_miss)
+
+
+class SymmetricProfile:
+    """
+    A profile stored as a fundamental sector and the symmetry that rebuilds it. Coordinates are relative to the
+    symmetry center. Iterates (and measures len) like the expanded Profile, so it can be used wherever one is.
+
+    Attributes:
+    - symmetry (Symmetry): The group the sector is expanded with.
+    - sector (Profile): Entities moved by every group element; each is copied symmetry.size times.
+    - axial (Profile): Entities lying across a mirror axis, so the reflections add nothing; copied by the rotations only.
+    - fixed (Profile): Entities stored as they are (splines, and any entity whose images are not all distinct).
+    """
+    __slots__ = ('symmetry', 'sector', 'axial', 'fixed')
+
+    def __init__(self, symmetry, sector, axial=None, fixed=None):
+        self.symmetry = symmetry
+        self.sector = sector
+        self.axial = axial if axial is not None else Profile()
+        self.fixed = fixed if fixed is not None else Profile()
+
+    def expand(self, scale=1.0, dx=0.0, dy=0.0):
+        """
+        Build the full profile, scaled about the origin and translated by (dx, dy) in the same pass.
+
+        Returns:
+        - Profile: Every copy of the sector, in group element order, followed by the fixed entities.
+        """
+        cx, cy = self.symmetry.center
+        ox, oy = cx * scale + dx, cy * scale + dy
+        profile = Profile()
+        for k, (a, b, c, d) in enumerate(self.symmetry.matrices()):
+            profile.extend(self.sector.copy().apply_matrix(a * scale, b * scale, c * scale, d * scale, ox, oy))
+            if k < self.symmetry.order and self.axial:
+                profile.extend(self.axial.copy().apply_matrix(a * scale, b * scale, c * scale, d * scale, ox, oy))
+        profile.extend(self.fixed.copy().apply_matrix(scale, 0.0, 0.0, scale, ox, oy))
+        return profile
+
+    def __iter__(self):
+        return iter(self.expand())
+
+    def __len__(self):
+        return len(self.sector) * self.symmetry.size + len(self.axial) * self.symmetry.order + len(self.fixed)
+
+    def to_entities(self):
+        return self.expand().to_entities()
+
+    def nbytes(self):
+        """ Bytes held by the sector buffers. """
+        return self.sector.nbytes() + self.axial.nbytes() + self.fixed.nbytes()
+
+
+def compress(entities, tolerance=SYMMETRY_TOLERANCE, symmetry=None):
+    """
+    Split a profile into the fundamental sector of its symmetry.
+
+    Each entity is assigned, in profile order, to the sector if its images under the group are all distinct, to the
+    axial part if only its rotations are distinct (it lies across a mirror axis), and otherwise kept as it is together
+    with its images; the images are then skipped. Expanding the result reproduces every entity within the symmetry's
+    deviation, so profiles deviating more than COMPRESS_DEVIATION are not compressed: their loops would not close.
+
+    Parameters:
+    - entities (list or Profile): Profile entities in the library tuple format, or a Profile.
+    - tolerance (float): As for detect_symmetry.
+    - symmetry (Symmetry): Symmetry to compress with, if already detected.
+
+    Returns:
+    - SymmetricProfile: The compressed profile, or None if the profile has no symmetry or is only symmetric within
+      more than COMPRESS_DEVIATION.
+    """
+    profile = entities if isinstance(entities, Profile) else Profile.from_entities(entities)
+    if symmetry is None:
+        symmetry = detect_symmetry(profile, tolerance)
+    if symmetry.size == 1 or symmetry.deviation > COMPRESS_DEVIATION:
+        return None
+    records = _records(profile, symmetry.center)
+    index = _Index(records, tolerance)
+    matrices = symmetry.matrices()
+    order = symmetry.order
+
+    tiers = {}  # Entity index -> 'sector', 'axial' or 'fixed'; images of a sector/axial entity map to None
+    for position, record in enumerate(records):
+        if record[3] in tiers:
+            continue
+        images = [index.find(_map(record, matrix))[0] for matrix in matrices]
+        if None in images or any(records[image][3] in tiers for image in images if image != position):
+            tiers[record[3]] = 'fixed'
+            continue
+        distinct = len(set(images))
+        if distinct == len(matrices):
+            tier = 'sector'
+        elif symmetry.mirror is not None and len(set(images[:order])) == order and set(images) == set(images[:order]):
+            tier = 'axial'
+        else:
+            tier = 'fixed'
+        for image in images:
+            tiers[records[image][3]] = tier if tier == 'fixed' else None
+        tiers[record[3]] = tier
+
+    parts = {'sector': [], 'axial': [], 'fixed': []}
+    cx, cy = symmetry.center
+    for entity_index, entity in enumerate(profile.transformed(1.0, -cx, -cy)):
+        tier = tiers.get(entity_index, 'fixed')  # Splines are not in the records
+        if tier is not None:
+            parts[tier].append(entity)
+    return SymmetricProfile(symmetry, Profile.from_entities(parts['sector']), Profile.from_entities(parts['axial']),
+                            Profile.from_entities(parts['fixed']))
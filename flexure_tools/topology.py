@@ -0,0 +1,96 @@
+'''
+Description: Per-face topology index. Walking face.loops and every loop's edges through the API to find the loop of a
+selected edge costs seconds on faces with hundreds of cut-outs; the index does that walk once per face and answers
+edge -> loop lookups from a dict afterwards, along with a per-loop cache for derived geometry (centroid, radius, ...).
+Faces are keyed by their body's revisionId, so any change to the body retires the old index automatically.
+'''
+
+from collections import OrderedDict
+
+
+class FaceTopology:
+    """
+    Edge/loop lookup tables of one face, valid while its body is unchanged.
+
+    Attributes:
+    - loops (list): The face's BRepLoop objects, in face.loops order.
+    - loop_edges (list): For each loop, the list of its BRepEdge objects.
+    - edge_loops (dict): Edge tempId -> loop index.
+    """
+
+    def __init__(self, face):
+        self.face = face
+        self.loops = []
+        self.loop_edges = []
+        self.edge_loops = {}
+        self._cache = {}
+        for loop in face.loops:
+            edges = list(loop.edges)
+            index = len(self.loops)
+            self.loops.append(loop)
+            self.loop_edges.append(edges)
+            for edge in edges:
+                self.edge_loops[edge.tempId] = index
+
+    def loop_index(self, edge):
+        """ Return the index of the loop containing edge, or None if the edge is not on this face. """
+        return self.edge_loops.get(edge.tempId)
+
+    def cached(self, loop_index, name, compute):
+        """
+        Return a derived value of a loop, computing it on first use.
+
+        Parameters:
+        - loop_index (int): Index into loops.
+        - name (str): Name of the value, e.g. 'properties'.
+        - compute (callable): Called with the BRepLoop to produce the value.
+        """
+        key = (loop_index, name)
+        if key not in self._cache:
+            self._cache[key] = compute(self.loops[loop_index])
+        return self._cache[key]
+
+
+class TopologyIndex:
+    """
+    Bounded cache of FaceTopology objects, shared across command executions.
+
+    A face is identified by (body revisionId, face tempId). Both change when the body is modified, so a stale index is
+    never returned; it is simply not found and ages out of the cache.
+    """
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.builds = 0
+        self._faces = OrderedDict()
+
+    def face(self, face):
+        """ Return the FaceTopology of a BRepFace, building it if the face (or its body's revision) is new. """
+        key = (face.body.revisionId, face.tempId)
+        topology = self._faces.get(key)
+        if topology is None:
+            topology = FaceTopology(face)
+            self.builds += 1
+            self._faces[key] = topology
+            if len(self._faces) > self.maxsize:
+                self._faces.popitem(last=False)
+        else:
+            self._faces.move_to_end(key)
+        return topology
+
+    def loop_of_edge(self, edge, face=None):
+        """
+        Find the loop containing an edge.
+
+        Parameters:
+        - edge (adsk.fusion.BRepEdge): The selected edge.
+        - face (adsk.fusion.BRepFace): The face to search; defaults to the edge's first face.
+
+        Returns:
+        - Tuple: (FaceTopology, loop index), or (FaceTopology, None) if the edge is not on the face.
+        """
+        topology = self.face(face if face is not None else edge.faces.item(0))
+        return topology, topology.loop_index(edge)
+
+    def clear(self):
+        self._faces.clear()
@@ -0,0 +1,148 @@
+'''
+Description: Background worker for the pure-geometry part of a command (section properties, scaling, simplifying).
+The adsk API may only be used from Fusion's UI thread, so tasks run on a worker thread and hand their results back
+through a registered custom event: the worker queues each finished batch and fires the event, and the event handler,
+running on the UI thread, applies the results (e.g. emits sketch geometry), reports progress and honours cancellation.
+A thread rather than a process pool is used because Fusion's embedded interpreter cannot spawn Python processes.
+'''
+
+import adsk.core
+import itertools, queue, threading, time, traceback
+
+EVENT_ID = 'flexureToolsGeometryReady'
+
+
+class Job:
+    """
+    One submitted batch of tasks.
+
+    Attributes:
+    - id (int): Job number, unique per worker.
+    - total (int): Number of tasks.
+    - completed (int): Results applied on the UI thread so far.
+    - error (str): Traceback of a failed task, or None.
+    - finished (bool): True once the last result (or the error) has been handed to the finished callback.
+    """
+
+    def __init__(self, job_id, tasks, apply, progress, finished):
+        self.id = job_id
+        self.tasks = tasks
+        self.total = len(tasks)
+        self.completed = 0
+        self.error = None
+        self.finished = False
+        self._apply, self._progress, self._finished = apply, progress, finished
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """ Stop after the task that is running; results not yet applied are discarded. """
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+
+class _ReadyHandler(adsk.core.CustomEventHandler):
+    def __init__(self, worker):
+        super().__init__()
+        self.worker = worker
+
+    def notify(self, args):
+        self.worker.deliver()
+
+
+class GeometryWorker:
+    """
+    Runs task lists on a background thread and applies their results on the UI thread.
+
+    Tasks must not touch the adsk API; read whatever they need from the API before submitting. apply, progress and
+    finished are only ever called from the custom event handler, i.e. on the UI thread.
+    """
+
+    def __init__(self, app, event_id=EVENT_ID, batch_size=16, batch_seconds=0.05):
+        """
+        Parameters:
+        - app (adsk.core.Application): The application, used to register and fire the custom event.
+        - event_id (str): Custom event id; must be unique among the add-ins and scripts running.
+        - batch_size (int): Results handed back per event, at most.
+        - batch_seconds (float): A partial batch is handed back once it is this old, so progress keeps moving.
+        """
+        self.app = app
+        self.event_id = event_id
+        self.batch_size = batch_size
+        self.batch_seconds = batch_seconds
+        self._results = queue.Queue()
+        self._ids = itertools.count(1)
+        self._event = app.registerCustomEvent(event_id)
+        self._handler = _ReadyHandler(self)
+        self._event.add(self._handler)
+
+    def submit(self, tasks, apply, progress=None, finished=None):
+        """
+        Start running tasks in the background.
+
+        Parameters:
+        - tasks (list): Callables taking no arguments; each returns one result.
+        - apply (callable): Called on the UI thread with each result, in task order.
+        - progress (callable): Optional, called on the UI thread with (completed, total) after each batch; return False
+          to cancel the job.
+        - finished (callable): Optional, called on the UI thread with the Job when it ends (done, cancelled or failed).
+
+        Returns:
+        - Job: Handle for cancellation and status.
+        """
+        job = Job(next(self._ids), list(tasks), apply, progress, finished)
+        threading.Thread(target=self._run, args=(job,), name='flexure-geometry-{}'.format(job.id), daemon=True).start()
+        return job
+
+    def _post(self, job, kind, payload):
+        self._results.put((job, kind, payload))
+        self.app.fireCustomEvent(self.event_id, str(job.id))
+
+    def _run(self, job):
+        """ Worker thread: run the tasks, posting results in batches. """
+        batch, batch_start = [], time.perf_counter()
+        try:
+            for task in job.tasks:
+                if job.cancelled:
+                    break
+                batch.append(task())
+                if len(batch) >= self.batch_size or time.perf_counter() - batch_start >= self.batch_seconds:
+                    self._post(job, 'results', batch)
+                    batch, batch_start = [], time.perf_counter()
+            if batch:
+                self._post(job, 'results', batch)
+        except Exception:
+            self._post(job, 'error', traceback.format_exc())
+            return
+        self._post(job, 'end', None)
+
+    def deliver(self):
+        """ UI thread: apply every result posted so far. Called by the custom event handler. """
+        while True:
+            try:
+                job, kind, payload = self._results.get_nowait()
+            except queue.Empty:
+                return
+            if job.finished:
+                continue
+            if kind == 'results':
+                if job.cancelled:
+                    continue
+                for result in payload:
+                    job._apply(result)
+                job.completed += len(payload)
+                if job._progress is not None and job._progress(job.completed, job.total) is False:
+                    job.cancel()
+            else:
+                if kind == 'error':
+                    job.error = payload
+                job.finished = True
+                if job._finished is not None:
+                    job._finished(job)
+
+    def close(self):
+        """ Unregister the custom event. Results of jobs still running are no longer applied. """
+        self._event.remove(self._handler)
+        self.app.unregisterCustomEvent(self.event_id)
@@ -0,0 +1,25 @@
+'''
+Description: Shared setup for the test suite. The tests run headless against the stand-in adsk package in benchmarks/,
+and reuse the benchmark workloads (library profiles, synthetic profiles, stand-in sketches and BRep faces).
+'''
+
+import os, sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+import fixtures  # Puts the stand-in adsk package and the repository root on sys.path
+import adsk
+
+
+@pytest.fixture(autouse=True)
+def api_calls():
+    """ The adsk API call counters, cleared before every test. """
+    adsk.reset_counters()
+    return adsk.calls
+
+
+def square(x0, y0, x1, y1, z=0.0):
+    """ Counter-clockwise rectangle as four library lines. """
+    corners = [(x0, y0, z), (x1, y0, z), (x1, y1, z), (x0, y1, z)]
+    return [('line', [(corners[i], corners[(i + 1) % 4])]) for i in range(4)]
@@ -0,0 +1,89 @@
+'''
+Description: Biarc spline fitting in flexure_tools.biarc: chained end points, short halves, circles and
+straight runs.
+'''
+
+import math
+import random
+
+import pytest
+
+from flexure_tools import biarc, loops
+
+JOIN = 1e-9  # cm; consecutive pieces must meet far inside loops.LOOP_TOLERANCE
+
+
+def _zigzag(seed, count=20):
+    """ Irregular zigzag fit points a few tolerances apart, so many biarc junctions land next to a fit point. """
+    rng = random.Random(seed)
+    x, points = 0.0, []
+    for k in range(count):
+        x += rng.uniform(0.0005, 0.003)
+        points.append((x, (0.003 if k % 2 else -0.003) * rng.uniform(0.2, 1.0), 0.0))
+    return points
+
+
+def _walk(entities, start):
+    """
+    Follow the entities from start (arcs are stored counter-clockwise, so either end may come first); returns the gap
+    at every joint and the point the chain ends at.
+    """
+    gaps, current = [], start
+    for entity in entities:
+        a, b = loops.entity_end_points(entity)
+        gap_a, gap_b = math.dist(current, a), math.dist(current, b)
+        gaps.append(min(gap_a, gap_b))
+        current = b if gap_a <= gap_b else a
+    return gaps, current
+
+
+def test_consecutive_pieces_share_end_points():
+    broken = []
+    for seed in range(300):
+        points = _zigzag(seed)
+        gaps, end = _walk(biarc.fit_points(points), points[0][:2])
+        if max(gaps) > JOIN or math.dist(end, points[-1][:2]) > JOIN:
+            broken.append(seed)
+    assert broken == []
+
+
+def _piece_ends(piece):
+    if piece[0] == 'line':
+        return piece[1:3], piece[3:5]
+    _, cx, cy, radius, start, sweep = piece
+    return ((cx + radius * math.cos(start), cy + radius * math.sin(start)),
+            (cx + radius * math.cos(start + sweep), cy + radius * math.sin(start + sweep)))
+
+
+@pytest.mark.parametrize('p1, t1, p2, t2', [
+    # Junction within the tolerance of p2: only the first half is long enough
+    ((0.0, 0.0), (math.cos(0.3), math.sin(0.3)), (0.0019, 0.0), (math.cos(-1.5), math.sin(-1.5))),
+    # The mirror image: junction within the tolerance of p1
+    ((0.0, 0.0), (math.cos(-1.5), math.sin(1.5)), (0.0019, 0.0), (math.cos(0.3), -math.sin(0.3))),
+])
+def test_short_half_is_replaced_by_one_piece_from_end_to_end(p1, t1, p2, t2):
+    pieces = biarc.biarc(p1, t1, p2, t2)
+    assert len(pieces) == 1
+    start, end = _piece_ends(pieces[0])
+    assert math.dist(start, p1) <= JOIN and math.dist(end, p2) <= JOIN
+
+
+def test_circle_samples_fit_within_tolerance_and_close():
+    points = [(math.cos(k * math.pi / 32), math.sin(k * math.pi / 32), 0.0) for k in range(65)]
+    entities = biarc.fit_points(points)
+    assert len(entities) < len(points) // 4
+    assert all(entity[0] == 'arc' and abs(entity[1][0][2]) > 0 for entity in entities)
+    [loop] = loops.find_loops(entities)
+    assert loop.closed
+
+
+def test_straight_points_become_one_line():
+    entities = biarc.fit_points([(k * 0.1, 0.2 * k * 0.1, 0.0) for k in range(11)])
+    assert entities == [('line', [((0.0, 0.0, 0.0), (1.0, 0.2, 0.0))])]
+
+
+def test_splines_to_arcs_passes_other_entities_through():
+    line = ('line', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))])
+    assert biarc.splines_to_arcs([line]) == [line]
+    converted = biarc.splines_to_arcs([line, ('spline', [_zigzag(1)])])
+    assert converted[0] == line and all(entity[0] in ('line', 'arc') for entity in converted[1:])
@@ -0,0 +1,198 @@
+'''
+Description: Reading DXF entities in flexure_tools.dxf_import (bulges, mirrored entities, splines), and importing
+exported profiles back into a library.
+'''
+
+import json, math, os
+
+import pytest
+
+import fixtures
+from flexure_tools import dxf_import, export, loops
+from flexure_tools.profile import Profile
+from flexure_tools.profile_store import ProfileStore
+
+LIBRARY = fixtures.library_profiles()
+
+
+def _write(path, *entities):
+    """ Write a DXF file whose ENTITIES section holds the given entities, each a (type, [(code, value), ...]). """
+    pairs = [(0, 'SECTION'), (2, 'ENTITIES')]
+    for kind, groups in entities:
+        pairs += [(0, kind)] + list(groups)
+    pairs += [(0, 'ENDSEC'), (0, 'EOF')]
+    with open(path, 'w') as f:
+        f.write(''.join('{}\n{}\n'.format(code, value) for code, value in pairs))
+    return str(path)
+
+
+def _read(tmp_path, *entities, by_layer=False):
+    shapes, _ = dxf_import.read_dxf(_write(tmp_path / 'drawing.dxf', *entities), by_layer)
+    return shapes
+
+
+def _arc_midpoint(cx, cy, radius, start, sweep):
+    return cx + radius * math.cos(start + sweep / 2), cy + radius * math.sin(start + sweep / 2)
+
+
+def _ring(radius, count=4):
+    """ A closed LWPOLYLINE circle of the given radius, as `count` equal bulged segments. """
+    bulge = math.tan(math.pi / 2 / count)
+    groups = [(90, count), (70, 1)]
+    for k in range(count):
+        angle = 2 * math.pi * k / count
+        groups += [(10, radius * math.cos(angle)), (20, radius * math.sin(angle)), (42, bulge)]
+    return 'LWPOLYLINE', groups
+
+
+@pytest.mark.parametrize('bulge, side', [(1.0, -1.0), (-1.0, 1.0)])
+def test_bulge_half_turn_bows_to_the_right_side(tmp_path, bulge, side):
+    # A positive bulge runs counter-clockwise from the first vertex, so from (0, 0) to (2, 0) it bows below the chord
+    shapes = _read(tmp_path, ('LWPOLYLINE', [(90, 2), (70, 0), (10, 0), (20, 0), (42, bulge), (10, 2), (20, 0)]))
+    [(cx, cy, radius, start, sweep)] = list(shapes[None]._arc_geometry())
+    assert (cx, cy, radius, sweep) == pytest.approx((1.0, 0.0, 1.0, math.pi))
+    assert _arc_midpoint(cx, cy, radius, start, sweep) == pytest.approx((1.0, side))
+
+
+def test_closed_bulged_polyline_is_a_circle_of_arcs(tmp_path):
+    profile = _read(tmp_path, _ring(1.5, count=6))[None]
+    arcs = list(profile._arc_geometry())
+    assert len(arcs) == 6 and not profile.lines
+    for cx, cy, radius, start, sweep in arcs:
+        assert (cx, cy, radius, sweep) == pytest.approx((0.0, 0.0, 1.5, math.pi / 3), abs=1e-12)
+    assert sum(sweep for *_, sweep in arcs) == pytest.approx(2 * math.pi)
+
+
+def test_small_bulge_is_a_line(tmp_path):
+    profile = _read(tmp_path, ('LWPOLYLINE', [(10, 0), (20, 0), (42, 1e-15), (10, 1), (20, 1)]))[None]
+    assert profile.counts() == Profile.from_entities([('line', [((0, 0, 0), (1, 1, 0))])]).counts()
+
+
+def test_polyline_vertices_and_bulges(tmp_path):
+    # The old-style POLYLINE ... VERTEX ... SEQEND sequence reads like an LWPOLYLINE
+    vertices = [('VERTEX', [(10, x), (20, y), (42, bulge)]) for x, y, bulge in [(0, 0, 1.0), (2, 0, 0.0)]]
+    profile = _read(tmp_path, ('POLYLINE', [(70, 0)]), *vertices, ('SEQEND', []))[None]
+    [(cx, cy, radius, start, sweep)] = list(profile._arc_geometry())
+    assert _arc_midpoint(cx, cy, radius, start, sweep) == pytest.approx((1.0, -1.0))
+
+
+def test_mirrored_arc_is_flipped_into_the_xy_plane(tmp_path):
+    # Extrusion (0, 0, -1): the object x axis points along -X, and counter-clockwise about -Z is clockwise in XY.
+    # The arc from 0 to 90 degrees about object (1, 0) therefore runs from (-2, 0) to (-1, 1) in the drawing.
+    arc = ('ARC', [(10, 1), (20, 0), (30, 0), (40, 1), (50, 0), (51, 90), (210, 0), (220, 0), (230, -1)])
+    profile = _read(tmp_path, arc)[None]
+    [(cx, cy, radius, start, sweep)] = list(profile._arc_geometry())
+    assert (cx, cy, radius, sweep) == pytest.approx((-1.0, 0.0, 1.0, math.pi / 2))
+    [entity] = list(profile)
+    ends = [value for point in sorted(loops.entity_end_points(entity)) for value in point]
+    assert ends == pytest.approx([-2.0, 0.0, -1.0, 1.0])
+
+
+def test_mirrored_circle_and_polyline(tmp_path):
+    circle = ('CIRCLE', [(10, 3), (20, 1), (40, 0.5), (230, -1)])
+    polyline = ('LWPOLYLINE', [(10, 0), (20, 0), (42, 1.0), (10, 2), (20, 0), (230, -1)])
+    profile = _read(tmp_path, circle, polyline)[None]
+    assert list(profile.circles[:2]) == [-3.0, 1.0]
+    # Mirroring x turns the chord around and reverses the bulge, so the arc still bows below it
+    [(cx, cy, radius, start, sweep)] = list(profile._arc_geometry())
+    assert _arc_midpoint(cx, cy, radius, start, sweep) == pytest.approx((-1.0, -1.0))
+
+
+def test_tilted_entity_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='not parallel'):
+        _read(tmp_path, ('CIRCLE', [(10, 0), (20, 0), (40, 1), (210, 1), (220, 0), (230, 0)]))
+
+
+def test_spline_keeps_its_fit_points(tmp_path):
+    fit = [(0.0, 0.0), (1.0, 0.5), (2.0, 0.0), (3.0, -0.5)]
+    groups = [(71, 3), (10, 9), (20, 9)] + [pair for x, y in fit for pair in ((11, x), (21, y))]
+    profile = _read(tmp_path, ('SPLINE', groups))[None]
+    assert list(profile.spline_counts) == [4]
+    assert list(profile.spline_points) == [value for x, y in fit for value in (x, y, 0.0)]
+
+
+def test_rational_spline_is_sampled_on_the_curve(tmp_path):
+    # A quadratic NURBS with weights (1, sqrt(1/2), 1) is an exact quarter circle; sampling the control polygon or
+    # ignoring the weights would leave points off it
+    controls = [(1.0, 0.0, 1.0), (1.0, 1.0, math.sqrt(0.5)), (0.0, 1.0, 1.0)]
+    groups = [(71, 2)] + [(40, knot) for knot in (0, 0, 0, 1, 1, 1)]
+    groups += [pair for x, y, w in controls for pair in ((10, x), (20, y), (41, w))]
+    profile = _read(tmp_path, ('SPLINE', groups))[None]
+    points = profile.spline_points
+    samples = [(points[i], points[i + 1]) for i in range(0, len(points), 3)]
+    assert len(samples) == dxf_import.SPLINE_SAMPLES * len(controls) + 1
+    assert samples[0] == pytest.approx((1.0, 0.0)) and samples[-1] == pytest.approx((0.0, 1.0))
+    for x, y in samples:
+        assert math.hypot(x, y) == pytest.approx(1.0)
+
+
+def test_spline_without_weights_or_valid_knots(tmp_path):
+    # Missing weights count as 1; a knot vector of the wrong length falls back to the control points
+    controls = [(0.0, 0.0), (1.0, 1.0), (2.0, 0.0)]
+    groups = [(71, 2), (40, 0), (40, 1)] + [pair for x, y in controls for pair in ((10, x), (20, y))]
+    profile = _read(tmp_path, ('SPLINE', groups))[None]
+    assert list(profile.spline_points) == [value for x, y in controls for value in (x, y, 0.0)]
+
+
+def test_layers_and_skipped_entities(tmp_path):
+    path = _write(tmp_path / 'drawing.dxf', _ring(1.0), ('TEXT', [(8, 'NOTES'), (1, 'hello')]),
+                  ('CIRCLE', [(8, 'OUTER'), (10, 0), (20, 0), (40, 2)]))
+    shapes, skipped = dxf_import.read_dxf(path, by_layer=True)
+    assert list(shapes) == ['0', 'OUTER'] and skipped == {'TEXT': 1}
+
+
+def test_import_normalizes_to_the_bore(tmp_path):
+    # A 2 cm bore ring centered at (5, 5) with an outer circle: stored centered, with a 1 cm bore
+    bore = ('CIRCLE', [(10, 5), (20, 5), (40, 2)])
+    outer = ('CIRCLE', [(10, 5), (20, 5), (40, 3)])
+    store = ProfileStore(str(tmp_path / 'library'))
+    [entry], _ = dxf_import.import_dxf(_write(tmp_path / 'ring.dxf', bore, outer), store, 'Imported')
+    assert entry['name'] == 'ring' and entry['bore'] == [5.0, 5.0, 2.0]
+    circles = store.load('Imported', 'ring').circles
+    assert sorted(circles[i + 3] for i in range(0, len(circles), 4)) == [1.0, 1.5]
+    assert not any(circles[i] or circles[i + 1] for i in range(0, len(circles), 4))
+
+
+@pytest.mark.parametrize('name', sorted(LIBRARY)[:4])
+def test_export_import_round_trip(tmp_path, name):
+    original = LIBRARY[name]
+    path = str(tmp_path / 'profile.dxf')
+    export.export_profile(path, original, name=name)
+    store = ProfileStore(str(tmp_path / 'library'))
+    [entry], skipped = dxf_import.import_dxf(path, store, 'Imported', name='copy')
+    assert not skipped
+    # The library is already normalized, so the import lands back on the original geometry (splines were written as
+    # biarcs, within their fit tolerance)
+    assert entry['bore'][2] == pytest.approx(dxf_import.INNER_RADIUS, abs=1e-4)
+    copy = store.load('Imported', 'copy')
+    for entity in (original.to_entities() if isinstance(original, Profile) else original):
+        if entity[0] == 'circle':
+            [(center, radius)] = entity[1]
+            points = [(center[0] + radius, center[1]), (center[0] - radius, center[1])]
+        else:
+            points = loops.entity_end_points(entity)
+        for x, y in points:
+            assert dxf_import.nearest_distance(copy, x, y) < 1e-4
+
+
+def test_bad_layer_adds_nothing_from_its_file(tmp_path):
+    # The second layer is a lone line: its centroid lies on it, so it has no bore
+    good = ('CIRCLE', [(8, 'GOOD'), (10, 0), (20, 0), (40, 1)])
+    bad = ('LINE', [(8, 'BAD'), (10, 0), (20, 0), (11, 1), (21, 0)])
+    store = ProfileStore(str(tmp_path / 'library'))
+    with pytest.raises(ValueError, match='no bore'):
+        dxf_import.import_dxf(_write(tmp_path / 'mixed.dxf', good, bad), store, 'Imported', by_layer=True)
+    assert len(store) == 0 and not os.path.exists(store.root)
+
+
+def test_main_skips_failing_files_and_saves_the_rest(tmp_path, capsys):
+    good = _write(tmp_path / 'good.dxf', *[('CIRCLE', [(10, 0), (20, 0), (40, radius)]) for radius in (1, 2)])
+    bad = _write(tmp_path / 'bad.dxf', ('LINE', [(10, 0), (20, 0), (11, 1), (21, 0)]))
+    later = _write(tmp_path / 'later.dxf', _ring(1.0))
+    library = str(tmp_path / 'library')
+    assert dxf_import.main([library, 'Imported', good, bad, later]) == 1
+    assert 'bad.dxf: not imported' in capsys.readouterr().err
+    with open(os.path.join(library, 'index.json'), encoding='utf-8') as f:
+        names = [entry['name'] for entry in json.load(f)['profiles']]
+    assert names == ['good', 'later']
+    assert sorted(ProfileStore(library).names('Imported')) == ['good', 'later']
@@ -0,0 +1,99 @@
+'''
+Description: SVG and R12 DXF export of profiles and contact sheets in flexure_tools.export.
+'''
+
+import io, math, re
+import xml.etree.ElementTree as ElementTree
+
+import pytest
+
+import fixtures
+from conftest import square
+from flexure_tools import dxf_import, export
+from flexure_tools.profile_store import ProfileStore
+
+SVG = '{http://www.w3.org/2000/svg}'
+HALF_DISC = [('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), math.pi)]), ('line', [((-1.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+
+
+def _svg(entities, name=None):
+    stream = io.StringIO()
+    writer = export.SvgWriter(stream, -2.0, -2.0, 2.0, 2.0)
+    writer.profile(entities, name=name)
+    writer.close()
+    return ElementTree.fromstring(stream.getvalue())
+
+
+def _dxf_layers(text):
+    """ The layer (group code 8) of every entity in a DXF text. """
+    lines = text.splitlines()
+    return [lines[i + 1] for i in range(0, len(lines), 2) if lines[i] == '8']
+
+
+def test_svg_path_flips_y():
+    svg = _svg(square(0.0, 0.0, 1.0, 1.0), name='Square')
+    assert svg.get('viewBox') == '-2 -2 4 4'
+    [path] = svg.iter(SVG + 'path')
+    assert path.get('id') == 'Square'
+    assert path.get('d') == 'M0 0L1 0M1 0L1 -1M1 -1L0 -1M0 -1L0 0'
+
+
+@pytest.mark.parametrize('sweep, large', [(math.pi / 2, 0), (1.5 * math.pi, 1)])
+def test_svg_arc_flags_and_end_point(sweep, large):
+    [path] = _svg([('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), sweep)])]).iter(SVG + 'path')
+    # Counter-clockwise with y up is drawn with the sweep flag 0 once y points down
+    numbers = [float(value) for value in re.findall(r'-?[\d.]+', path.get('d'))]
+    assert numbers[:7] == [1.0, 0.0, 1.0, 1.0, 0.0, large, 0.0]
+    assert numbers[7:] == pytest.approx([math.cos(sweep), -math.sin(sweep)], abs=1e-6)
+
+
+def test_svg_circle_and_escaped_name():
+    [path] = _svg([('circle', [((0.5, 0.5, 0.0), 0.25)])], name='A<&>"B').iter(SVG + 'path')
+    assert path.get('id') == 'A<&>"B'
+    assert path.get('d') == 'M0.75 -0.5A0.25 0.25 0 1 0 0.25 -0.5A0.25 0.25 0 1 0 0.75 -0.5'
+
+
+def test_dxf_profile_reads_back(tmp_path):
+    path = str(tmp_path / 'half.dxf')
+    export.export_profile(path, HALF_DISC, name='Half disc')
+    shapes, skipped = dxf_import.read_dxf(path, by_layer=True)
+    assert list(shapes) == ['HALF_DISC'] and not skipped
+    profile = shapes['HALF_DISC']
+    [(cx, cy, radius, start, sweep)] = list(profile._arc_geometry())
+    assert (cx, cy, radius, start, sweep) == pytest.approx((0.0, 0.0, 1.0, 0.0, math.pi))
+    assert list(profile.lines) == [-1.0, 0.0, 0.0, 1.0, 0.0, 0.0]
+
+
+@pytest.mark.parametrize('names', [
+    ['Circular/1st Flexure', 'circular 1st flexure', 'CIRCULAR:1ST:FLEXURE'],
+    ['Category/' + 'x' * 40 + ' one', 'Category/' + 'x' * 40 + ' two'],
+    ['labels', None, '0'],
+])
+def test_dxf_layers_are_unique(names):
+    stream = io.StringIO()
+    writer = export.DxfWriter(stream, 0.0, 0.0, 1.0, 1.0)
+    for name in names:
+        writer.profile(square(0.0, 0.0, 1.0, 1.0), name=name)
+        writer.label('label', 0.0, 0.0, 0.1)
+    writer.close()
+    layers = _dxf_layers(stream.getvalue())
+    profile_layers = sorted(set(layers) - {export.LABEL_LAYER})
+    assert len(profile_layers) == len(names)
+    assert all(len(layer) <= export.LAYER_LENGTH for layer in profile_layers)
+    assert layers.count(export.LABEL_LAYER) == len(names)
+
+
+def test_contact_sheet_keeps_profiles_apart(tmp_path):
+    store = ProfileStore(fixtures.LIBRARY_DIR)
+    dxf, svg = str(tmp_path / 'sheet.dxf'), str(tmp_path / 'sheet.svg')
+    count = export.export_contact_sheet(store, dxf, columns=3)
+    assert export.export_contact_sheet(store, svg, columns=3) == count == len(store)
+    shapes, skipped = dxf_import.read_dxf(dxf, by_layer=True)
+    assert len(shapes) == count and skipped == {'TEXT': count}
+    root = ElementTree.parse(svg).getroot()
+    assert len(list(root.iter(SVG + 'path'))) == len(list(root.iter(SVG + 'text'))) == count
+
+
+def test_unknown_extension_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match='.svg or .dxf'):
+        export.export_profile(str(tmp_path / 'profile.png'), HALF_DISC)
@@ -0,0 +1,36 @@
+'''
+Description: Batch extraction into the profile store, with bodies of the same name in different components.
+'''
+
+import adsk.fusion
+
+import fixtures
+from conftest import square
+from flexure_tools import extraction, profile_store
+
+
+def _body(component_name, size):
+    face = fixtures.brep_face(square(0.0, 0.0, size, size))
+    face.body.parentComponent = adsk.fusion.Component(component_name)
+    return face.body
+
+
+def test_same_body_name_in_two_components_keeps_both_profiles(tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path))
+    writer = extraction.StoreProfileWriter(store, 'batch')
+    clashes = []
+    count = extraction.stream_profiles([_body('Hinge', 1.0), _body('Clamp', 2.0)], writer, clashes=clashes)
+    writer.close()
+    assert count == 2
+    assert sorted(store.names('batch')) == ['Clamp/Body face 0', 'Hinge/Body face 0']
+    assert clashes == []
+
+
+def test_clashing_names_are_renamed_and_reported(tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path))
+    writer = extraction.StoreProfileWriter(store, 'batch')
+    clashes = []
+    extraction.stream_profiles([_body('Hinge', 1.0), _body('Hinge', 2.0)], writer, clashes=clashes)
+    writer.close()
+    assert sorted(store.names('batch')) == ['Hinge/Body face 0', 'Hinge/Body face 0 (2)']
+    assert clashes == ['Hinge/Body face 0']
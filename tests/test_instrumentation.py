@@ -0,0 +1,161 @@
+'''
+Description: Opt-in adsk call timing in flexure_tools.instrumentation, against the stand-in adsk package.
+'''
+
+import inspect, itertools, types
+
+import pytest
+
+import adsk.core, adsk.fusion
+from flexure_tools import instrumentation
+
+
+@pytest.fixture
+def ticks(monkeypatch):
+    """ A clock that advances one second per reading, so every timing is a whole number of readings. """
+    clock = itertools.count()
+    monkeypatch.setattr(instrumentation.time, 'perf_counter', lambda: float(next(clock)))
+
+
+def _originals(sites):
+    """ (class attribute as stored, defined on the class itself) of every call site present in the API. """
+    return {(class_name, attribute): (inspect.getattr_static(getattr(module, class_name), attribute, None),
+                                      attribute in vars(getattr(module, class_name)))
+            for module, class_name, attribute in sites if hasattr(module, class_name)}
+
+
+class _Base:
+    def inherited(self):
+        return 'base'
+
+
+class _Child(_Base):
+    def own(self):
+        return 'own'
+
+    def outer(self):
+        return self.inner() + 1
+
+    def inner(self):
+        return 1
+
+
+CHILD_SITES = tuple((types.SimpleNamespace(Child=_Child), 'Child', attribute)
+                    for attribute in ('inherited', 'own', 'outer', 'inner'))
+
+
+def test_enable_and_disable_restore_the_stand_in_api():
+    before = _originals(instrumentation.CALL_SITES)
+    recorder = instrumentation.Recorder()
+    recorder.enable()
+    try:
+        assert recorder.enabled
+        patched = _originals(instrumentation.CALL_SITES)
+        assert patched[('Sketch', 'isComputeDeferred')] != before[('Sketch', 'isComputeDeferred')]
+        assert patched[('SketchLines', 'addByTwoPoints')] != before[('SketchLines', 'addByTwoPoints')]
+        recorder.enable()  # A second enable must not wrap the wrappers
+    finally:
+        recorder.disable()
+    assert not recorder.enabled
+    assert _originals(instrumentation.CALL_SITES) == before
+
+
+def test_disable_uncovers_inherited_methods():
+    own = vars(_Child)['own']
+    recorder = instrumentation.Recorder(CHILD_SITES)
+    recorder.enable()
+    try:
+        assert 'inherited' in vars(_Child) and _Child().inherited() == 'base'
+        assert vars(_Child)['own'] is not own
+    finally:
+        recorder.disable()
+    assert 'inherited' not in vars(_Child) and _Child.inherited is _Base.inherited
+    assert vars(_Child)['own'] is own
+    assert 'inherited' in vars(_Base)
+
+
+def test_nested_calls_count_once(ticks):
+    recorder = instrumentation.Recorder(CHILD_SITES)
+    recorder.enable()
+    try:
+        @recorder.command('nested')
+        def run():
+            return _Child().outer()
+
+        assert run() == 2
+    finally:
+        recorder.disable()
+    [stats] = recorder.history
+    # Readings: command start 0, outer start 1, inner start 2, inner end 3, outer end 4, command end 5
+    assert stats.samples == {'Child.outer': [3.0], 'Child.inner': [1.0]}
+    assert stats.api_seconds == 3.0 and stats.wall_seconds == 5.0
+
+
+def test_property_setter_is_timed():
+    recorder = instrumentation.Recorder()
+    recorder.enable()
+    try:
+        sketch = adsk.fusion.Sketch()
+
+        @recorder.command('defer')
+        def run():
+            sketch.isComputeDeferred = True
+            sketch.sketchCurves.sketchCircles.addByCenterRadius(adsk.core.Point3D.create(0, 0, 0), 1.0)
+            sketch.isComputeDeferred = False
+            return sketch.isComputeDeferred
+
+        assert run() is False
+    finally:
+        recorder.disable()
+    samples = recorder.history[-1].samples
+    # Two assignments; reading the flag is not timed
+    assert len(samples['Sketch.isComputeDeferred']) == 2
+    assert len(samples['SketchCircles.addByCenterRadius']) == 1
+    assert sketch.recomputes == 1  # The wrapped setter still runs the original one
+
+
+def test_calls_outside_commands_are_kept_apart():
+    recorder = instrumentation.Recorder(CHILD_SITES)
+    recorder.enable()
+    try:
+        _Child().own()
+    finally:
+        recorder.disable()
+    assert recorder._loose.samples.keys() == {'Child.own'} and not recorder.history
+
+
+def test_disabled_command_patches_nothing():
+    before = _originals(instrumentation.CALL_SITES)
+    recorder = instrumentation.Recorder()
+
+    @recorder.command('idle')
+    def run(value):
+        sketch = adsk.fusion.Sketch()
+        sketch.isComputeDeferred = True
+        return value
+
+    assert run(3) == 3
+    assert _originals(instrumentation.CALL_SITES) == before
+    assert not recorder.enabled and not recorder.history and recorder.last_report() == ''
+
+
+def test_report_is_appended_to_the_log(tmp_path, ticks):
+    log = tmp_path / 'timing.log'
+    recorder = instrumentation.Recorder(CHILD_SITES, keep=1)
+    recorder.enable(str(log))
+    try:
+        for name in ('first', 'second'):
+            recorder.command(name)(lambda: _Child().outer())()
+    finally:
+        recorder.disable()
+    assert [stats.name for stats in recorder.history] == ['second']
+    text = log.read_text()
+    assert text.count('Child.outer') == text.count('Child.inner') == 2
+    headline = recorder.last_report().splitlines()[0]
+    assert headline == 'second: 5000.0 ms total, 3000.0 ms in API calls, 2000.0 ms in Python'
+
+
+def test_percentile_is_nearest_rank():
+    samples = list(range(1, 101))
+    assert [instrumentation.percentile(samples, f) for f in (0.0, 0.5, 0.9, 0.99, 1.0)] == [1, 50, 90, 99, 100]
+    assert instrumentation.percentile([7], 0.99) == 7
@@ -0,0 +1,31 @@
+'''
+Description: Sweep-line self-intersection checks in flexure_tools.intersect.
+'''
+
+import pytest
+
+import fixtures
+from conftest import square
+from flexure_tools import intersect
+
+
+def test_closed_profiles_do_not_cross_themselves():
+    assert intersect.find_profile_intersection(square(0.0, 0.0, 1.0, 1.0)) is None
+    assert intersect.find_profile_intersection(fixtures.synthetic_profile(200)) is None
+
+
+def test_crossing_is_found():
+    segments = [['line', 0.0, 0.0, 2.0, 2.0], ['line', 0.0, 2.0, 2.0, 0.0]]
+    i, j, (x, y) = intersect.find_intersection(segments)
+    assert (i, j) == (0, 1)
+    assert (x, y) == (pytest.approx(1.0), pytest.approx(1.0))
+
+
+def test_stacked_lines_with_one_crossing():
+    # Every line is active at once, the case a list-backed sweep handles in quadratic time
+    segments = [['line', 0.0, float(k), 100.0, float(k)] for k in range(2000)]
+    assert intersect.find_intersection(segments) is None
+    segments.append(['line', 50.0, 999.5, 51.0, 1000.5])
+    i, j, (x, y) = intersect.find_intersection(segments)
+    assert (i, j) == (1000, 2000)
+    assert (x, y) == (pytest.approx(50.5), pytest.approx(1000.0))
@@ -0,0 +1,92 @@
+'''
+Description: Vertex snapping and loop ordering/orientation in flexure_tools.loops.
+'''
+
+import random
+
+from conftest import square
+from flexure_tools import loops
+
+
+def test_vertex_grid_snaps_across_cell_borders():
+    grid = loops.VertexGrid(1e-7)
+    # Straddles a cell border (cells are 2e-7 wide) on both axes
+    a = grid.vertex(1.99999e-7, 1.99999e-7)
+    b = grid.vertex(2.00001e-7, 2.00001e-7)
+    c = grid.vertex(5e-7, 0.0)
+    assert a == b != c
+    assert len(grid) == 2
+
+
+def test_square_with_hole():
+    outer = square(0.0, 0.0, 4.0, 4.0)
+    hole = [('line', [(p2, p1)]) for _, [(p1, p2)] in square(1.0, 1.0, 2.0, 2.0)]  # Clockwise already
+    entities = outer + hole
+    shuffled = entities[:]
+    random.Random(1).shuffle(shuffled)
+
+    found = loops.find_loops(shuffled)
+
+    assert [(loop.closed, len(loop)) for loop in found] == [(True, 4), (True, 4)]
+    assert found[0].outer and found[0].area == 16.0 and found[0].parent == -1
+    assert not found[1].outer and found[1].area == -1.0 and found[1].parent == 0
+
+
+def test_orientation_is_fixed_whatever_the_input_direction():
+    clockwise = [('line', [(p2, p1)]) for _, [(p1, p2)] in square(0.0, 0.0, 1.0, 1.0)]
+    [loop] = loops.find_loops(clockwise)
+    assert loop.area == 1.0
+    assert all(reversed_ for _, reversed_ in loop.items)
+
+
+def test_arc_loop_area():
+    # Half disc of radius 1: a diameter and a half-circle arc
+    entities = [('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), 3.141592653589793)]),
+                ('line', [((-1.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+    [loop] = loops.find_loops(entities)
+    assert loop.closed
+    assert abs(loop.area - 3.141592653589793 / 2) < 1e-12
+
+
+def test_open_chain_and_circle():
+    entities = [('line', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))]),
+                ('circle', [((5.0, 5.0, 0.0), 1.0)]),
+                ('line', [((2.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+    found = loops.find_loops(entities)
+    assert [(loop.closed, len(loop)) for loop in found] == [(True, 1), (False, 2)]
+    # The open chain is walked from one free end to the other
+    assert [index for index, _ in found[1].items] in ([0, 2], [2, 0])
+
+
+def test_ordered_entities_groups_loops():
+    a, b = square(0.0, 0.0, 4.0, 4.0), square(10.0, 0.0, 11.0, 1.0)
+    mixed = [a[0], b[0], a[2], b[2], a[1], b[1], a[3], b[3]]
+    ordered = loops.ordered_entities(mixed)
+    assert set(map(id, ordered[:4])) == set(map(id, a))
+    assert set(map(id, ordered[4:])) == set(map(id, b))
+
+
+def test_plate_with_many_holes_nests_every_hole():
+    entities = square(0.0, 0.0, 41.0, 41.0)
+    for i in range(20):
+        for j in range(20):
+            entities += square(2 * i + 1, 2 * j + 1, 2 * i + 2, 2 * j + 2)
+    entities += square(1.25, 1.25, 1.75, 1.75)  # An island inside the first hole
+
+    found = loops.find_loops(entities)
+
+    assert found[0].outer and found[0].parent == -1 and found[0].area == 41.0 * 41.0
+    holes = found[1:401]
+    assert all(not hole.outer and hole.parent == 0 and hole.area == -1.0 for hole in holes)
+    island = found[401]
+    assert island.outer and island.area == 0.25
+    assert sorted(index for index, _ in found[island.parent].items) == [4, 5, 6, 7]  # The first hole
+
+
+def test_box_grid_finds_the_boxes_around_a_point():
+    grid = loops.BoxGrid([(0.0, 0.0, 10.0, 10.0), (1.0, 1.0, 2.0, 2.0), (8.0, 8.0, 9.0, 9.0), (5.0, 5.0, 5.0, 5.0)])
+    assert grid.containing(1.5, 1.5) == [0, 1]
+    assert grid.containing(5.0, 5.0) == [0, 3]
+    assert grid.containing(11.0, 5.0) == []
+    assert loops.BoxGrid([]).containing(0.0, 0.0) == []
+
@@ -0,0 +1,68 @@
+'''
+Description: Offsetting chains of lines, arcs and circles in flexure_tools.offset.
+'''
+
+import math, os, subprocess, sys
+
+import pytest
+
+from conftest import square
+from flexure_tools import loops, offset
+
+
+def _bounds(entities):
+    points = [point for _, [(p1, p2)] in entities for point in (p1, p2)]
+    return (min(p[0] for p in points), min(p[1] for p in points), max(p[0] for p in points), max(p[1] for p in points))
+
+
+def test_square_offsets_inward_and_outward():
+    entities = square(0.0, 0.0, 2.0, 2.0)
+    inner, outer = offset.offset_chain(entities, [0.1, -0.1], direction_point=(1.0, 1.0))
+
+    assert _bounds(inner) == pytest.approx((0.1, 0.1, 1.9, 1.9))
+    assert _bounds(outer) == pytest.approx((-0.1, -0.1, 2.1, 2.1))
+    for ring, side in ((inner, 1.8), (outer, 2.2)):
+        assert [kind for kind, _ in ring] == ['line'] * 4
+        [loop] = loops.find_loops(ring)
+        assert loop.closed
+        assert loop.area == pytest.approx(side * side)
+
+
+def test_offset_keeps_order_and_direction_of_input():
+    entities = square(0.0, 0.0, 2.0, 2.0)
+    shuffled = [entities[2], entities[0], ('line', [entities[3][1][0][::-1]]), entities[1]]
+    [ring] = offset.offset_chain(shuffled, [0.1], direction_point=(1.0, 1.0))
+    assert _bounds(ring) == pytest.approx((0.1, 0.1, 1.9, 1.9))
+
+
+def test_circle_offsets_toward_direction_point():
+    entities = [('circle', [((0.0, 0.0, 0.0), 1.0)])]
+    inner, outer = offset.offset_chain(entities, [0.25, -0.25], direction_point=(0.0, 0.0))
+    assert inner == [('circle', [((0.0, 0.0, 0.0), 0.75)])]
+    assert outer == [('circle', [((0.0, 0.0, 0.0), 1.25)])]
+
+
+def test_collapsed_circle_is_dropped():
+    [ring] = offset.offset_chain([('circle', [((0.0, 0.0, 0.0), 1.0)])], [1.5], direction_point=(0.0, 0.0))
+    assert ring == []
+
+
+def test_arc_offset_changes_radius():
+    # Half disc: the arc shrinks when offset inward, the diameter moves up
+    entities = [('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), math.pi)]), ('line', [((-1.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+    [ring] = offset.offset_chain(entities, [0.1], direction_point=(0.0, 0.5))
+    arcs = [params[0] for kind, params in ring if kind == 'arc']
+    lines = [params[0] for kind, params in ring if kind == 'line']
+    assert len(arcs) == len(lines) == 1
+    center, start, _ = arcs[0]
+    assert math.dist(center, start) == pytest.approx(0.9)
+    assert lines[0][0][1] == pytest.approx(0.1)
+
+
+def test_offset_chain_runs_without_adsk():
+    # A fresh interpreter with only the repository root on the path: no stand-in adsk to fall back on
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    script = ("import sys; from flexure_tools import offset; "
+              "ring = offset.offset_chain([('circle', [((0.0, 0.0, 0.0), 1.0)])], [0.1])[0]; "
+              "assert 'adsk' not in sys.modules and ring")
+    subprocess.run([sys.executable, '-c', script], cwd=root, env={**os.environ, 'PYTHONPATH': root}, check=True)
@@ -0,0 +1,171 @@
+'''
+Description: Placement engine behaviour against the counting adsk stand-in: one sketch recompute per placement, one
+API call per entity, and chained entities sharing their end points.
+'''
+
+import math
+import types
+
+import pytest
+
+import fixtures
+from conftest import square
+import adsk, adsk.fusion
+from flexure_tools import placement, profile_store
+
+
+@pytest.mark.parametrize('name', sorted(fixtures.library_profiles()))
+def test_library_profile_recomputes_once(name, api_calls):
+    entities = fixtures.library_profiles()[name]
+    counts = profile_store.profile_summary(entities)
+    sketch = adsk.fusion.Sketch()
+
+    created = placement.emit_entities(sketch, placement.scale_entities(entities, 2.5, -1.25, 0.8))
+
+    assert sketch.recomputes == 1
+    assert created == len(entities)
+    assert api_calls['SketchLines.addByTwoPoints'] == counts['lines']
+    assert api_calls['SketchArcs.addByCenterStartSweep'] == counts['arcs']
+    assert api_calls['SketchCircles.addByCenterRadius'] == counts['circles']
+
+
+def test_closed_chain_shares_end_points(api_calls):
+    entities = fixtures.synthetic_profile(100)  # 50 lines alternating with 50 arcs, one closed loop
+    sketch = adsk.fusion.Sketch()
+
+    placement.emit_entities(sketch, placement.scale_entities(entities, 0.0, 0.0, 1.0))
+
+    # One point per vertex plus the arc centers; only the arc closing the loop needs a merge
+    assert len(sketch.sketchPoints) == 100 + 50
+    assert api_calls['SketchPoint.merge'] == 1
+    # The first line creates both its points, every later line only its end point, every arc only its center
+    assert api_calls['Point3D.create'] == 2 + 49 + 50
+
+
+def test_separate_points_without_sharing():
+    entities = fixtures.synthetic_profile(100)
+    sketch = adsk.fusion.Sketch()
+
+    placement.emit_entities(sketch, placement.scale_entities(entities, 0.0, 0.0, 1.0), share_points=False)
+
+    assert len(sketch.sketchPoints) == 2 * 50 + 3 * 50
+    assert sketch.recomputes == 1
+
+
+def test_deferred_sketch_is_not_recomputed():
+    sketch = adsk.fusion.Sketch()
+    sketch.isComputeDeferred = True
+
+    placement.emit_entities(sketch, placement.scale_entities(fixtures.synthetic_profile(20), 0.0, 0.0, 1.0))
+
+    assert sketch.recomputes == 0
+    assert sketch.isComputeDeferred
+
+
+def test_scale_and_translate():
+    geometry = placement.scale_entities([('circle', [((1.0, 2.0, 0.0), 0.5)])], 10.0, 20.0, 2.0)
+    assert list(geometry.circles) == [12.0, 24.0, 0.0, 1.0]
+
+
+def test_cache_reuses_scaled_geometry():
+    cache = placement.PlacementCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return fixtures.synthetic_profile(20)
+
+    first = cache.get(('test', 'profile'), load, 0.5, 'Normal')
+    second = cache.get(('test', 'profile'), load, 0.5, 'Normal')
+    assert first is second
+    assert len(loads) == 1
+    assert cache.get(('test', 'profile'), load, 0.75, 'Normal') is not first
+
+
+def test_multi_target_run_recomputes_once(api_calls):
+    recreate = fixtures.load_script('recreate')
+    recreate.placement_cache.clear()
+    entities = fixtures.synthetic_profile(40)
+    targets = []
+    for k in range(4):
+        face = fixtures.brep_face([('circle', [((3.0 * k, 0.0, 0.0), 0.5)])])
+        targets.append((recreate.topology_index.face(face), 0, 0.5))
+    sketch = adsk.fusion.Sketch()
+    adsk.reset_counters()
+
+    timings, _ = recreate.placeProfileOnTargets(sketch, ('test', 'synthetic'), lambda: entities, targets, 'Normal')
+
+    assert [t['placed'] for t in timings] == [True] * 4
+    assert sketch.recomputes == 1
+    assert api_calls['SketchLines.addByTwoPoints'] == 4 * 20
+    assert api_calls['SketchArcs.addByCenterStartSweep'] == 4 * 20
+
+
+def _preview(recreate, monkeypatch, target_count):
+    """ Run the preview handler over target_count circular holes; returns its event args. """
+    recreate.placement_cache.clear()
+    entities = fixtures.synthetic_profile(8)
+    targets = [(recreate.topology_index.face(fixtures.brep_face([('circle', [((3.0 * k, 0.0, 0.0), 0.5)])])), 0, 0.5)
+               for k in range(target_count)]
+    monkeypatch.setattr(recreate, 'BACKGROUND_MIN_TARGETS', 4)
+    monkeypatch.setattr(recreate, 'profile_library', types.SimpleNamespace(load=lambda category, name: entities))
+    monkeypatch.setattr(recreate, 'collectPlacement',
+                        lambda inputs: (None, ('test', 'synthetic'), targets, 'Normal', None, []))
+    args = adsk.core.CommandEventArgs()
+    args.command = types.SimpleNamespace(commandInputs=None)
+    args.isValidResult = False
+    shown = len(recreate.ui.messages)
+    recreate.ProfileCommandExecutePreviewHandler().notify(args)
+    assert recreate.ui.messages[shown:] == []  # The handler reports its exceptions in a message box
+    return args
+
+
+def test_small_preview_is_accepted_as_the_result(monkeypatch):
+    args = _preview(fixtures.load_script('recreate'), monkeypatch, 3)
+    assert args.isValidResult is True
+
+
+def test_background_sized_preview_leaves_execute_to_run(monkeypatch, api_calls):
+    args = _preview(fixtures.load_script('recreate'), monkeypatch, 4)
+    assert args.isValidResult is False
+    assert api_calls['SketchLines.addByTwoPoints'] == 0  # Not placed synchronously either
+
+
+def _inputs(face, edges):
+    """ Stand-in command inputs selecting edges of face for a ('test', 'synthetic') placement. """
+    def selection(entities):
+        return types.SimpleNamespace(selectionCount=len(entities),
+                                     selection=lambda i: types.SimpleNamespace(entity=entities[i]))
+
+    items = {'category': types.SimpleNamespace(selectedItem=types.SimpleNamespace(name='test')),
+             'profile': types.SimpleNamespace(selectedItem=types.SimpleNamespace(name='synthetic')),
+             'fitType': types.SimpleNamespace(selectedItem=types.SimpleNamespace(name='Normal')),
+             'allCircular': types.SimpleNamespace(value=False),
+             'plane': selection([face]),
+             'edge': selection(edges)}
+    return types.SimpleNamespace(itemById=items.get)
+
+
+def test_edge_targets_skip_non_circular_edges_and_repeat_loops(monkeypatch):
+    recreate = fixtures.load_script('recreate')
+    entities = fixtures.synthetic_profile(8)
+    monkeypatch.setattr(recreate, 'profile_library', types.SimpleNamespace(load=lambda category, name: entities))
+    hole = fixtures.brep_loop([('arc', [((0.0, 0.0, 0.0), (0.5, 0.0, 0.0), math.pi)]),
+                               ('arc', [((0.0, 0.0, 0.0), (-0.5, 0.0, 0.0), math.pi)])])
+    slot = fixtures.brep_loop(square(2.0, -0.5, 3.0, 0.5))
+    face = adsk.fusion.BRepFace([fixtures.brep_loop(square(-5.0, -5.0, 5.0, 5.0), True), hole, slot])
+    adsk.fusion.BRepBody([face])
+    # Both halves of the round hole, then one side of the square slot
+    edges = [hole.edges.item(0), hole.edges.item(1), slot.edges.item(0)]
+
+    _, _, targets, _, problem, problems = recreate.collectPlacement(_inputs(face, edges))
+
+    assert problem is None
+    assert [(loopIndex, radius) for _, loopIndex, radius in targets] == [(1, 0.5)]
+    assert problems == ['Skipped non-circular edges (selection 3).']
+    assert placement.format_placement_summary([], 0.0, problems).endswith(problems[0])
+
+    # Only non-circular edges: nothing to place, and the reason says why
+    _, _, targets, _, problem, _ = recreate.collectPlacement(_inputs(face, [slot.edges.item(1)]))
+    assert targets == [] and problem.startswith('Skipped non-circular edges (selection 1).')
+
@@ -0,0 +1,145 @@
+'''
+Description: Profile payload round trips (float64, quantized and symmetric) and the ProfileStore index.
+'''
+
+import math
+
+import pytest
+
+import fixtures
+from flexure_tools import profile_store, symmetry
+from flexure_tools.profile import Profile
+
+LIBRARY = fixtures.library_profiles()
+
+
+def _values(entities):
+    """ Every number of a profile, flattened in entity order. """
+    values = []
+    for entity_type, params in entities:
+        stack = [params]
+        while stack:
+            item = stack.pop(0)
+            if isinstance(item, (list, tuple)):
+                stack[:0] = list(item)
+            else:
+                values.append(item)
+    return values
+
+
+@pytest.mark.parametrize('name', sorted(LIBRARY))
+def test_float64_round_trip_is_exact(name):
+    entities = list(LIBRARY[name])
+    assert profile_store.decode_entities(profile_store.encode_entities(entities)) == entities
+
+
+@pytest.mark.parametrize('name', sorted(LIBRARY))
+def test_quantized_round_trip_within_grid(name):
+    entities = list(LIBRARY[name])
+    data = profile_store.encode_quantized(entities)
+    decoded = profile_store.decode_entities(data)
+
+    assert [e[0] for e in decoded] == [e[0] for e in entities]
+    assert len(data) < len(profile_store.encode_entities(entities))
+    assert max(abs(a - b) for a, b in zip(_values(decoded), _values(entities))) <= profile_store.QUANTUM
+    assert profile_store.content_hash(decoded) == profile_store.content_hash(entities)
+
+
+def test_quantized_range_is_checked():
+    with pytest.raises(ValueError):
+        profile_store.encode_quantized([('circle', [((30.0, 0.0, 0.0), 1.0)])])
+
+
+def test_wide_deltas_round_trip():
+    entities = [('line', [((-20.0, 0.0, 0.0), (20.0, 0.0, 0.0))])]
+    assert profile_store.decode_entities(profile_store.encode_quantized(entities)) == entities
+
+
+def test_spline_round_trip():
+    entities = [('spline', [[(0.0, 0.0, 0.0), (0.5, 0.25, 0.0), (1.0, 0.0, 0.0)]]), ('circle', [((0.0, 0.0, 0.0), 2.0)])]
+    for encode in (profile_store.encode_entities, profile_store.encode_quantized):
+        assert profile_store.decode_entities(encode(entities)) == entities
+
+
+def test_content_hash_ignores_noise_and_order():
+    entities = fixtures.synthetic_profile(40)
+    noisy = [(kind, [tuple(tuple(v + 1e-15 for v in item) if isinstance(item, tuple) else item + 1e-15
+                           for item in params[0])]) for kind, params in entities]
+
+    assert profile_store.content_hash(noisy) == profile_store.content_hash(entities)
+    assert profile_store.content_hash(entities[::-1]) == profile_store.content_hash(entities)
+    assert profile_store.content_hash(entities[1:]) != profile_store.content_hash(entities)
+
+
+def test_symmetric_payload_expands_to_the_profile():
+    entities = fixtures.synthetic_profile(32)
+    compressed = symmetry.compress(entities)
+    decoded = profile_store.decode_profile(profile_store.encode_symmetric(compressed))
+
+    assert len(decoded) == len(entities)
+    assert profile_store.content_hash(decoded) == profile_store.content_hash(entities)
+
+
+@pytest.mark.parametrize('quantized', [False, True])
+def test_store_add_load_and_find(tmp_path, quantized):
+    store = profile_store.ProfileStore(str(tmp_path), quantized=quantized)
+    entities = fixtures.synthetic_profile(40)
+    entry = store.add('Test', 'Wavy', entities, metadata={'source': 'synthetic'})
+    store.add('Test', 'Copy', entities[::-1])
+    store.add('Other', 'Square', [('line', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))])])
+
+    reopened = profile_store.ProfileStore(str(tmp_path))
+    assert reopened.quantized == quantized
+    assert reopened.categories() == ['Test', 'Other']
+    assert reopened.names('Test') == ['Wavy', 'Copy']
+    assert reopened.entry('Test', 'Wavy') == entry
+    assert entry['lines'] == entry['arcs'] == 20
+    assert entry['source'] == 'synthetic'
+    loaded = list(reopened.load('Test', 'Wavy'))
+    assert max(abs(a - b) for a, b in zip(_values(loaded), _values(entities))) <= profile_store.QUANTUM
+    assert reopened.find_identical(entities) == [('Test', 'Wavy'), ('Test', 'Copy')]
+    assert reopened.identical_groups() == [[('Test', 'Wavy'), ('Test', 'Copy')]]
+
+
+def test_store_convert(tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path))
+    for k in range(3):
+        store.add('Test', str(k), fixtures.synthetic_profile(40, radius=1.0 + k), save=False)
+    store.save()
+    radius = store.entry('Test', '2')['bounding_radius']
+
+    before, after = store.convert(True)
+
+    assert after < before
+    reopened = profile_store.ProfileStore(str(tmp_path))
+    assert reopened.quantized
+    assert reopened.entry('Test', '2')['bounding_radius'] == radius
+    loaded = reopened.load('Test', '2')
+    assert len(loaded) == 40
+    assert math.isclose(loaded.bounding_radius(), radius, abs_tol=profile_store.QUANTUM)
+
+
+@pytest.mark.parametrize('name', ['Circular/4th Flexure', 'Circular/5th Flexure', 'Circular/6th Flexure',
+                                  'Circular/7th Flexure'])
+def test_convert_keeps_symmetric_profiles_findable(tmp_path, name):
+    # Quantized symmetric sectors expand off the grid, so their hash must stay the one recorded at add time
+    entities = LIBRARY[name]
+    store = profile_store.ProfileStore(str(tmp_path), quantized=True)
+    entry = store.add('Test', 'Flexure', entities, symmetry_tolerance=1e-6)
+    assert 'symmetry' in entry
+
+    for quantized in (True, False, True):
+        store.convert(quantized)
+        assert store.find_identical(entities) == [('Test', 'Flexure')]
+        assert profile_store.ProfileStore(str(tmp_path)).find_identical(entities) == [('Test', 'Flexure')]
+
+
+def test_store_symmetry_tolerance(tmp_path):
+    store = profile_store.ProfileStore(str(tmp_path))
+    entry = store.add('Test', 'Eightfold', fixtures.synthetic_profile(32), symmetry_tolerance=symmetry.SYMMETRY_TOLERANCE)
+
+    assert entry['symmetry']['order'] == 8
+    loaded = profile_store.ProfileStore(str(tmp_path)).load('Test', 'Eightfold')
+    assert isinstance(loaded, symmetry.SymmetricProfile)
+    assert len(loaded.sector) < 4
+    assert len(Profile.from_entities(list(loaded))) == 32
@@ -0,0 +1,67 @@
+'''
+Description: Shape descriptors and similarity queries in flexure_tools.similarity.
+'''
+
+import math
+
+import pytest
+
+import fixtures
+from flexure_tools import similarity
+from flexure_tools.profile import Profile
+
+LIBRARY = fixtures.library_profiles()
+
+
+def _moved(entities, angle=0.0, scale=1.0, dx=0.0, dy=0.0):
+    """ The profile rotated about the origin, scaled and then shifted. """
+    profile = Profile.from_entities(entities)
+    c, s = math.cos(angle) * scale, math.sin(angle) * scale
+    profile.apply_matrix(c, -s, s, c, dx, dy)
+    return profile
+
+
+def _closest_other(name):
+    """ Distance from a library profile's descriptor to that of the most similar other library profile. """
+    descriptor = similarity.profile_descriptor(LIBRARY[name])
+    return min(math.dist(descriptor, similarity.profile_descriptor(entities))
+               for other, entities in LIBRARY.items() if other != name)
+
+
+@pytest.mark.parametrize('name', ['Circular/1st Flexure', 'Circular/2nd Flexure', 'Circular/6th Flexure'])
+@pytest.mark.parametrize('angle, scale, dx, dy', [(0.7, 1.0, 0.0, 0.0), (0.0, 2.5, 0.0, 0.0), (0.0, 1.0, 3.0, 0.0),
+                                                  (2.1, 0.4, -12.0, 5.5)])
+def test_descriptor_is_invariant(name, angle, scale, dx, dy):
+    original = similarity.profile_descriptor(LIBRARY[name])
+    moved = similarity.profile_descriptor(_moved(LIBRARY[name], angle, scale, dx, dy))
+    assert math.dist(original, moved) < min(similarity.DUPLICATE_EPSILON, _closest_other(name) / 10)
+
+
+def _index():
+    index = similarity.SimilarityIndex()
+    for name, entities in LIBRARY.items():
+        index.add(name, similarity.profile_descriptor(entities))
+    # An extracted copy: in sketch coordinates, rotated and at another size
+    index.add('extracted', similarity.profile_descriptor(_moved(LIBRARY['Circular/2nd Flexure'], 0.4, 1.5, 3.0, -2.0)))
+    return index
+
+
+def test_nearest_finds_the_moved_copy_first():
+    index = _index()
+    found = index.nearest(index.descriptor('Circular/2nd Flexure'), k=3, exclude='Circular/2nd Flexure')
+    assert len(found) == 3
+    assert found[0][1] == 'extracted'
+    assert [distance for distance, _ in found] == sorted(distance for distance, _ in found)
+
+
+def test_within_and_duplicates():
+    index = _index()
+    assert [key for _, key in index.within(index.descriptor('extracted'))] == ['extracted', 'Circular/2nd Flexure']
+    assert [(a, b) for _, a, b in index.duplicates()] == [('Circular/2nd Flexure', 'extracted')]
+    index.remove('extracted')
+    assert 'extracted' not in index and index.duplicates() == []
+
+
+def test_descriptor_length_is_checked():
+    with pytest.raises(ValueError):
+        similarity.SimilarityIndex().add('short', (0.0,) * (similarity.DIMENSIONS - 1))
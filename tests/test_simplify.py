@@ -0,0 +1,84 @@
+'''
+Description: Tolerance-driven simplification in flexure_tools.simplify.
+'''
+
+import math
+
+import pytest
+
+from conftest import square
+from flexure_tools import loops, simplify
+
+
+def _split_square():
+    """ A unit square whose bottom edge is split into ten collinear pieces. """
+    entities = [('line', [((k / 10, 0.0, 0.0), ((k + 1) / 10, 0.0, 0.0))]) for k in range(10)]
+    return entities + square(0.0, 0.0, 1.0, 1.0)[1:]
+
+
+def test_collinear_lines_merge():
+    result, reduction = simplify.simplify_entities(_split_square())
+    assert len(result) == 4
+    assert reduction.merged_lines == 9
+    assert reduction.before == 13 and reduction.after == 4
+    [loop] = loops.find_loops(result)
+    assert loop.closed and loop.area == pytest.approx(1.0)
+
+
+def test_arc_pieces_merge_into_circle():
+    pieces = 6
+    entities = [('arc', [((0.0, 0.0, 0.0), (math.cos(k * 2 * math.pi / pieces), math.sin(k * 2 * math.pi / pieces), 0.0),
+                          2 * math.pi / pieces)]) for k in range(pieces)]
+    result, reduction = simplify.simplify_entities(entities)
+    assert reduction.merged_arcs == pieces - 1
+    assert len(result) == 1 and result[0][0] == 'circle'
+    assert result[0][1][0][1] == pytest.approx(1.0)
+
+
+def test_corners_and_junctions_are_kept():
+    entities = square(0.0, 0.0, 1.0, 1.0) + [('line', [((1.0, 1.0, 0.0), (2.0, 2.0, 0.0))])]
+    result, reduction = simplify.simplify_entities(entities)
+    assert len(result) == 5
+    assert reduction.merged_lines == 0
+
+
+def test_zero_length_entities_are_dropped():
+    entities = square(0.0, 0.0, 1.0, 1.0) + [('line', [((1.0, 1.0, 0.0), (1.0, 1.0, 0.0))])]
+    result, reduction = simplify.simplify_entities(entities)
+    assert len(result) == 4
+    assert reduction.dropped == 1
+
+
+def test_dropped_tail_leaves_the_loop_closed():
+    # The bottom edge ends in a 5e-5 collinear tail, below the tolerance
+    entities = [('line', [((0.0, 0.0, 0.0), (1.0 - 5e-5, 0.0, 0.0))]),
+                ('line', [((1.0 - 5e-5, 0.0, 0.0), (1.0, 0.0, 0.0))])] + square(0.0, 0.0, 1.0, 1.0)[1:]
+    result, reduction = simplify.simplify_entities(entities)
+    assert reduction.dropped == 1
+    assert [(loop.closed, len(loop)) for loop in loops.find_loops(result)] == [(True, 4)]
+
+
+def test_dropped_jog_reconnects_an_arc_and_a_line():
+    quarter = ('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), math.pi / 2)])
+    jog = ('line', [((0.0, 1.0, 0.0), (-3e-5, 1.0 + 4e-5, 0.0))])
+    entities = [quarter, jog, ('line', [((-3e-5, 1.0 + 4e-5, 0.0), (0.0, 0.0, 0.0))]),
+                ('line', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+    result, reduction = simplify.simplify_entities(entities)
+    assert reduction.dropped == 1
+    assert result[0] == quarter  # The arc end is the shared point, so the arc is not moved
+    [loop] = loops.find_loops(result)
+    assert loop.closed and loop.area == pytest.approx(math.pi / 4, abs=1e-4)
+
+
+def test_dropped_piece_between_arcs_refits_one_of_them():
+    # Two arcs of different circles joined by a 2e-5 piece; one arc is refitted onto the other's end point
+    first = ('arc', [((0.0, 0.0, 0.0), (1.0, 0.0, 0.0), math.pi / 2)])
+    second = ('arc', [((0.0, 2.0 + 2e-5, 0.0), (0.0, 1.0 + 2e-5, 0.0), -math.pi / 2)])
+    entities = [first, ('line', [((0.0, 1.0, 0.0), (0.0, 1.0 + 2e-5, 0.0))]), second,
+                ('line', [((-1.0, 2.0 + 2e-5, 0.0), (-1.0, 0.0, 0.0))]),
+                ('line', [((-1.0, 0.0, 0.0), (1.0, 0.0, 0.0))])]
+    result, reduction = simplify.simplify_entities(entities)
+    assert reduction.dropped == 1 and len(result) == 4
+    [loop] = loops.find_loops(result)
+    assert loop.closed
+
@@ -0,0 +1,80 @@
+'''
+Description: Symmetry detection and sector compression in flexure_tools.symmetry.
+'''
+
+import math
+
+import pytest
+
+import fixtures
+from flexure_tools import loops, profile_store, symmetry
+from flexure_tools.profile import Profile
+
+
+def test_detects_rotation_order():
+    found = symmetry.detect_symmetry(fixtures.synthetic_profile(32))  # Wave period of four entities
+    assert found.order == 8
+    assert found.deviation < 1e-12
+    assert not found.is_noisy()
+
+
+def test_asymmetric_profile():
+    entities = fixtures.synthetic_profile(32)
+    entities[5] = ('line', [((5.0, 5.0, 0.0), (6.0, 5.0, 0.0))])
+    assert symmetry.detect_symmetry(entities).size == 1
+    assert symmetry.compress(entities) is None
+
+
+def test_mirror_symmetry():
+    # A rectangle is 2-fold with two mirror axes
+    corners = [(-2.0, -1.0, 0.0), (2.0, -1.0, 0.0), (2.0, 1.0, 0.0), (-2.0, 1.0, 0.0)]
+    entities = [('line', [(corners[i], corners[(i + 1) % 4])]) for i in range(4)]
+    found = symmetry.detect_symmetry(entities)
+    assert found.order == 2
+    assert found.mirror is not None
+    assert found.size == 4
+
+
+def test_compress_expand_round_trip():
+    entities = fixtures.synthetic_profile(32)
+    compressed = symmetry.compress(entities)
+
+    # 8-fold with mirror axes: the wave crest line lies across an axis, so a sector holds half of it
+    assert compressed.symmetry.size == 16
+    assert (len(compressed.sector), len(compressed.axial), len(compressed.fixed)) == (1, 2, 0)
+    assert len(compressed) == 32
+    assert profile_store.content_hash(compressed) == profile_store.content_hash(entities)
+
+
+@pytest.mark.parametrize('name', ['Circular/4th Flexure', 'Circular/6th Flexure'])
+def test_library_profiles_compress(name):
+    entities = fixtures.library_profiles()[name]
+    compressed = symmetry.compress(entities)
+    assert compressed is not None
+    expanded = compressed.expand()
+    assert len(expanded) == len(entities)
+    assert math.isclose(expanded.bounding_radius(), Profile.from_entities(entities).bounding_radius(), rel_tol=1e-9)
+
+
+def _noisy_octagon(noise):
+    """ A closed 8-fold loop of 16 lines whose shared vertices are pushed alternately in and out by noise. """
+    points = []
+    for i in range(16):
+        r = (1.1 if i % 2 else 1.0) + (noise if i % 3 else -noise)
+        points.append((r * math.cos(i * math.pi / 8), r * math.sin(i * math.pi / 8), 0.0))
+    return [('line', [(points[i], points[(i + 1) % 16])]) for i in range(16)]
+
+
+def test_noisy_symmetry_is_not_compressed(tmp_path):
+    entities = _noisy_octagon(2e-6)
+    found = symmetry.detect_symmetry(entities)
+    assert found.order == 8 and found.deviation > symmetry.COMPRESS_DEVIATION
+    assert symmetry.compress(entities) is None
+
+    # Stored whole, so it still reads back as one closed loop
+    store = profile_store.ProfileStore(str(tmp_path))
+    entry = store.add('test', 'noisy', entities, symmetry_tolerance=symmetry.SYMMETRY_TOLERANCE)
+    assert 'symmetry' not in entry
+    found = loops.find_loops(store.load('test', 'noisy').to_entities())
+    assert [(loop.closed, len(loop)) for loop in found] == [(True, 16)]
+
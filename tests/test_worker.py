@@ -0,0 +1,104 @@
+'''
+Description: GeometryWorker jobs driven through the stand-in event loop: results applied in order on the calling
+thread, cancellation from the progress callback or the job handle, task errors, and a cancelled background placement.
+'''
+
+import itertools, threading, time
+
+import pytest
+
+import fixtures
+import adsk, adsk.core, adsk.fusion
+from flexure_tools import worker
+
+_event_ids = itertools.count(1)
+
+
+@pytest.fixture
+def geometry_worker():
+    """ A worker on its own custom event, closed after the test. """
+    instance = worker.GeometryWorker(adsk.core.Application.get(), 'testGeometryReady{}'.format(next(_event_ids)),
+                                     batch_size=3, batch_seconds=60.0)  # Batches of exactly 3
+    yield instance
+    instance.close()
+
+
+def _run_events(job, timeout=5.0):
+    """ Turn the stand-in event loop until the job has finished. """
+    deadline = time.perf_counter() + timeout
+    while not job.finished:
+        assert time.perf_counter() < deadline, 'job did not finish'
+        adsk.doEvents()
+        time.sleep(0.001)
+
+
+def test_results_are_applied_in_order_on_the_ui_thread(geometry_worker):
+    applied, progress, ended = [], [], []
+    job = geometry_worker.submit([lambda k=k: k * k for k in range(10)],
+                                 lambda result: applied.append((result, threading.get_ident())),
+                                 lambda completed, total: progress.append((completed, total)), ended.append)
+    _run_events(job)
+    assert [result for result, _ in applied] == [k * k for k in range(10)]
+    assert {thread for _, thread in applied} == {threading.get_ident()}
+    assert progress[-1] == (10, 10)
+    assert ended == [job]
+    assert job.completed == 10 and not job.cancelled and job.error is None
+
+
+def test_progress_returning_false_cancels(geometry_worker):
+    applied, ended = [], []
+
+    def task(k):
+        time.sleep(0.002)
+        return k
+
+    job = geometry_worker.submit([lambda k=k: task(k) for k in range(50)], applied.append, lambda completed, total: False,
+                                 ended.append)
+    _run_events(job)
+    assert job.cancelled
+    assert applied == [0, 1, 2]  # Results posted after the cancel are discarded
+    assert job.completed == 3
+    assert ended == [job]
+
+
+def test_cancel_before_delivery_applies_nothing(geometry_worker):
+    applied, ended = [], []
+    job = geometry_worker.submit([lambda k=k: k for k in range(20)], applied.append, finished=ended.append)
+    job.cancel()
+    _run_events(job)
+    assert applied == [] and job.completed == 0
+    assert ended == [job]
+
+
+def test_task_error_finishes_the_job(geometry_worker):
+    def fail():
+        raise ValueError('bad loop')
+
+    applied, ended = [], []
+    job = geometry_worker.submit([lambda: 1, fail, lambda: 3], applied.append, finished=ended.append)
+    _run_events(job)
+    assert 'ValueError: bad loop' in job.error
+    assert ended == [job]
+    assert applied == []  # The failing task's batch is never posted
+
+
+def test_cancelled_background_placement_reports_the_partial_run(geometry_worker, monkeypatch):
+    recreate = fixtures.load_script('recreate')
+    recreate.placement_cache.clear()
+    entities = fixtures.synthetic_profile(8)
+    targets = [(recreate.topology_index.face(fixtures.brep_face([('circle', [((3.0 * k, 0.0, 0.0), 0.5)])])), 0, 0.5)
+               for k in range(12)]
+    dialog = adsk.core.ProgressDialog()
+    dialog.wasCancelled = True  # The user presses Cancel as soon as the first batch arrives
+    monkeypatch.setattr(recreate, 'geometry_worker', geometry_worker)
+    monkeypatch.setattr(recreate.ui, 'createProgressDialog', lambda: dialog)
+    sketch = adsk.fusion.Sketch()
+    shown = len(recreate.ui.messages)
+
+    job = recreate.placeProfileInBackground(sketch, ('test', 'synthetic'), lambda: entities, targets, 'Normal')
+    _run_events(job)
+
+    assert job.cancelled and job.completed == 3
+    assert not dialog.isShowing
+    assert not sketch.isComputeDeferred
+    assert recreate.ui.messages[shown:][0].startswith('Cancelled after 3 of 12 targets.')